@@ -5,13 +5,18 @@ Globals defined in this module:
     current_result: Should be set by a runner to an object that has the same
                     interface as unittest.TestResult. It will be used by every
                     example that is instantiated to record test results during
-                    the runtime of Ivoire.
+                    the runtime of Ivoire. Each thread has its own (which
+                    starts out as None).
 
     __version__: The current version information
 
 """
 
 from importlib import metadata
+from types import ModuleType
+from typing import Any
+import sys
+import threading
 
 from ivoire.manager import ContextManager
 from ivoire.standalone import Example, describe  # noqa: F401
@@ -21,4 +26,34 @@ __version__ = metadata.version("ivoire")
 _manager = ContextManager()
 context = _manager.create_context
 
-current_result = None
+# Really a property of the module, per thread (see _Ivoire below).
+current_result: Any
+
+
+class _Thread(threading.local):
+    def __init__(self):
+        self.current_result = None
+
+
+_thread = _Thread()
+
+
+class _Ivoire(ModuleType):
+    """
+    The type of this module, giving it a ``current_result`` for each thread.
+    """
+
+    @property
+    def current_result(self):
+        return _thread.current_result
+
+    @current_result.setter
+    def current_result(self, result):
+        _thread.current_result = result
+
+    @current_result.deleter
+    def current_result(self):
+        del _thread.current_result
+
+
+sys.modules[__name__].__class__ = _Ivoire
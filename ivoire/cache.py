@@ -0,0 +1,585 @@
+"""
+A cache of information kept between runs of Ivoire.
+"""
+
+from contextlib import closing
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import NamedTuple
+import json
+import sqlite3
+import sys
+import time
+
+from ivoire.imports import Graph, absolute
+
+_GITIGNORE = "# Created by Ivoire.\n*\n"
+
+
+class Cache:
+    """
+    A directory in which to keep information between runs.
+
+    If the directory can't be created, caching is disabled (with a warning)
+    by keeping everything in a temporary directory instead, so that nothing
+    outlives the process.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self._temporary = None
+
+    def path(self, name):
+        """
+        The path to a file within the cache, creating the cache if necessary.
+        """
+        if self._temporary is not None:
+            return Path(self._temporary.name) / name
+        if not self.root.is_dir():
+            try:
+                self.root.mkdir(parents=True)
+                (self.root / ".gitignore").write_text(_GITIGNORE)
+            except OSError as error:
+                sys.stderr.write(
+                    f"Not caching anything, since {self.root} couldn't be "
+                    f"created: {error}\n",
+                )
+                self._temporary = TemporaryDirectory(prefix="ivoire-cache-")
+                return self.path(name)
+        return self.root / name
+
+    def durations(self):
+        """
+        The durations of examples from previous runs.
+        """
+        return Durations(self.path("durations.sqlite"))
+
+    def failures(self):
+        """
+        The examples which failed in previous runs.
+        """
+        return Failures(self.path("failures.json"))
+
+    def impact(self):
+        """
+        Which lines examples ran when last recorded (see ``ivoire.impact``).
+        """
+        return Impact(self.path("impact.sqlite"))
+
+    def imports(self):
+        """
+        What specs imported (see ``ivoire.imports``) when they last ran.
+        """
+        return Imports(self.path("imports.sqlite"))
+
+    def index(self):
+        """
+        The static indices of spec files (see ``ivoire.index``).
+        """
+        return Index(self.path("index.sqlite"))
+
+    def socket(self):
+        """
+        The Unix socket a daemon (see ``ivoire.serve``) listens on.
+        """
+        return self.path("serve.sock")
+
+    def directories(self, settings):
+        """
+        What was found in directories (discovered with the given settings).
+        """
+        return Directories(self.path("directories.sqlite"), settings)
+
+
+class Durations:
+    """
+    The durations of examples from previous runs, kept in a SQLite database.
+
+    The most recent timings of each spec are kept, so examples which have
+    since been removed (or renamed) are forgotten when their spec next runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS durations (
+                spec TEXT NOT NULL,
+                "group" TEXT NOT NULL,
+                context TEXT NOT NULL,
+                example TEXT NOT NULL,
+                wall REAL NOT NULL,
+                cpu REAL NOT NULL,
+                recorded REAL NOT NULL,
+                PRIMARY KEY (spec, "group", context, example)
+            )
+            """,
+        )
+        return connection
+
+    def record(self, timings):
+        """
+        Record the given timings, replacing any earlier ones of their specs.
+        """
+        now = time.time()
+        rows = [
+            (
+                timing.spec,
+                timing.group,
+                json.dumps(timing.context),
+                timing.example,
+                timing.wall,
+                timing.cpu,
+                now,
+            )
+            for timing in timings
+            if timing.spec is not None
+        ]
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "DELETE FROM durations WHERE spec = ?",
+                [(spec,) for spec in {row[0] for row in rows}],
+            )
+            connection.executemany(
+                "INSERT OR REPLACE INTO durations "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def by_spec(self):
+        """
+        The total duration of each spec, as of the last time it ran.
+        """
+        with closing(self._connect()) as connection:
+            return dict(
+                connection.execute(
+                    "SELECT spec, SUM(wall) FROM durations GROUP BY spec",
+                ),
+            )
+
+
+class Failures:
+    """
+    The examples which failed in previous runs, kept in a JSON file.
+
+    Each failure is a spec along with the name path of the example which
+    failed in it (or ``None`` for failures outside of any example).
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def load(self):
+        """
+        Load the failures.
+        """
+        try:
+            failures = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return set()
+        return {
+            (spec, None if path is None else tuple(path))
+            for spec, path in failures
+        }
+
+    def record(self, timings, failed):
+        """
+        Record the failures from a run.
+
+        Previous failures of examples which have now run (and of specs which
+        have run, for failures outside of examples) are forgotten, and the
+        new ones remembered.
+        """
+        ran = {
+            (timing.spec, (timing.group, *timing.context, timing.example))
+            for timing in timings
+        }
+        ran_specs = {spec for spec, _ in ran}
+
+        failures = {
+            (spec, path)
+            for spec, path in self.load()
+            if (spec, path) not in ran
+            and not (path is None and spec in ran_specs)
+        }
+        failures.update(
+            (spec, path) for spec, path in failed if spec is not None
+        )
+        self.path.write_text(json.dumps(sorted(failures, key=_sort_key)))
+
+
+class Imports:
+    """
+    What specs imported when they last ran, kept in a SQLite database.
+
+    What a file imports is replaced whenever it's recorded again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS specs (spec TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS imports (
+                importer TEXT NOT NULL,
+                imported TEXT NOT NULL,
+                PRIMARY KEY (importer, imported)
+            );
+            """,
+        )
+        return connection
+
+    def load(self):
+        """
+        Load everything recorded, as a ``Graph``.
+        """
+        with closing(self._connect()) as connection:
+            return Graph(
+                imports=connection.execute("SELECT * FROM imports"),
+                recorded=[
+                    spec for spec, in connection.execute("SELECT * FROM specs")
+                ],
+            )
+
+    def record(self, imports):
+        """
+        Record what some specs imported.
+
+        ``imports`` has each spec along with the (importer, imported) pairs
+        of files recorded while loading it.
+        """
+        specs, pairs = set(), set()
+        for spec, imported in imports:
+            specs.add(absolute(spec))
+            pairs.update(imported)
+        importers = specs | {importer for importer, _ in pairs}
+
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                "DELETE FROM imports WHERE importer = ?",
+                [(importer,) for importer in importers],
+            )
+            connection.executemany(
+                "INSERT OR IGNORE INTO specs VALUES (?)",
+                [(spec,) for spec in specs],
+            )
+            connection.executemany(
+                "INSERT INTO imports VALUES (?, ?)",
+                sorted(pairs),
+            )
+
+
+class Impact:
+    """
+    Which lines each example ran when last recorded, kept in a SQLite database.
+
+    The lines an example ran in each file are stored together as a bitmap,
+    indexed by file, so finding the examples which ran some changed lines
+    reads only the rows for the changed files.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS examples (
+                id INTEGER PRIMARY KEY,
+                spec TEXT NOT NULL,
+                path TEXT NOT NULL,
+                UNIQUE (spec, path)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS lines (
+                file INTEGER NOT NULL,
+                example INTEGER NOT NULL,
+                lines BLOB NOT NULL,
+                PRIMARY KEY (file, example)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS lines_by_example ON lines (example);
+            """,
+        )
+        return connection
+
+    def record(self, coverage):
+        """
+        Record which lines some examples ran.
+
+        ``coverage`` has the spec and name path of each example, along with
+        the lines it ran in each file. What was recorded for the same
+        examples before is replaced.
+        """
+        files = {}
+        with closing(self._connect()) as connection, connection:
+            for spec, path, lines in coverage:
+                if spec is None:
+                    continue
+                example = _id(
+                    connection,
+                    "examples",
+                    spec=spec,
+                    path=json.dumps(path),
+                )
+                connection.execute(
+                    "DELETE FROM lines WHERE example = ?",
+                    (example,),
+                )
+                for file in lines.keys() - files.keys():
+                    files[file] = _id(connection, "files", path=file)
+                connection.executemany(
+                    "INSERT INTO lines VALUES (?, ?, ?)",
+                    [
+                        (files[file], example, _bitmap(ran))
+                        for file, ran in lines.items()
+                    ],
+                )
+
+    def recorded(self):
+        """
+        The spec and name path of every example which was recorded.
+        """
+        with closing(self._connect()) as connection:
+            return {
+                (spec, tuple(json.loads(path)))
+                for spec, path in connection.execute(
+                    "SELECT spec, path FROM examples",
+                )
+            }
+
+    def impacted(self, changes):
+        """
+        The spec and name path of every example which ran any changed line.
+
+        ``changes`` has the changed lines of each changed file.
+        """
+        impacted = set()
+        with closing(self._connect()) as connection:
+            for file, lines in changes.items():
+                changed = int.from_bytes(_bitmap(lines), "little")
+                rows = connection.execute(
+                    "SELECT examples.spec, examples.path, lines.lines "
+                    "FROM lines "
+                    "JOIN files ON files.id = lines.file "
+                    "JOIN examples ON examples.id = lines.example "
+                    "WHERE files.path = ?",
+                    (file,),
+                )
+                impacted.update(
+                    (spec, tuple(json.loads(path)))
+                    for spec, path, ran in rows
+                    if int.from_bytes(ran, "little") & changed
+                )
+        return impacted
+
+
+def _id(connection, table, **columns):
+    """
+    The ID of the row with the given (unique) columns, inserting it if needed.
+    """
+    names = ", ".join(columns)
+    where = " AND ".join(f"{name} = ?" for name in columns)
+    values = tuple(columns.values())
+    connection.execute(
+        f"INSERT OR IGNORE INTO {table} ({names}) "  # noqa: S608
+        f"VALUES ({', '.join('?' * len(columns))})",
+        values,
+    )
+    (row,) = connection.execute(
+        f"SELECT id FROM {table} WHERE {where}",  # noqa: S608
+        values,
+    ).fetchone()
+    return row
+
+
+def _bitmap(lines):
+    """
+    A bitmap of some line numbers.
+    """
+    bits = 0
+    for line in lines:
+        bits |= 1 << line
+    return bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+
+
+def _sort_key(failure):
+    spec, path = failure
+    return spec, path or ()
+
+
+class Indexed(NamedTuple):
+    """
+    The index of a spec file, along with what it was made from.
+    """
+
+    mtime_ns: int
+    size: int
+    digest: str
+    contents: dict
+
+    def matches(self, stat):
+        """
+        Whether the file (seemingly) hasn't changed since it was indexed.
+        """
+        return (self.mtime_ns, self.size) == (stat.st_mtime_ns, stat.st_size)
+
+
+class _Snapshot:
+    """
+    A table in a SQLite database which is read all at once on first use.
+
+    Changes are written all at once by ``save``. Subclasses say how values
+    are stored (as the columns following the key) with ``_load`` and
+    ``_dump``.
+    """
+
+    _schema = _table = ""
+
+    def __init__(self, path):
+        self.path = path
+        self._changed = {}
+        self._rows = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute(self._schema)
+        return connection
+
+    def _select(self, connection):
+        return connection.execute(f"SELECT * FROM {self._table}")  # noqa: S608
+
+    def get(self, key):
+        """
+        The value stored for the given key, if there is one.
+        """
+        if self._rows is None:
+            with closing(self._connect()) as connection:
+                self._rows = {
+                    key: self._load(columns)
+                    for key, *columns in self._select(connection)
+                }
+        return self._rows.get(key)
+
+    def save(self):
+        """
+        Write any changes.
+        """
+        if not self._changed:
+            return
+        rows = [
+            (key, *self._dump(value)) for key, value in self._changed.items()
+        ]
+        placeholders = ", ".join("?" * len(rows[0]))
+        with closing(self._connect()) as connection, connection:
+            connection.executemany(
+                f"INSERT OR REPLACE INTO {self._table} "  # noqa: S608
+                f"VALUES ({placeholders})",
+                rows,
+            )
+        if self._rows is not None:
+            self._rows.update(self._changed)
+        self._changed = {}
+
+
+class Index(_Snapshot):
+    """
+    The static indices of spec files, kept in a SQLite database.
+    """
+
+    _table = "indexed"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS indexed (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            digest TEXT NOT NULL,
+            "index" TEXT NOT NULL
+        )
+    """
+
+    def _load(self, columns):
+        *columns, contents = columns
+        return Indexed(*columns, json.loads(contents))
+
+    def _dump(self, value):
+        return (*value[:3], json.dumps(value.contents))
+
+    def set(self, path, stat, digest, index):
+        """
+        Remember the index of the given file.
+        """
+        self._changed[path] = Indexed(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            digest=digest,
+            contents=index,
+        )
+
+
+class Listing(NamedTuple):
+    """
+    The specs and subdirectories found in a directory.
+    """
+
+    mtime_ns: int
+    specs: list
+    subdirectories: list
+
+
+class Directories(_Snapshot):
+    """
+    What was found in directories while discovering specs.
+
+    Listings depend on how specs were discovered (which files are specs,
+    and what is excluded), so only those made the same way are used.
+    """
+
+    _table = "directories"
+    _schema = """
+        CREATE TABLE IF NOT EXISTS directories (
+            path TEXT PRIMARY KEY,
+            mtime_ns INTEGER NOT NULL,
+            specs TEXT NOT NULL,
+            subdirectories TEXT NOT NULL,
+            settings TEXT NOT NULL
+        )
+    """
+
+    def __init__(self, path, settings):
+        super().__init__(path)
+        self.settings = json.dumps(settings)
+
+    def _select(self, connection):
+        return connection.execute(
+            "SELECT path, mtime_ns, specs, subdirectories FROM directories "
+            "WHERE settings = ?",
+            (self.settings,),
+        )
+
+    def _load(self, columns):
+        mtime_ns, specs, subdirectories = columns
+        return Listing(mtime_ns, json.loads(specs), json.loads(subdirectories))
+
+    def _dump(self, value):
+        return (
+            value.mtime_ns,
+            json.dumps(value.specs),
+            json.dumps(value.subdirectories),
+            self.settings,
+        )
+
+    def set(self, path, mtime_ns, specs, subdirectories):
+        """
+        Remember what was found in the given directory.
+        """
+        self._changed[path] = Listing(mtime_ns, specs, subdirectories)
@@ -0,0 +1,498 @@
+"""
+Serializable events describing a run of examples.
+
+Events are plain tuples (of strings, numbers and ``None``), which means they
+can be sent across processes or written to disk, and later replayed into a
+real result as though the examples had run locally.
+"""
+
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import TestResult
+import json
+
+import ivoire
+
+#: Identifies (and versions) the first line of a result file.
+_HEADER = {"ivoire-results": 1}
+
+#: Tracebacks longer than this many characters are trimmed in result files.
+TRACEBACK_LIMIT = 20000
+
+
+class Recorder:
+    """
+    A result which records the events it sees rather than showing them.
+
+    Each event is passed along to ``emit`` as soon as it happens.
+    """
+
+    shouldStop = False
+
+    def __init__(self, emit):
+        self.emit = emit
+        self._formatter = TestResult()
+
+    def _example(self, example):
+        group = example.group
+        return None if group is None else str(group), str(example)
+
+    def _traceback(self, example, exc_info):
+        if not isinstance(exc_info, tuple):
+            return str(exc_info)
+        return self._formatter._exc_info_to_string(exc_info, example)
+
+    def enterSpec(self, spec):
+        """
+        Record that a spec is being loaded.
+        """
+        self.emit(("enterSpec", spec))
+
+    def exitSpec(self, spec):
+        """
+        Record that a spec has been loaded.
+        """
+        self.emit(("exitSpec", spec))
+
+    def enterGroup(self, group):
+        """
+        Record that a group was entered.
+        """
+        self.emit(("enterGroup", str(group)))
+
+    def exitGroup(self, group):
+        """
+        Record that a group was exited.
+        """
+        self.emit(("exitGroup", str(group)))
+
+    def enterContext(self, context, depth):
+        """
+        Record that a context was entered.
+        """
+        self.emit(("enterContext", str(context.name), depth))
+
+    def exitContext(self, depth):
+        """
+        Record that a context was exited.
+        """
+        self.emit(("exitContext", depth))
+
+    def startTest(self, example):
+        """
+        Record that an example started.
+        """
+        self.emit(("startTest", *self._example(example)))
+
+    def stopTest(self, example):
+        """
+        Record that an example stopped.
+        """
+        self.emit(("stopTest", *self._example(example)))
+
+    def addError(self, example, exc_info):
+        """
+        Record an example's error, along with its traceback.
+        """
+        traceback = self._traceback(example, exc_info)
+        self.emit(("addError", *self._example(example), traceback))
+
+    def addFailure(self, example, exc_info):
+        """
+        Record an example's failure, along with its traceback.
+        """
+        traceback = self._traceback(example, exc_info)
+        self.emit(("addFailure", *self._example(example), traceback))
+
+    def addSuccess(self, example):
+        """
+        Record that an example succeeded.
+        """
+        self.emit(("addSuccess", *self._example(example)))
+
+    def addSkip(self, example, reason):
+        """
+        Record that an example was skipped, and why.
+        """
+        self.emit(("addSkip", *self._example(example), reason))
+
+    def addTiming(self, example, wall, cpu):
+        """
+        Record how long an example took.
+        """
+        self.emit(("addTiming", *self._example(example), wall, cpu))
+
+    def addLines(self, example, lines):
+        """
+        Record the lines an example ran.
+        """
+        self.emit(("addLines", *self._example(example), lines))
+
+    def addProfile(self, example, rows):
+        """
+        Record an example's profile.
+        """
+        self.emit(("addProfile", *self._example(example), rows))
+
+    def addSamples(self, example, samples):
+        """
+        Record an example's samples.
+        """
+        self.emit(("addSamples", *self._example(example), samples))
+
+    def addImports(self, spec, imports):
+        """
+        Record what a spec imported.
+        """
+        self.emit(("addImports", spec, [list(each) for each in imports]))
+
+
+class Replayer:
+    """
+    Replay recorded events into a result.
+
+    Groups, contexts and examples are replaced by lightweight stand-ins which
+    have the same string representations as the originals, and tracebacks
+    arrive already formatted.
+    """
+
+    def __init__(self, result):
+        self.result = result
+        self._depth = 0
+        self._errored = False
+        self._example = None
+        self._groups = []
+        self._spec = None
+
+    @property
+    def finished(self):
+        """
+        Whether everything which was started has been finished.
+        """
+        return self._spec is None and self._example is None and not (
+            self._groups or self._depth
+        )
+
+    def __call__(self, event):
+        """
+        Replay a single event.
+        """
+        name, *args = event
+        getattr(self, "_" + name)(*args)
+
+    def replay(self, events):
+        """
+        Replay each of the given events in order.
+        """
+        for event in events:
+            self(event)
+
+    def abort(self, traceback):
+        """
+        The events stopped unexpectedly, so record an error and unwind.
+
+        The error is attributed to the example which was running, if there
+        was one, unless it already errored (e.g. by saying why it hung) in
+        which case it's just stopped.
+        """
+        example = self._example
+        if example is None:
+            example = _Example(group=None, name="<not in example>")
+            self.result.addError(example, traceback)
+        else:
+            if not self._errored:
+                self.result.addError(example, traceback)
+            self._stopTest(*example.key)
+
+        while self._depth:
+            self._exitContext(self._depth - 1)
+        while self._groups:
+            self._exitGroup(self._groups[-1].name)
+        if self._spec is not None:
+            self._exitSpec(self._spec)
+
+    def _get_example(self, group, name):
+        example = self._example
+        if example is None or example.key != (group, name):
+            example = _Example(group=group, name=name)
+        return example
+
+    def _enterSpec(self, spec):
+        self._spec = spec
+        enterSpec = getattr(self.result, "enterSpec", None)
+        if enterSpec is not None:
+            enterSpec(spec)
+
+    def _exitSpec(self, spec):
+        self._spec = None
+        exitSpec = getattr(self.result, "exitSpec", None)
+        if exitSpec is not None:
+            exitSpec(spec)
+
+    def _enterGroup(self, name):
+        group = _Named(name)
+        self._groups.append(group)
+        enterGroup = getattr(self.result, "enterGroup", None)
+        if enterGroup is not None:
+            enterGroup(group)
+
+    def _exitGroup(self, name):
+        group = self._groups.pop() if self._groups else _Named(name)
+        exitGroup = getattr(self.result, "exitGroup", None)
+        if exitGroup is not None:
+            exitGroup(group)
+
+    def _enterContext(self, name, depth):
+        self._depth = depth
+        enterContext = getattr(self.result, "enterContext", None)
+        if enterContext is not None:
+            enterContext(_Named(name), depth=depth)
+
+    def _exitContext(self, depth):
+        self._depth = depth
+        exitContext = getattr(self.result, "exitContext", None)
+        if exitContext is not None:
+            exitContext(depth=depth)
+
+    def _startTest(self, group, name):
+        self._errored = False
+        self._example = _Example(group=group, name=name)
+        self.result.startTest(self._example)
+
+    def _stopTest(self, group, name):
+        self.result.stopTest(self._get_example(group, name))
+        self._example = None
+
+    def _addError(self, group, name, traceback):
+        example = self._get_example(group, name)
+        if example is self._example:
+            self._errored = True
+        self.result.addError(example, traceback)
+
+    def _addFailure(self, group, name, traceback):
+        self.result.addFailure(self._get_example(group, name), traceback)
+
+    def _addSuccess(self, group, name):
+        self.result.addSuccess(self._get_example(group, name))
+
+    def _addSkip(self, group, name, reason):
+        self.result.addSkip(self._get_example(group, name), reason)
+
+    def _addTiming(self, group, name, wall, cpu):
+        addTiming = getattr(self.result, "addTiming", None)
+        if addTiming is not None:
+            addTiming(self._get_example(group, name), wall=wall, cpu=cpu)
+
+    def _addLines(self, group, name, lines):
+        addLines = getattr(self.result, "addLines", None)
+        if addLines is not None:
+            addLines(self._get_example(group, name), lines)
+
+    def _addProfile(self, group, name, rows):
+        addProfile = getattr(self.result, "addProfile", None)
+        if addProfile is not None:
+            addProfile(self._get_example(group, name), rows)
+
+    def _addSamples(self, group, name, samples):
+        addSamples = getattr(self.result, "addSamples", None)
+        if addSamples is not None:
+            addSamples(self._get_example(group, name), samples)
+
+    def _addImports(self, spec, imports):
+        addImports = getattr(self.result, "addImports", None)
+        if addImports is not None:
+            addImports(spec, [tuple(each) for each in imports])
+
+
+class Wrapper:
+    """
+    Pass events along to a result, for subclasses to do more with some.
+
+    Anything else is delegated to the result.
+    """
+
+    def __init__(self, result):
+        self.result = result
+
+    def __getattr__(self, attr):
+        return getattr(self.result, attr)
+
+    @contextmanager
+    def running(self):
+        """
+        Do whatever needs doing while the wrapper wraps the current result.
+        """
+        yield self
+
+
+def load_wrapped(Wrapper, load, spec, result, **kwargs):
+    """
+    Load a spec with ``load``, wrapping the current result while it loads.
+
+    The current result is wrapped by a ``Wrapper`` (given any ``kwargs``).
+    """
+    wrapper = Wrapper(ivoire.current_result, **kwargs)
+    ivoire.current_result = ivoire._manager.result = wrapper
+    try:
+        with wrapper.running():
+            load(spec, result)
+    finally:
+        ivoire.current_result = ivoire._manager.result = wrapper.result
+
+
+class Tee:
+    """
+    Pass events along to a result, while also recording them.
+
+    Anything else is delegated to the result.
+    """
+
+    _EVENTS = frozenset(
+        name
+        for name in vars(Recorder)
+        if not name.startswith("_") and name != "shouldStop"
+    )
+
+    def __init__(self, result, recorder):
+        self.result = result
+        self.recorder = recorder
+
+    def __getattr__(self, attr):
+        if attr not in self._EVENTS:
+            return getattr(self.result, attr)
+
+        def event(*args, **kwargs):
+            method = getattr(self.result, attr, None)
+            if method is not None:
+                method(*args, **kwargs)
+            getattr(self.recorder, attr)(*args, **kwargs)
+
+        return event
+
+
+class Writer:
+    """
+    Write events to a result file as they happen.
+
+    The file is made of one JSON line per event (following a header), and is
+    flushed after each spec, so what has already been written is readable
+    even if the run dies partway through.
+    """
+
+    def __init__(self, file):
+        self.file = file
+        self._write(_HEADER)
+
+    def __call__(self, event):
+        """
+        Write an event.
+        """
+        name = event[0]
+        if name in {"addError", "addFailure"}:
+            *event, traceback = event
+            event.append(trim(traceback))
+        self._write(event)
+        if name == "exitSpec":
+            self.file.flush()
+
+    def _write(self, each):
+        self.file.write(json.dumps(each, separators=(",", ":")) + "\n")
+
+
+def trim(traceback, limit=TRACEBACK_LIMIT):
+    """
+    Trim the middle out of a long traceback.
+
+    The start (with the outermost frames) and the end (with the innermost
+    frames and the exception itself) are kept.
+    """
+    if len(traceback) <= limit:
+        return traceback
+    head = limit // 4
+    tail = limit - head - 64  # leaving room for saying what was trimmed
+    trimmed = len(traceback) - head - tail
+    return "".join(
+        [
+            traceback[:head],
+            f"\n    ... ({trimmed} characters trimmed) ...\n",
+            traceback[-tail:],
+        ],
+    )
+
+
+def load(path):
+    """
+    Load the events from a result file.
+
+    Tracebacks aren't kept in memory, they're read back from the file if and
+    when they're shown. A partially written final line (from a run which
+    died) is ignored.
+    """
+    with Path(path).open("rb") as file:
+        if json.loads(file.readline() or "null") != _HEADER:
+            raise ValueError(  # noqa: TRY003
+                f"{path} is not an Ivoire result file.",
+            )
+
+        while True:
+            offset, line = file.tell(), file.readline()
+            try:
+                event = json.loads(line)
+            except ValueError:
+                return
+            if event[0] in {"addError", "addFailure"}:
+                event[-1] = _StoredTraceback(path=path, offset=offset)
+            yield tuple(event)
+
+
+class _StoredTraceback:
+    """
+    A traceback in a result file, read back only when needed.
+    """
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.path}@{self.offset}>"
+
+    def __str__(self):
+        with Path(self.path).open("rb") as file:
+            file.seek(self.offset)
+            *_, traceback = json.loads(file.readline())
+        return traceback
+
+
+class _Named:
+    """
+    A stand-in for a group or context which only knows its name.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self}>"
+
+    def __str__(self):
+        return self.name
+
+
+class _Example:
+    """
+    A stand-in for an example which ran somewhere else.
+    """
+
+    failureException = None
+
+    def __init__(self, group, name):
+        self.group = None if group is None else _Named(group)
+        self.key = group, name
+        self.name = name
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self}>"
+
+    def __str__(self):
+        return self.name
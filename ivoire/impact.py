@@ -0,0 +1,155 @@
+"""
+Record which lines each example runs, to find the examples a change impacts.
+
+Recording uses ``sys.monitoring`` (and so needs Python 3.12 or newer). Each
+line calls back only the first time it runs in an example, after which it's
+disabled until the next example starts, so recording costs about one call
+per distinct line each example runs.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any
+import re
+import sys
+
+from ivoire.events import Wrapper
+from ivoire.imports import absolute, project_file
+
+monitoring: Any = getattr(sys, "monitoring", None)
+_DISABLE = getattr(monitoring, "DISABLE", None)
+
+_HUNK = re.compile(r"@@ -(\d+)(?:,(\d+))? \+\d+(?:,(\d+))? @@")
+
+
+class Recording(Wrapper):
+    """
+    Pass events along to a result, recording the lines each example runs.
+
+    The lines (of project files) are passed along to the result's
+    ``addLines`` just before each example stops.
+    """
+
+    def __init__(self, result):
+        super().__init__(result)
+        self._files = {}
+        self._lines = defaultdict(set)
+        self._tool = None
+
+    def _line(self, code, line):
+        self._lines[code.co_filename].add(line)
+        return _DISABLE
+
+    @contextmanager
+    def running(self):
+        """
+        Monitor which lines run within the block (while examples run).
+        """
+        self._tool = _free_tool()
+        monitoring.use_tool_id(self._tool, "ivoire")
+        monitoring.register_callback(
+            self._tool,
+            monitoring.events.LINE,
+            self._line,
+        )
+        monitoring.set_events(self._tool, monitoring.events.LINE)
+        try:
+            yield self
+        finally:
+            monitoring.set_events(self._tool, monitoring.events.NO_EVENTS)
+            monitoring.register_callback(
+                self._tool,
+                monitoring.events.LINE,
+                None,
+            )
+            monitoring.free_tool_id(self._tool)
+            self._tool = None
+
+    def startTest(self, example):
+        """
+        Start recording the lines the example runs afresh.
+        """
+        self.result.startTest(example)
+        self._lines.clear()
+        monitoring.restart_events()
+
+    def stopTest(self, example):
+        """
+        Pass along the lines the example ran, before it stops.
+        """
+        addLines = getattr(self.result, "addLines", None)
+        if addLines is not None:
+            # Lines keep being recorded (into a fresh set) while this runs.
+            lines, self._lines = self._lines, defaultdict(set)
+            addLines(example, self._by_file(lines))
+        self.result.stopTest(example)
+
+    def _by_file(self, lines):
+        """
+        The lines of project files which ran, sorted, by absolute path.
+        """
+        by_file = {}
+        for filename, each in lines.items():
+            path = self._files.get(filename, filename)
+            if path is filename:
+                path = self._files[filename] = project_file(filename)
+            if path is not None:
+                by_file[path] = sorted(each)
+        return by_file
+
+
+def parse_diff(diff):
+    """
+    Find the lines a unified diff changes, in the files as they were before.
+
+    Removed lines are changed, as are the lines on either side of where any
+    were added (other than in place of removed ones). Paths are made absolute
+    (relative to the current directory, after stripping the ``a/`` which git
+    adds to them).
+    """
+    changed = defaultdict(set)
+    lines, line, old, new, removing = set(), 0, 0, 0, False
+    for each in diff:
+        if old > 0 or new > 0:
+            if each.startswith("-"):
+                lines.add(line)
+                line, old, removing = line + 1, old - 1, True
+            elif each.startswith("+"):
+                if not removing:
+                    lines.update({line - 1, line})
+                new -= 1
+            elif not each.startswith("\\"):  # i.e. "\ No newline at end"
+                line, old, new = line + 1, old - 1, new - 1
+                removing = False
+        elif each.startswith("--- "):
+            path = each[4:].rstrip("\n").split("\t")[0]
+            if path == "/dev/null":
+                lines = set()
+                continue
+            lines = changed[absolute(path.removeprefix("a/"))]
+        elif each.startswith("@@"):
+            start, old, new = _HUNK.match(each).groups()
+            start, old, new = int(start), int(old or 1), int(new or 1)
+            # Hunks which only add lines start from the line they follow.
+            line = start if old else start + 1
+            removing = False
+    return {path: lines for path, lines in changed.items() if lines}
+
+
+def _free_tool():
+    """
+    A ``sys.monitoring`` tool ID which nothing else is using.
+
+    The IDs reserved for debuggers, coverage tools, profilers and optimizers
+    are left to them.
+    """
+    reserved = {
+        monitoring.DEBUGGER_ID,
+        monitoring.COVERAGE_ID,
+        monitoring.PROFILER_ID,
+        monitoring.OPTIMIZER_ID,
+    }
+    for each in range(6):
+        if each not in reserved and monitoring.get_tool(each) is None:
+            return each
+    raise RuntimeError("No sys.monitoring tool IDs are free.")  # noqa: TRY003
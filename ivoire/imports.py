@@ -0,0 +1,245 @@
+"""
+Record which files import which others while specs are loaded.
+
+The resulting graph says which specs depend (however indirectly) on which
+source files, so that only the specs affected by a change need to be run.
+"""
+
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from importlib.util import resolve_name
+from pathlib import Path
+import builtins
+import importlib
+import os
+import sys
+import sysconfig
+import threading
+
+#: Files under these directories (the standard library and installed
+#: packages) aren't part of the project, so aren't recorded.
+_NOT_PROJECT = tuple(
+    f"{Path(path).absolute()}{os.sep}"
+    for name, path in sysconfig.get_paths().items()
+    if name in {"stdlib", "platstdlib", "purelib", "platlib"}
+)
+
+
+class Graph:
+    """
+    Which (project) files import which others.
+
+    Files are identified by their absolute paths. Files which have been
+    ``recorded`` are known to import only what the graph says they do, even
+    if that's nothing at all.
+    """
+
+    def __init__(self, imports=(), recorded=()):
+        self.imports = defaultdict(set)
+        for path in recorded:
+            self.imports[path] = set()
+        self.update(imports)
+
+    def __contains__(self, path):
+        """
+        Whether what the given file imports has been recorded.
+        """
+        return absolute(path) in self.imports
+
+    def __iter__(self):
+        """
+        Each (importer, imported) pair of files.
+        """
+        for importer, imported in self.imports.items():
+            for each in imported:
+                yield importer, each
+
+    def update(self, imports):
+        """
+        Add some (importer, imported) pairs of files.
+        """
+        for importer, imported in imports:
+            self.imports[importer].add(imported)
+
+    def files(self):
+        """
+        All of the files in the graph.
+        """
+        files = set(self.imports)
+        files.update(*self.imports.values())
+        return files
+
+    def dependencies(self, path):
+        """
+        Every file which the given file imports, directly or not.
+        """
+        return _closure(self.imports, [absolute(path)])
+
+    def dependents(self, paths):
+        """
+        Every file which imports any of the given files, directly or not.
+        """
+        importers = defaultdict(set)
+        for importer, imported in self:
+            importers[imported].add(importer)
+        return _closure(importers, [absolute(path) for path in paths])
+
+    def chain(self, path, paths):
+        """
+        The shortest chain of imports from the given file to any of ``paths``.
+
+        The chain starts with the given file and ends with whichever of the
+        others it reaches, or is ``None`` if it reaches none of them.
+        """
+        path = absolute(path)
+        paths = {absolute(each) for each in paths}
+        previous, pending = {path: None}, deque([path])
+        while pending:
+            each = pending.popleft()
+            if each in paths:
+                chain = []
+                while each is not None:
+                    chain.append(each)
+                    each = previous[each]
+                return chain[::-1]
+            for imported in sorted(self.imports.get(each, ())):
+                if imported not in previous:
+                    previous[imported] = each
+                    pending.append(imported)
+        return None
+
+    def forget(self, paths):
+        """
+        Forget what the given files import (e.g. because they've changed).
+        """
+        for path in paths:
+            self.imports.pop(absolute(path), None)
+
+    @contextmanager
+    def recording(self):
+        """
+        Record the imports made by import statements run within the block.
+
+        Calls to ``importlib.import_module`` are recorded too. Modules which
+        were already imported are still recorded as imported, but what they
+        themselves import is only recorded when they first run. Only imports
+        made by the current thread are recorded.
+        """
+        previous = getattr(_recording, "graph", None)
+        _recording.graph = self
+        with _hooked:
+            try:
+                yield self
+            finally:
+                _recording.graph = previous
+
+
+class _Hook:
+    """
+    Hook imports for as long as any thread is recording them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._originals = None
+        self._users = 0
+
+    def __enter__(self):
+        with self._lock:
+            if not self._users:
+                self._originals = builtins.__import__, importlib.import_module
+                builtins.__import__ = self._import
+                importlib.import_module = self._import_module
+            self._users += 1
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self._lock:
+            self._users -= 1
+            if not self._users:
+                builtins.__import__, importlib.import_module = self._originals
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original, _ = self._originals
+        module = original(name, globals, locals, fromlist, level)
+        _record(globals, _imported(name, globals, fromlist, level))
+        return module
+
+    def _import_module(self, name, package=None):
+        _, original = self._originals
+        module = original(name, package)
+        importer = sys._getframe(1).f_globals
+        _record(importer, _imported(module.__name__, importer, (), 0))
+        return module
+
+
+_hooked = _Hook()
+_recording = threading.local()
+
+
+def _record(globals, imported):
+    """
+    Record that the file with the given globals imported some files.
+    """
+    graph = getattr(_recording, "graph", None)
+    importer = project_file((globals or {}).get("__file__"))
+    if graph is not None and importer is not None:
+        for each in imported:
+            if each != importer:
+                graph.imports[importer].add(each)
+
+
+def _imported(name, globals, fromlist, level):
+    """
+    The project files an import statement imported.
+
+    That's the module imported along with any packages it is inside of and
+    any submodules imported from it.
+    """
+    if level:
+        name = resolve_name("." * level + name, globals.get("__package__"))
+
+    parts = name.split(".")
+    names = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+    names.extend(f"{name}.{each}" for each in fromlist or () if each != "*")
+
+    for each in names:
+        module = sys.modules.get(each)
+        path = project_file(getattr(module, "__file__", None))
+        if path is not None:
+            yield path
+
+
+def project_file(path):
+    """
+    The absolute path to a file, or ``None`` if it isn't part of the project.
+
+    Files in the standard library or in installed packages aren't, nor is
+    code which didn't come from a file (e.g. ``<string>``).
+    """
+    if path is None or path.startswith("<"):
+        return None
+    path = absolute(path)
+    if path.startswith(_NOT_PROJECT):
+        return None
+    return path
+
+
+def absolute(path):
+    """
+    The absolute path to a file, which is how files are known in the graph.
+
+    Symlinks aren't resolved (as ``Path.resolve`` would), both so that paths
+    match modules' ``__file__`` and because this is called on every import.
+    """
+    return os.path.abspath(path)  # noqa: PTH100
+
+
+def _closure(edges, start):
+    seen, pending = set(), list(start)
+    while pending:
+        each = pending.pop()
+        for other in edges.get(each, ()):
+            if other not in seen:
+                seen.add(other)
+                pending.append(other)
+    return seen
@@ -0,0 +1,135 @@
+"""
+A static index of the examples in specs, built without importing them.
+
+Specs are parsed (not run), and the ``describe``, ``context`` and ``it``
+blocks found in them are collected into a tree of groups, contexts and
+examples, along with where each is defined.
+"""
+
+from pathlib import Path
+import ast
+import hashlib
+
+
+def index_source(source, filename="<unknown>"):
+    """
+    Index the groups, contexts and examples defined in some source code.
+
+    Names which aren't known until the spec is run (e.g. those built with an
+    f-string) are ``None``.
+    """
+    tree = ast.parse(source, filename=filename)
+    return list(_Indexer().children(tree.body, group_variable=None))
+
+
+def index_file(path, cache=None):
+    """
+    Index a spec file, using (and updating) a cache if given.
+
+    The cache is used if the file's modification time and size are unchanged
+    or, failing that, if its contents hash to the same thing.
+    """
+    path = Path(path)
+    stat = path.stat()
+
+    cached = None if cache is None else cache.get(str(path))
+    if cached is not None and cached.matches(stat):
+        return cached.contents
+
+    source = path.read_bytes()
+    digest = hashlib.sha256(source).hexdigest()
+    if cached is not None and cached.digest == digest:
+        index = cached.contents
+    else:
+        try:
+            index = {"children": index_source(source, filename=str(path))}
+        except SyntaxError as error:
+            index = {"error": f"{error.__class__.__name__}: {error}"}
+
+    if cache is not None:
+        cache.set(str(path), stat=stat, digest=digest, index=index)
+    return index
+
+
+class _Indexer:
+    """
+    Walk a spec's syntax tree, yielding what it defines.
+    """
+
+    def children(self, body, group_variable):
+        for node in body:
+            if isinstance(node, (ast.With, ast.AsyncWith)):
+                yield from self.with_(node, group_variable)
+            else:
+                yield from self.nested(node, group_variable)
+
+    def nested(self, node, group_variable):
+        """
+        Look inside compound statements (``if``, ``for``, ...) too.
+        """
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return
+        for field in "body", "orelse", "finalbody", "handlers":
+            yield from self.children(
+                getattr(node, field, ()),
+                group_variable,
+            )
+
+    def with_(self, node, group_variable):
+        for item in node.items:
+            call = item.context_expr
+            if not isinstance(call, ast.Call):
+                continue
+
+            function = _name_of(call.func)
+            argument = call.args[0] if call.args else None
+            variable = _name_of(item.optional_vars)
+
+            if function == "describe" and argument is not None:
+                yield self.node(
+                    "group",
+                    _name_of(argument),
+                    node,
+                    self.children(node.body, group_variable=variable),
+                )
+                return
+            if function == "context" and argument is not None:
+                yield self.node(
+                    "context",
+                    _name_of(argument),
+                    node,
+                    self.children(node.body, group_variable),
+                )
+                return
+            if group_variable is not None and function == group_variable:
+                name = argument.value if _is_string(argument) else None
+                yield self.node("example", name, node)
+                return
+
+        yield from self.children(node.body, group_variable)
+
+    def node(self, kind, name, node, children=None):
+        indexed = {"kind": kind, "name": name, "line": node.lineno}
+        if children is not None:
+            indexed["children"] = list(children)
+        return indexed
+
+
+def _name_of(node):
+    """
+    The name a node would have at runtime, if it can be known statically.
+
+    Described objects and contexts are named by their ``__name__`` (the last
+    part of a dotted name), and examples and contexts can also be strings.
+    """
+    if _is_string(node):
+        return node.value
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def _is_string(node):
+    return isinstance(node, ast.Constant) and isinstance(node.value, str)
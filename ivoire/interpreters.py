@@ -0,0 +1,216 @@
+"""
+Run specs in parallel across a pool of subinterpreters.
+
+Each subinterpreter has its own GIL (and its own copy of every module), and
+runs one spec at a time, writing the events for its examples as JSON lines to
+a pipe. They're replayed into the real result once the spec is done, so that
+output looks just as it would for a run in a single interpreter.
+
+Specs which import extension modules that can't be loaded in subinterpreters
+are handed back, so that they can be run in worker processes instead.
+
+Subinterpreters need Python 3.13 or newer (3.12's crash when destroyed after
+importing some extension modules, e.g. ``hashlib``).
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import json
+import os
+import pickle
+import queue
+import sys
+import threading
+
+from ivoire.events import Replayer
+
+try:
+    from concurrent import (  # type: ignore[attr-defined]
+        interpreters as _concurrent,
+    )
+except ImportError:
+    _concurrent = None
+try:
+    import _interpreters  # type: ignore[import-not-found]
+except ImportError:
+    _interpreters = None
+
+#: Whether subinterpreters can be used.
+available = _concurrent is not None or _interpreters is not None
+
+#: The message of the error importing an extension module which can't be
+#: loaded in subinterpreters.
+UNSUPPORTED = "does not support loading in subinterpreters"
+
+_SETUP = """
+import json, pickle, sys
+from ivoire.events import Recorder
+import ivoire
+
+sys.path[:] = {path!r}
+_events = open({write}, "w", closefd=False)
+_recorder = Recorder(
+    emit=lambda event: _events.write(json.dumps(event) + "\\n"),
+)
+_load = pickle.loads({load!r})
+
+
+def _run(spec):
+    # The result is per thread, and each spec may run in a different one.
+    ivoire.current_result = ivoire._manager.result = _recorder
+    try:
+        _load(spec, _recorder)
+    finally:
+        _events.write("null\\n")
+        _events.flush()
+"""
+
+
+def run(specs, result, interpreters, load):
+    """
+    Run the given specs on ``interpreters`` subinterpreters, into ``result``.
+
+    ``load`` is pickled, and called (in a subinterpreter) with each spec and
+    the subinterpreter's result, and should load the spec.
+
+    Returns the specs which can't be run in a subinterpreter, since they
+    import extension modules which don't support it.
+    """
+    pending, unsupported = deque(specs), []
+    idle = [_Worker(load) for _ in range(min(interpreters, len(pending)))]
+    running = {}
+
+    with ThreadPoolExecutor(max_workers=len(idle) or 1) as executor:
+        try:
+            while pending or running:
+                while idle and pending and not result.shouldStop:
+                    worker, spec = idle.pop(), pending.popleft()
+                    future = executor.submit(worker.run, spec)
+                    running[future] = worker, spec
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    worker, spec = running.pop(future)
+                    idle.append(worker)
+
+                    events, error = future.result()
+                    if _unsupported(events, error):
+                        unsupported.append(spec)
+                        continue
+
+                    replayer = Replayer(result)
+                    replayer.replay(events)
+                    if error is not None:
+                        replayer.abort(
+                            f"Subinterpreter crashed while running {spec}.\n"
+                            f"{error}\n",
+                        )
+        finally:
+            for future in running:
+                future.cancel()
+            wait(running)
+            for worker, _ in running.values():
+                idle.append(worker)
+            for worker in idle:
+                worker.close()
+
+    return unsupported
+
+
+class _Worker:
+    """
+    A subinterpreter, along with a pipe it sends the events of each spec over.
+    """
+
+    def __init__(self, load):
+        read, self._write = os.pipe()
+        self._events = queue.SimpleQueue()
+        self._receiver = threading.Thread(
+            target=self._receive,
+            args=(read,),
+            daemon=True,
+        )
+        self._receiver.start()
+
+        self._interpreter = _Subinterpreter()
+        error = self._interpreter.exec(
+            _SETUP.format(
+                path=sys.path,
+                write=self._write,
+                load=pickle.dumps(load),
+            ),
+        )
+        if error is not None:
+            self.close()
+            raise RuntimeError(  # noqa: TRY003
+                f"Couldn't set up a subinterpreter:\n{error}",
+            )
+
+    def _receive(self, read):
+        with os.fdopen(read) as lines:
+            for line in lines:
+                self._events.put(json.loads(line))
+
+    def run(self, spec):
+        """
+        Run a spec, returning its events and the error it crashed with (if so).
+        """
+        error = self._interpreter.exec(f"_run({spec!r})")
+        return list(iter(self._events.get, None)), error
+
+    def close(self):
+        """
+        Destroy the subinterpreter.
+        """
+        self._interpreter.close()
+        os.close(self._write)
+        self._receiver.join()
+
+
+class _Subinterpreter:
+    """
+    A subinterpreter with its own GIL.
+    """
+
+    def __init__(self):
+        if _concurrent is not None:
+            self._interpreter = _concurrent.create()
+        else:
+            config = _interpreters.new_config("isolated")
+            self._interpreter = _interpreters.create(config)
+
+    def exec(self, code):
+        """
+        Run some code, returning the traceback of any exception it raises.
+        """
+        if _concurrent is not None:
+            try:
+                self._interpreter.exec(code)
+            except _concurrent.ExecutionFailed as failed:
+                return failed.excinfo.errdisplay
+            return None
+        error = _interpreters.exec(self._interpreter, code)
+        return None if error is None else error.errdisplay
+
+    def close(self):
+        """
+        Destroy the subinterpreter.
+        """
+        if _concurrent is not None:
+            self._interpreter.close()
+        else:
+            _interpreters.destroy(self._interpreter)
+
+
+def _unsupported(events, error):
+    """
+    Whether a spec imported an extension module which subinterpreters can't.
+    """
+    if error is not None and UNSUPPORTED in error:
+        return True
+    return any(
+        event[0] == "addError" and UNSUPPORTED in event[-1]
+        for event in events
+    )
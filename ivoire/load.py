@@ -2,49 +2,218 @@
 Loaders for Ivoire specs.
 """
 
+from contextlib import nullcontext
 from importlib.machinery import SourceFileLoader
 from pathlib import Path
 from types import ModuleType
+import ast
+import asyncio
 import fnmatch
+import inspect
 import os
+import re
+import time
 
+#: The filenames of specs.
+DEFAULT_PATTERNS = ("*_spec.py",)
 
-def load_by_name(name):
+#: Directories which are never worth looking for specs in.
+DEFAULT_EXCLUDE = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    ".ivoire_cache",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    "__pycache__",
+    "node_modules",
+    "*.egg-info",
+)
+
+_SETTLED_NS = 2 * 10**9
+_VIRTUALENV_MARKER = "pyvenv.cfg"
+
+
+class SpecLoader(SourceFileLoader):
+    """
+    A source loader for spec files, which may ``await`` at their top level.
+
+    Specs which do (e.g. to use ``async with``) are run on an event loop of
+    their own, which every example in the spec shares. Their bytecode isn't
+    cached, since a plain import (which would find it cached alongside the
+    spec) would run it as a coroutine which nothing awaits.
+    """
+
+    _awaits = False
+
+    def source_to_code(self, data, path, *, _optimize=-1):
+        """
+        Compile the spec, allowing top-level ``await``.
+        """
+        code = compile(
+            data,
+            path,
+            "exec",
+            flags=ast.PyCF_ALLOW_TOP_LEVEL_AWAIT,
+            dont_inherit=True,
+            optimize=_optimize,
+        )
+        self._awaits = bool(code.co_flags & inspect.CO_COROUTINE)
+        return code
+
+    def set_data(self, path, data, **kwargs):
+        """
+        Cache the spec's bytecode, unless it awaits at its top level.
+        """
+        if not self._awaits:
+            super().set_data(path, data, **kwargs)
+
+    def exec_module(self, module):
+        """
+        Run the spec, on an event loop if it awaits anything.
+        """
+        code = self.get_code(module.__name__)
+        running = eval(code, vars(module))  # noqa: S307
+        if inspect.iscoroutine(running):
+            asyncio.run(running)
+
+
+def load_by_name(name, imports=None):
     """
     Load a spec from either a file path or a fully qualified name.
+
+    If an ``imports`` graph (see ``ivoire.imports``) is given, what the spec
+    imports is recorded in it.
     """
     if Path(name).exists():
-        load_from_path(name)
+        load_from_path(name, imports=imports)
     else:
-        __import__(name)
+        with nullcontext() if imports is None else imports.recording():
+            __import__(name)
 
 
-def load_from_path(path):
+def load_from_path(path, imports=None):
     """
     Load a spec from a given path, discovering specs if a directory is given.
+
+    Specs loaded by path may ``await`` at their top level (see ``SpecLoader``).
+
+    If an ``imports`` graph (see ``ivoire.imports``) is given, what each spec
+    imports is recorded in it.
     """
     paths = discover(path) if Path(path).is_dir() else [path]
 
     for each in paths:
         name = Path(each).stem
-        loader = SourceFileLoader(name, each)
-        loader.exec_module(ModuleType(loader.name))
+        loader = SpecLoader(name, each)
+        module = ModuleType(loader.name)
+        module.__file__ = each
+        with nullcontext() if imports is None else imports.recording():
+            loader.exec_module(module)
 
 
-def filter_specs(paths):
+def filter_specs(paths, patterns=DEFAULT_PATTERNS):
     """
     Filter out only the specs from the given (flat iterable of) paths.
     """
-    return fnmatch.filter(paths, "*_spec.py")
+    return [
+        path
+        for path in paths
+        if any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+    ]
 
 
-def discover(path, filter_specs=filter_specs):
+def discover(
+    path,
+    filter_specs=filter_specs,
+    exclude=DEFAULT_EXCLUDE,
+    index=None,
+):
     """
     Discover all of the specs recursively inside ``path``.
 
-    Successively yields the (full) relative paths to each spec.
+    Successively yields the (full) relative paths to each spec, in order.
+
+    Directories (and files) whose names (or paths) match any of the
+    ``exclude`` globs are skipped, as are virtualenvs. If an ``index`` (see
+    ``ivoire.cache.Directories``) is given, directories which haven't been
+    modified since they were last listed aren't listed again.
+    """
+    # Paths are joined as strings, which is much cheaper than via ``Path``s
+    # when there are lots of them.
+    excluded = _compile(exclude)
+    pending = [os.fspath(path)]
+    while pending:
+        directory = pending.pop()
+        specs, subdirectories = _list(directory, filter_specs, excluded, index)
+        for spec in specs:
+            yield os.path.join(directory, spec)  # noqa: PTH118
+        pending.extend(
+            os.path.join(directory, subdirectory)  # noqa: PTH118
+            for subdirectory in reversed(subdirectories)
+        )
+
+
+def expand(names, discover=discover):
+    """
+    Expand any directories among the given spec names into their specs.
+    """
+    for name in names:
+        if Path(name).is_dir():
+            yield from discover(name)
+        else:
+            yield name
+
+
+def _list(directory, filter_specs, excluded, index):
+    """
+    List the specs and subdirectories (to search) in the given directory.
+    """
+    if index is not None:
+        try:
+            mtime_ns = Path(directory).stat().st_mtime_ns
+        except OSError:
+            return [], []
+        listing = index.get(directory)
+        if listing is not None and listing.mtime_ns == mtime_ns:
+            return listing.specs, listing.subdirectories
+
+    files, subdirectories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if excluded(entry.name) or excluded(entry.path):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.name)
+                elif entry.is_file():
+                    files.append(entry.name)
+    except OSError:
+        return [], []
+
+    if _VIRTUALENV_MARKER in files:
+        specs, subdirectories = [], []
+    else:
+        specs = filter_specs(sorted(files))
+        subdirectories.sort()
+
+    # A directory modified in the same instant as we list it could change
+    # again without its mtime changing, so only remember settled ones.
+    if index is not None and time.time_ns() - mtime_ns > _SETTLED_NS:
+        index.set(directory, mtime_ns, specs, subdirectories)
+    return specs, subdirectories
+
+
+def _compile(globs):
+    """
+    Compile some globs into one function matching any of them.
     """
-    for dirpath, _, filenames in os.walk(path):
-        dirpath = Path(dirpath)
-        for spec in filter_specs(filenames):
-            yield os.fspath(dirpath / spec)
+    if not globs:
+        return lambda name: False
+    pattern = "|".join(fnmatch.translate(os.path.normcase(g)) for g in globs)
+    match = re.compile(pattern).match
+    return lambda name: match(os.path.normcase(name)) is not None
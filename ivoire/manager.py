@@ -2,15 +2,43 @@
 Context support for Ivoire contexts.
 """
 
+from types import SimpleNamespace
+import sys
+import threading
 
-class ContextManager:
+
+class ContextManager(threading.local):
     """
     A context manager.
+
+    Each thread has its own contexts, result, selection and default timeout,
+    so that specs can be run in several threads at once.
     """
 
-    def __init__(self, result=None):
-        self.context_depth = 0
+    def __init__(self, result=None, select=None, timeout=None):
+        self.contexts = []
         self.result = result
+        self.select = select
+        self.timeout = timeout
+
+    @property
+    def context_depth(self):
+        """
+        How many contexts deep we are.
+        """
+        return len(self.contexts)
+
+    def selects(self, example):
+        """
+        Whether the given example (about to run in the current contexts) runs.
+
+        Examples are selected by calling ``select`` with their name path --
+        the names of their group, the contexts they're in, and their own.
+        """
+        if self.select is None:
+            return True
+        contexts = (str(context) for context in self.contexts)
+        return self.select((str(example.group), *contexts, str(example)))
 
     def create_context(self, for_target):
         """
@@ -23,7 +51,7 @@ class ContextManager:
         """
         Enter a given context.
         """
-        self.context_depth += 1
+        self.contexts.append(context)
 
         enterContext = getattr(self.result, "enterContext", None)
         if enterContext is not None:
@@ -33,14 +61,95 @@ class ContextManager:
         """
         Exit the last context.
         """
-        self.context_depth -= 1
+        self.contexts.pop()
 
         exitContext = getattr(self.result, "exitContext", None)
         if exitContext is not None:
             exitContext(depth=self.context_depth)
 
 
-class Context:  # noqa: PLW1641
+class Scope:
+    """
+    Something examples run within, with hooks run just once for all of them.
+
+    Attributes set by a ``before_all`` hook (on the object it is passed) are
+    set on each example in the scope, and the same object is passed to the
+    ``after_all`` hook.
+    """
+
+    _before_all = _after_all = None
+    _error = _state = None
+
+    def before_all(self, fn):
+        """
+        Run the given function once, before the first example in the scope.
+
+        If it errors, the error is reported for every example in the scope,
+        none of which will be run.
+        """
+        self._before_all = fn
+
+    def after_all(self, fn):
+        """
+        Run the given function once, after all examples in the scope.
+
+        It is run only if the ``before_all`` function was (successfully).
+        """
+        self._after_all = fn
+
+    def set_up(self, example):
+        """
+        Set up an example which is about to run in this scope.
+
+        Returns the ``exc_info`` of the ``before_all`` hook if it failed.
+        """
+        if self._state is None:
+            self._state = SimpleNamespace()
+            if self._before_all is not None:
+                try:
+                    self._before_all(self._state)
+                except Exception:
+                    self._error = sys.exc_info()
+
+        if self._error is None:
+            vars(example).update(vars(self._state))
+        return self._error
+
+    def tear_down(self, result):
+        """
+        Run the ``after_all`` hook if the scope was set up.
+
+        Any error is recorded to the given result.
+        """
+        state, self._state = self._state, None
+        error, self._error = self._error, None
+        if state is None or error is not None or self._after_all is None:
+            return
+
+        try:
+            self._after_all(state)
+        except Exception:
+            if result is None:
+                raise
+            result.addError(_AfterAll(self), sys.exc_info())
+
+
+class _AfterAll:
+    """
+    An ``after_all`` hook errored. Mimic an Example object.
+    """
+
+    failureException = None
+    group = None
+
+    def __init__(self, scope):
+        self.scope = scope
+
+    def __str__(self):
+        return f"<after all: {self.scope}>"
+
+
+class Context(Scope):  # noqa: PLW1641
     """
     An individual context.
     """
@@ -57,14 +166,19 @@ class Context:  # noqa: PLW1641
     def __ne__(self, other):
         return not self == other
 
+    def __str__(self):
+        return str(self.name)
+
     def __enter__(self):
         """
         Enter the context.
         """
         self.manager.enter(self)
+        return self
 
     def __exit__(self, exc_type, exc_value, traceback):
         """
         Exit the context.
         """
+        self.tear_down(self.manager.result)
         self.manager.exit()
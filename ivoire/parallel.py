@@ -0,0 +1,165 @@
+"""
+Run specs in parallel across a pool of worker processes.
+
+Workers are handed one spec at a time, and stream the events for the examples
+in it back to the parent process, which replays them into its result, so that
+output looks just as it would for a run in a single process.
+"""
+
+from collections import deque
+from contextlib import suppress
+from multiprocessing.connection import wait
+import multiprocessing
+import signal
+
+from ivoire.events import Recorder, Replayer
+import ivoire
+
+_DONE = None
+
+
+def run(specs, result, jobs, load, *, context=None, specs_per_worker=None):
+    """
+    Run the given specs on ``jobs`` worker processes, recording to ``result``.
+
+    ``load`` is called (in a worker) with each spec and the worker's result,
+    and should load the spec.
+
+    Workers are started using the given ``multiprocessing`` context (or the
+    default one). If ``specs_per_worker`` is given, each worker is replaced
+    by a fresh one once it has run that many specs.
+    """
+    pending = deque(specs)
+    if context is None:
+        context = multiprocessing.get_context()
+    workers = [
+        _Worker(context=context, load=load)
+        for _ in range(min(jobs, len(pending)))
+    ]
+
+    try:
+        for worker in workers:
+            worker.assign(pending.popleft())
+
+        while any(worker.spec is not None for worker in workers):
+            busy = {}
+            for worker in workers:
+                if worker.spec is not None:
+                    busy[worker.connection] = busy[worker.sentinel] = worker
+
+            for ready in wait(busy):
+                worker = busy[ready]
+                if worker.spec is None or not worker.receive():
+                    continue
+
+                replayer = Replayer(result)
+                replayer.replay(worker.events)
+
+                if worker.crash is not None:
+                    replayer.abort(worker.crash)
+                    worker.stop()
+                    worker = _Worker(context=context, load=load)
+                    workers[workers.index(busy[ready])] = worker
+                elif pending and worker.ran == specs_per_worker:
+                    worker.stop()
+                    worker = _Worker(context=context, load=load)
+                    workers[workers.index(busy[ready])] = worker
+
+                if result.shouldStop or not pending:
+                    worker.spec = None
+                else:
+                    worker.assign(pending.popleft())
+
+            if result.shouldStop:
+                break
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+class _Worker:
+    """
+    A worker process, along with the events it has sent for its current spec.
+    """
+
+    def __init__(self, context, load):
+        self.connection, theirs = context.Pipe()
+        self.process = context.Process(
+            target=_work,
+            args=(theirs, load),
+            daemon=True,
+        )
+        self.process.start()
+        theirs.close()
+
+        self.crash = None
+        self.events = []
+        self.ran = 0
+        self.sentinel = self.process.sentinel
+        self.spec = None
+
+    def assign(self, spec):
+        """
+        Hand the worker a spec to run.
+        """
+        self.crash = None
+        self.events = []
+        self.ran += 1
+        self.spec = spec
+        self.connection.send(spec)
+
+    def is_alive(self):
+        """
+        Whether the worker process is still running.
+        """
+        return self.process.is_alive()
+
+    def receive(self):
+        """
+        Receive an event from the worker, returning whether it's done.
+
+        If the worker died rather than finishing its spec, ``crash`` is set to
+        a description of what happened.
+        """
+        try:
+            event = self.connection.recv()
+        except (EOFError, OSError):
+            self.process.join()
+            self.crash = (
+                f"Worker process exited with code {self.process.exitcode} "
+                f"while running {self.spec}.\n"
+            )
+            return True
+
+        if event is _DONE:
+            return True
+        self.events.append(event)
+        return False
+
+    def stop(self):
+        """
+        Stop the worker process.
+        """
+        self.spec = None
+        if self.is_alive():
+            with suppress(OSError):
+                self.connection.send(_DONE)
+            self.process.join(timeout=1)
+            if self.is_alive():
+                self.process.terminate()
+        self.connection.close()
+
+
+def _work(connection, load):
+    """
+    Run specs sent over the given connection until told to stop.
+    """
+    # The parent handles interrupts and will stop us.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    result = Recorder(emit=connection.send)
+    ivoire.current_result = ivoire._manager.result = result
+
+    for spec in iter(connection.recv, _DONE):
+        load(spec, result)
+        connection.send(_DONE)
@@ -0,0 +1,189 @@
+"""
+Profile each example, to find where the time a run takes goes.
+
+Each example is profiled (with ``cProfile``) from when it starts until it
+stops, which includes its ``before`` and ``after`` hooks. Profiles are passed
+along to the result as rows of plain values (so that they can be sent across
+processes), and merged there by group and for the whole run.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import cProfile
+import heapq
+import marshal
+import pstats
+import re
+import time
+
+from ivoire.events import Wrapper
+import ivoire
+
+#: How many of the examples which spent longest in each function are shown.
+EXAMPLES_PER_HOTSPOT = 3
+
+_IVOIRE = str(Path(ivoire.__file__).parent)
+_UNSAFE = re.compile(r"[^\w.-]+")
+
+
+class Profiling(Wrapper):
+    """
+    Pass events along to a result, profiling each example.
+
+    The profile is passed along to the result's ``addProfile`` just before
+    each example stops, unless the example took less than ``slower_than``
+    seconds.
+    """
+
+    def __init__(self, result, slower_than=None):
+        super().__init__(result)
+        self.slower_than = slower_than
+        self._profiler = None
+
+    def startTest(self, example):
+        """
+        Start profiling the example.
+        """
+        self.result.startTest(example)
+        self._started = time.perf_counter()
+        self._profiler = cProfile.Profile()
+        self._profiler.enable()
+
+    def stopTest(self, example):
+        """
+        Pass along the example's profile (if it was slow enough), then stop.
+        """
+        profiler, self._profiler = self._profiler, None
+        if profiler is not None:
+            profiler.disable()
+            took = time.perf_counter() - self._started
+            addProfile = getattr(self.result, "addProfile", None)
+            slow = self.slower_than is None or took >= self.slower_than
+            if addProfile is not None and slow:
+                addProfile(example, rows(profiler))
+        self.result.stopTest(example)
+
+
+def rows(profiler):
+    """
+    The stats a profiler collected, as (nested) lists of plain values.
+
+    Each row is a function's filename, line and name, followed by its
+    primitive and total call counts, its total and cumulative time, and
+    then rows (of the same shape, without callers) for each of its callers.
+    """
+    profiler.create_stats()
+    return [
+        [
+            *function,
+            *stats,
+            [[*caller, *each] for caller, each in callers.items()],
+        ]
+        for function, (*stats, callers) in profiler.stats.items()
+    ]
+
+
+class Merged:
+    """
+    Profiles merged together, as ``pstats`` would have them.
+    """
+
+    def __init__(self):
+        self.stats = {}
+
+    def add(self, rows):
+        """
+        Merge in a profile (as ``rows``).
+        """
+        for *function, cc, nc, tt, ct, callers in rows:
+            callers = {tuple(each[:3]): tuple(each[3:]) for each in callers}
+            self.merge([(tuple(function), (cc, nc, tt, ct, callers))])
+
+    def merge(self, stats):
+        """
+        Merge in some functions along with their stats (as ``pstats`` has).
+        """
+        for function, each in stats:
+            existing = self.stats.get(function, (0, 0, 0, 0, {}))
+            self.stats[function] = pstats.add_func_stats(existing, each)
+
+    def dump(self, path):
+        """
+        Write the merged profile to a file ``pstats`` (or ``snakeviz``) reads.
+        """
+        with Path(path).open("wb") as file:
+            marshal.dump(self.stats, file)
+
+
+class Profiles:
+    """
+    The profiles of a run's examples, merged by group and for the whole run.
+
+    For each function, the examples which spent longest in it are kept too.
+    """
+
+    def __init__(self):
+        self.by_group = defaultdict(Merged)
+        self._slowest = defaultdict(list)
+
+    def __bool__(self):
+        return bool(self.by_group)
+
+    def add(self, group, example, rows):
+        """
+        Add the profile (as ``rows``) of an example from the given group.
+        """
+        self.by_group[group].add(rows)
+        for *function, _, _, _, ct, _ in rows:
+            slowest = self._slowest[tuple(function)]
+            if len(slowest) < EXAMPLES_PER_HOTSPOT:
+                heapq.heappush(slowest, (ct, example))
+            elif ct > slowest[0][0]:
+                heapq.heapreplace(slowest, (ct, example))
+
+    def run(self):
+        """
+        The profiles of every group, merged.
+        """
+        merged = Merged()
+        for each in self.by_group.values():
+            merged.merge(each.stats.items())
+        return merged
+
+    def hotspots(self, count):
+        """
+        The ``count`` functions with the most cumulative time.
+
+        Each is given with that time and the examples which spent longest in
+        it. Ivoire's own functions (which every example runs) are left out.
+        """
+        merged = self.run()
+        hottest = heapq.nlargest(
+            count,
+            (
+                (function, stats[3])
+                for function, stats in merged.stats.items()
+                if not function[0].startswith(_IVOIRE)
+            ),
+            key=lambda each: each[1],
+        )
+        return [
+            (
+                pstats.func_std_string(function),
+                cumulative,
+                sorted(self._slowest[function], reverse=True),
+            )
+            for function, cumulative in hottest
+        ]
+
+    def dump(self, directory):
+        """
+        Write the profile of the run (and of each group) into a directory.
+        """
+        directory = Path(directory)
+        groups = directory / "groups"
+        groups.mkdir(parents=True, exist_ok=True)
+        self.run().dump(directory / "run.pstats")
+        for group, merged in self.by_group.items():
+            if group is not None:
+                merged.dump(groups / f"{_UNSAFE.sub('_', group)}.pstats")
@@ -2,42 +2,137 @@
 Spec results for Ivoire specs.
 """
 
+from collections import Counter, defaultdict
+from pathlib import Path
 from textwrap import indent
+from typing import NamedTuple
 from unittest import TestResult
+from unittest.result import failfast
+import heapq
+import io
+import re
 import sys
+import tempfile
+import threading
 import time
+import traceback
+
+from ivoire import events, profiling, sampling
+
+#: How many (innermost) frames are shown for errors and failures which aren't
+#: formatted in full.
+BRIEF_FRAMES = 5
+
+#: How long (in characters) errors and failures which aren't formatted in full
+#: may be.
+BRIEF_LIMIT = 2000
+
+_FRAME = re.compile(
+    r'^  File "(?P<path>.*)", line (?P<line>\d+)',
+    re.MULTILINE,
+)
+_VARYING = re.compile(r"0x[0-9a-fA-F]+|\d+")
+
+
+class Timing(NamedTuple):
+    """
+    How long an example took to run.
+    """
+
+    spec: str | None
+    group: str
+    context: tuple[str, ...]
+    example: str
+    wall: float
+    cpu: float
 
 
 class ExampleResult(TestResult):
     """
     Track the outcomes of example runs.
 
+    If ``durations`` is given, the slowest that many examples (and groups)
+    are shown once the run is finished.
+
+    If ``keep`` is given, only that many errors and failures are formatted in
+    full and kept in memory. Any others are formatted briefly (showing their
+    innermost ``BRIEF_FRAMES`` frames) and stored in a temporary file until
+    they're shown.
+
+    If ``dedupe`` is set, errors (and failures) are grouped by their exception
+    type, message (ignoring numbers and addresses) and the innermost frame in
+    the project. Each group's traceback is formatted and shown just once,
+    along with the other examples in the group.
+
+    If ``hotspots`` is given, that many of the functions examples spent the
+    most (cumulative) time in are shown once the run is finished, as found
+    by profiling them (see ``ivoire.profiling``).
     """
 
-    def __init__(self, formatter):
+    def __init__(
+        self,
+        formatter,
+        durations=None,
+        keep=None,
+        dedupe=False,
+        hotspots=None,
+    ):
         super().__init__()
+        self.coverage = []
+        self.dedupe = dedupe
+        self.durations = durations
+        self.failed = []
         self.formatter = formatter
+        self.hotspots = hotspots
+        self.imports = []
+        self.keep = keep
+        self.profiles = profiling.Profiles()
+        self.samples = Counter()
+        self.timings = []
+        self._context = []
+        self._distinct_errors = {}
+        self._distinct_failures = {}
+        self._spec = None
+        self._spilled = None
 
     def startTestRun(self):
         super().startTestRun()
         self._start = time.time()
 
+    def enterSpec(self, spec):
+        self._spec = spec
+
+    def exitSpec(self, spec):
+        self._spec = None
+
     def enterContext(self, context, depth):
+        self._context[depth - 1 :] = [str(context.name)]
         self.formatter.show(self.formatter.enter_context(context, depth))
 
     def exitContext(self, depth):
+        del self._context[depth:]
         self.formatter.show(self.formatter.exit_context(depth))
 
     def enterGroup(self, group):
         self.formatter.show(self.formatter.enter_group(group))
 
+    @failfast
     def addError(self, example, exc_info):
-        super().addError(example, exc_info)
+        outcome = self._outcome(example, exc_info, self._distinct_errors)
+        self.errors.append(outcome)
+        self._mirrorOutput = True
+        self._failed(example)
         self.formatter.show(self.formatter.error(example, exc_info))
+        self.flush()
 
+    @failfast
     def addFailure(self, example, exc_info):
-        super().addFailure(example, exc_info)
+        outcome = self._outcome(example, exc_info, self._distinct_failures)
+        self.failures.append(outcome)
+        self._mirrorOutput = True
+        self._failed(example)
         self.formatter.show(self.formatter.failure(example, exc_info))
+        self.flush()
 
     def addSuccess(self, example):
         super().addSuccess(example)
@@ -47,19 +142,312 @@ class ExampleResult(TestResult):
         super().addSkip(example, reason)
         self.formatter.show(self.formatter.skip(example, reason))
 
+    def addTiming(self, example, wall, cpu):
+        timing = Timing(
+            spec=self._spec,
+            group=str(example.group),
+            context=tuple(self._context),
+            example=str(example),
+            wall=wall,
+            cpu=cpu,
+        )
+        self.timings.append(timing)
+
+    def addLines(self, example, lines):
+        """
+        Remember which lines (of which files) an example ran.
+        """
+        path = str(example.group), *self._context, str(example)
+        self.coverage.append((self._spec, path, lines))
+
+    def addProfile(self, example, rows):
+        """
+        Remember how an example spent its time (see ``ivoire.profiling``).
+        """
+        group = None if example.group is None else str(example.group)
+        name = f"{group}: {' '.join([*self._context, str(example)])}"
+        self.profiles.add(group, name, rows)
+
+    def addSamples(self, example, samples):
+        """
+        Remember what an example was doing (see ``ivoire.sampling``).
+
+        Each collapsed stack is given the example's group (as its root), its
+        contexts and its name.
+        """
+        parts = [str(example.group), *self._context, str(example)]
+        prefix = ";".join(sampling.label(part) for part in parts)
+        for stack, count in samples.items():
+            self.samples[f"{prefix};{stack}"] += count
+
+    def addImports(self, spec, imports):
+        """
+        Remember which files were imported (by which) while loading a spec.
+        """
+        self.imports.append((spec, imports))
+
+    def _failed(self, example):
+        """
+        Remember which example failed (by its spec and name path).
+        """
+        if example.group is None:
+            path = None
+        else:
+            path = str(example.group), *self._context, str(example)
+        self.failed.append((self._spec, path))
+
     def exitGroup(self, group):
         self.formatter.show(self.formatter.exit_group(group))
 
+    def _kept(self):
+        """
+        Whether there's room to keep another error or failure (in full).
+        """
+        return self.keep is None or (
+            len(self.errors) + len(self.failures) < self.keep
+        )
+
+    def _exc_info_to_string(self, exc_info, example):
+        # Examples which ran elsewhere (e.g. in a worker process) arrive with
+        # their tracebacks already formatted (or stored for later).
+        if not isinstance(exc_info, tuple):
+            return exc_info
+        if self._kept():
+            return super()._exc_info_to_string(exc_info, example)
+        return events.trim(
+            "".join(
+                traceback.format_exception(
+                    *exc_info,
+                    limit=-BRIEF_FRAMES,
+                    chain=False,
+                ),
+            ),
+            limit=BRIEF_LIMIT,
+        )
+
+    def _outcome(self, example, exc_info, distinct):
+        """
+        Decide what to remember about an error or failure.
+
+        Ones not kept in full (or which recur) are remembered alongside a
+        stand-in for the example, so that the example itself isn't kept.
+        """
+        if self.dedupe:
+            signature = _signature(exc_info)
+            recurring = distinct.get(signature)
+            if recurring is not None:
+                recurring.others.append(_stand_in(example))
+                return recurring.others[-1], recurring.traceback
+
+        kept = self._kept()
+        formatted = self._exc_info_to_string(exc_info, example)
+        if not kept and isinstance(formatted, str):
+            if self._spilled is None:
+                # It's closed along with the result (see close).
+                self._spilled = tempfile.TemporaryFile()  # noqa: SIM115
+            formatted = _Spilled.write(self._spilled, formatted)
+            example = _stand_in(example)
+
+        if self.dedupe:
+            distinct[signature] = _Distinct(example, formatted, others=[])
+        return example, formatted
+
+    def _deduplicated(self, distinct):
+        """
+        Each distinct error (or failure), along with where else it happened.
+        """
+        for each in distinct.values():
+            traceback = each.traceback
+            if each.others:
+                recurrences = self.formatter.recurrences(each.others)
+                traceback = f"{traceback}{recurrences}"
+            yield each.example, traceback
+
     def stopTestRun(self):
         super().stopTestRun()
         self.elapsed = time.time() - self._start
 
+        errors, failures = self.errors, self.failures
+        if self.dedupe:
+            errors = self._deduplicated(self._distinct_errors)
+            failures = self._deduplicated(self._distinct_failures)
+
         self.formatter.finished()
-        self.formatter.show(self.formatter.errors(self.errors))
-        self.formatter.show(self.formatter.failures(self.failures))
+        self._show_tracebacks("errors", "Errors:\n", errors)
+        self._show_tracebacks("failures", "Failures:\n", failures)
+        if self.durations:
+            self.formatter.show(self.formatter.durations(*self.slowest()))
+        if self.hotspots and self.profiles:
+            hotspots = self.profiles.hotspots(self.hotspots)
+            self.formatter.show(self.formatter.hotspots(hotspots))
         self.formatter.show(
             self.formatter.statistics(elapsed=self.elapsed, result=self),
         )
+        self.flush()
+
+    def _show_tracebacks(self, kind, header, outcomes):
+        """
+        Show the errors (or failures), one at a time if the formatter can.
+
+        Formatters which format them their own way show them all at once.
+        """
+        formatted = getattr(self.formatter, kind)
+        default = vars(FormatterMixin)[kind]
+        if getattr(formatted, "__func__", None) is not default:
+            self.formatter.show(formatted(outcomes))
+            return
+        for output in self.formatter._tracebacks(header, outcomes):
+            self.formatter.show(output)
+
+    def flush(self):
+        """
+        Show any output the formatter is holding on to (see ``Buffered``).
+        """
+        flush = getattr(self.formatter, "flush", None)
+        if flush is not None:
+            flush()
+
+    def close(self):
+        """
+        Show any output the formatter is holding on to, and stop it for good.
+
+        Errors and failures which weren't kept in full can't be read back
+        once this is closed.
+        """
+        close = getattr(self.formatter, "close", None)
+        if close is not None:
+            close()
+        else:
+            self.flush()
+        if self._spilled is not None:
+            self._spilled.close()
+
+    def slowest(self):
+        """
+        The slowest examples and groups (along with how long they took).
+        """
+        groups = defaultdict(float)
+        for timing in self.timings:
+            groups[timing.spec, timing.group] += timing.wall
+
+        examples = heapq.nlargest(
+            self.durations,
+            self.timings,
+            key=lambda timing: timing.wall,
+        )
+        groups = heapq.nlargest(
+            self.durations,
+            groups.items(),
+            key=lambda each: each[1],
+        )
+        return examples, groups
+
+
+class _Distinct(NamedTuple):
+    """
+    An error (or failure), along with the other examples it recurred in.
+    """
+
+    example: object
+    traceback: object
+    others: list
+
+
+def _stand_in(example):
+    """
+    Something which looks like the given example, without being it.
+    """
+    group = None if example.group is None else str(example.group)
+    return events._Example(group=group, name=str(example))
+
+
+def _signature(exc_info):
+    """
+    What makes an error (or failure) the same as another one.
+
+    That's the exception's type, the first line of its message (ignoring any
+    numbers or addresses in it) and the innermost frame in the project. The
+    same error gives the same signature whether it's given as ``exc_info`` or
+    as an already formatted traceback (e.g. from a worker process).
+    """
+    if isinstance(exc_info, tuple):
+        exc_type, exc_value, tb = exc_info
+        name = exc_type.__qualname__
+        if exc_type.__module__ not in {"builtins", "__main__"}:
+            name = f"{exc_type.__module__}.{name}"
+        message = str(exc_value)
+        exception = f"{name}: {message}" if message else name
+        frames = [
+            (frame.f_code.co_filename, line)
+            for frame, line in traceback.walk_tb(tb)
+        ]
+    else:
+        formatted = str(exc_info)
+        frames = [
+            (match["path"], int(match["line"]))
+            for match in _FRAME.finditer(formatted)
+        ]
+        exception = _exception_line(formatted)
+
+    first_line = exception.partition("\n")[0]
+    innermost = next(
+        (frame for frame in reversed(frames) if _in_project(frame[0])),
+        None,
+    )
+    return _VARYING.sub("N", first_line), innermost
+
+
+def _exception_line(formatted):
+    """
+    Find where the exception itself is, in a formatted traceback.
+    """
+    lines = formatted.splitlines()
+    start = 0
+    for index, line in enumerate(lines):
+        if line.startswith("  File "):
+            start = index + 1
+    for line in lines[start:]:
+        if line and not line.startswith(" "):
+            return line
+    return ""
+
+
+def _in_project(path):
+    """
+    Whether a file is part of the project being run (rather than a library).
+    """
+    if not Path(path).is_absolute():
+        return not path.startswith("<")
+    in_cwd = Path(path).is_relative_to(Path.cwd())
+    return in_cwd and "site-packages" not in path
+
+
+class _Spilled:
+    """
+    An error or failure stored in a file, read back only when shown.
+    """
+
+    def __init__(self, file, offset, length):
+        self.file = file
+        self.length = length
+        self.offset = offset
+
+    @classmethod
+    def write(cls, file, traceback):
+        """
+        Store a traceback at the end of the given file.
+        """
+        encoded = traceback.encode()
+        offset = file.seek(0, io.SEEK_END)
+        file.write(encoded)
+        return cls(file=file, offset=offset, length=len(encoded))
+
+    def __repr__(self):
+        return f"<{self.__class__.__name__}: {self.offset}>"
+
+    def __str__(self):
+        self.file.seek(self.offset)
+        return self.file.read(self.length).decode()
 
 
 class FormatterMixin:
@@ -81,18 +469,119 @@ class FormatterMixin:
         return "\n".join((self.timing(elapsed), self.result_summary(result)))
 
     def errors(self, errors):
-        if not errors:
-            return ""
-
-        tracebacks = (self.traceback(error, tb) for error, tb in errors)
-        return "\n".join(["Errors:\n", "\n".join(tracebacks), ""])
+        """
+        Return output for the errors.
+        """
+        return "".join(self._tracebacks("Errors:\n", errors))
 
     def failures(self, failures):
-        if not failures:
-            return ""
+        """
+        Return output for the failures.
+        """
+        return "".join(self._tracebacks("Failures:\n", failures))
+
+    def _tracebacks(self, header, outcomes):
+        # Tracebacks may be many (and large), so results show them as they're
+        # produced, one at a time, rather than holding them all in memory
+        # together (unless errors or failures are overridden).
+        separator = header + "\n"
+        for example, formatted in outcomes:
+            yield separator + self.traceback(example, formatted)
+            separator = "\n"
+        if separator != header + "\n":
+            yield "\n"
 
-        tracebacks = (self.traceback(fail, tb) for fail, tb in failures)
-        return "\n".join(["Failures:\n", "\n".join(tracebacks), ""])
+
+class Buffered:
+    """
+    Wrap a formatter to show its output in batches rather than piece by piece.
+
+    Output is shown once ``size`` characters of it are waiting, or once it has
+    been ``interval`` seconds since it was last shown -- checked whenever more
+    arrives or, if ``background`` is set, regularly by a writer thread (so that
+    it's shown even while an example takes a while).
+    """
+
+    def __init__(
+        self,
+        formatter,
+        size=io.DEFAULT_BUFFER_SIZE,
+        interval=0.5,
+        background=False,
+    ):
+        self.interval = interval
+        self.size = size
+        self._closed = threading.Event()
+        self._formatter = formatter
+        self._lock = threading.Lock()
+        self._shown = time.monotonic()
+        self._waiting = []
+        self._waiting_size = 0
+
+        self._writer = None
+        if background:
+            self._writer = threading.Thread(
+                target=self._write,
+                name="ivoire-output",
+                daemon=True,
+            )
+            self._writer.start()
+
+    def __getattr__(self, attr):
+        """
+        Delegate to the wrapped formatter.
+        """
+        return getattr(self._formatter, attr)
+
+    def show(self, text):
+        """
+        Hold on to some text, showing it (and what came before) if it's time.
+        """
+        with self._lock:
+            self._waiting.append(text)
+            self._waiting_size += len(text)
+            full = self._waiting_size >= self.size
+        if full or (
+            self._writer is None
+            and time.monotonic() - self._shown >= self.interval
+        ):
+            self.flush()
+
+    def finished(self):
+        """
+        The run has finished, so show what's waiting before anything else.
+        """
+        self.flush()
+        self._formatter.finished()
+
+    def flush(self):
+        """
+        Show everything which is waiting to be, right away.
+        """
+        with self._lock:
+            self._shown = time.monotonic()
+            if self._waiting:
+                text = "".join(self._waiting)
+                self._waiting.clear()
+                self._waiting_size = 0
+                self._formatter.show(text)
+
+    def close(self):
+        """
+        Show everything which is waiting to be, and stop the writer thread.
+        """
+        self._closed.set()
+        if self._writer is not None:
+            self._writer.join()
+        self.flush()
+
+    def _write(self):
+        due = self.interval
+        while not self._closed.wait(due):
+            due = self._shown + self.interval - time.monotonic()
+            if due <= 0:
+                self.flush()
+                due = self.interval
 
 
 class Colored(FormatterMixin):
@@ -143,7 +632,7 @@ class Colored(FormatterMixin):
 
     def traceback(self, example, traceback):
         name = str(example.group) + ": " + str(example)
-        colored = "\n".join([self.color("blue", name), traceback])
+        colored = "\n".join([self.color("blue", name), str(traceback)])
         return indent(colored, 4 * " ")
 
     def result_summary(self, result):
@@ -209,6 +698,40 @@ class DotsFormatter(FormatterMixin):
         """
         return f"Finished in {elapsed:.6f} seconds.\n"
 
+    def durations(self, examples, groups):
+        """
+        Return output on the slowest examples and groups.
+        """
+        lines = ["Slowest examples:\n"]
+        lines.extend(
+            f"  {timing.wall:.6f}s  {timing.group}: "
+            f"{' '.join([*timing.context, timing.example])}\n"
+            for timing in examples
+        )
+        lines.append("\nSlowest groups:\n")
+        lines.extend(
+            f"  {wall:.6f}s  {group}"
+            + ("" if spec is None else f" ({spec})")
+            + "\n"
+            for (spec, group), wall in groups
+        )
+        lines.append("\n")
+        return "".join(lines)
+
+    def hotspots(self, hotspots):
+        """
+        Return output on the functions examples spent the most time in.
+        """
+        lines = ["Hotspots:\n"]
+        for function, cumulative, examples in hotspots:
+            lines.append(f"  {cumulative:.6f}s  {function}\n")
+            lines.extend(
+                f"      {seconds:.6f}s  {example}\n"
+                for seconds, example in examples
+            )
+        lines.append("\n")
+        return "".join(lines)
+
     def error(self, example, exc_info):
         """
         An error was encountered.
@@ -237,7 +760,15 @@ class DotsFormatter(FormatterMixin):
         """
         Format an example and its traceback.
         """
-        return "\n".join((str(example), traceback))
+        return "\n".join((str(example), str(traceback)))
+
+    def recurrences(self, examples):
+        """
+        Format the other examples an error (or failure) also happened in.
+        """
+        lines = [f"\n... and {len(examples)} more the same way:\n"]
+        lines.extend(f"    {each.group}: {each}\n" for each in examples)
+        return "".join(lines)
 
 
 class Verbose(FormatterMixin):
@@ -2,12 +2,43 @@
 The implementation of the Ivoire runner.
 """
 
+from contextlib import ExitStack, closing, suppress
+from functools import partial
+from pathlib import Path
 import argparse
+import gc
+import json
+import multiprocessing
 import runpy
+import sqlite3
+import subprocess
 import sys
 
-from ivoire import result
-from ivoire.load import load_by_name
+from ivoire import (
+    events,
+    impact,
+    interpreters,
+    parallel,
+    profiling,
+    result,
+    sampling,
+    selection,
+    serve,
+    shard,
+    threads,
+    watch,
+)
+from ivoire.cache import Cache
+from ivoire.imports import Graph
+from ivoire.index import index_file
+from ivoire.load import (
+    DEFAULT_EXCLUDE,
+    DEFAULT_PATTERNS,
+    discover,
+    expand,
+    filter_specs,
+    load_by_name,
+)
 from ivoire.transform import ExampleLoader
 import ivoire
 
@@ -38,6 +69,15 @@ def should_color(when):
     return when == "always"
 
 
+def should_buffer(when):
+    """
+    Decide whether (and how) to buffer output.
+    """
+    if when == "auto":
+        return "never" if sys.stderr.isatty() else "always"
+    return when
+
+
 def parse(argv=None):
     """
     Parse some arguments using the parser.
@@ -46,16 +86,28 @@ def parse(argv=None):
         argv = sys.argv[1:]
 
     # Evade http://bugs.python.org/issue9253
-    if not argv or argv[0] not in {"run", "transform"}:
+    if not argv or argv[0] not in _subparsers.choices:
         argv = ["run", *argv]
 
     arguments = _clean(_parser.parse_args(argv))
+    if getattr(arguments, "daemon", False):
+        forwarded = [arg for arg in argv if arg != "--daemon"]
+        arguments.func = partial(run_on_daemon, argv=forwarded)
     return arguments
 
 
+def _shard(value):
+    try:
+        return shard.parse(value)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(str(error)) from None
+
+
 def _clean(arguments):
     if hasattr(arguments, "color"):
         arguments.color = should_color(arguments.color)
+    if hasattr(arguments, "buffer"):
+        arguments.buffer = should_buffer(arguments.buffer)
     return arguments
 
 
@@ -65,12 +117,24 @@ def setup(config):
     """
     formatter = config.Formatter()
 
+    if config.buffer != "never":
+        formatter = result.Buffered(
+            formatter,
+            interval=config.flush_interval,
+            background=config.buffer == "background",
+        )
     if config.verbose:
         formatter = result.Verbose(formatter)
     if config.color:
         formatter = result.Colored(formatter)
 
-    current_result = result.ExampleResult(formatter)
+    current_result = result.ExampleResult(
+        formatter,
+        durations=config.durations,
+        keep=config.full_tracebacks,
+        dedupe=config.deduplicate,
+        hotspots=config.hotspots,
+    )
 
     ivoire.current_result = ivoire._manager.result = current_result
 
@@ -84,22 +148,404 @@ def run(config):
     if config.exitfirst:
         ivoire.current_result.failfast = True
 
-    ivoire.current_result.startTestRun()
+    with ExitStack() as stack:
+        # Show whatever's buffered even if interrupted.
+        stack.callback(ivoire.current_result.close)
+        if config.result_file is not None:
+            file = stack.enter_context(Path(config.result_file).open("w"))
+            record(events.Recorder(emit=events.Writer(file)))
+        _run_specs(config)
+
+    sys.exit(not ivoire.current_result.wasSuccessful())
+
+
+def run_on_daemon(config, argv):
+    """
+    Have a daemon (see ``ivoire serve``) run, showing its output here.
+    """
+    path = Cache(config.cache_dir).socket()
+    try:
+        status = serve.request(path, argv)
+    except serve.NotServing:
+        sys.exit(f"No daemon is serving from {path} (see ivoire serve).")
+    sys.exit(status)
+
+
+def record(recorder):
+    """
+    Record the events of the run, in addition to showing its results.
+    """
+    tee = events.Tee(ivoire.current_result, recorder)
+    ivoire.current_result = ivoire._manager.result = tee
+
+
+def _discover(config, cache):
+    """
+    Find the specs to run, discovering any inside directories.
+
+    Directories are listed through an index kept in the cache, unless it
+    can't be read, in which case they're all listed. If it can't be written
+    to, it isn't.
+    """
+    patterns = config.spec_patterns or DEFAULT_PATTERNS
+    exclude = [*DEFAULT_EXCLUDE, *(config.exclude or ())]
+    index = cache.directories(settings=[patterns, exclude])
+
+    def specs(index):
+        return list(
+            expand(
+                config.specs,
+                discover=partial(
+                    discover,
+                    filter_specs=partial(filter_specs, patterns=patterns),
+                    exclude=exclude,
+                    index=index,
+                ),
+            ),
+        )
 
-    for spec in config.specs:
+    try:
+        found = specs(index=index)
+    except sqlite3.Error:
+        return specs(index=None)
+    with suppress(sqlite3.Error):
+        index.save()
+    return found
+
+
+def _run_specs(config):
+    cache = Cache(config.cache_dir)
+    specs = _discover(config, cache)
+    if config.shard is not None:
+        index, count = config.shard
+        specs = shard.select(
+            specs,
+            index=index,
+            count=count,
+            durations=cache.durations().by_spec(),
+        )
+
+    changes = _changes(config)
+    if changes is not None:
+        changed = selection.Changed(changes, cache.imports().load())
+        reasons = changed.reasons(specs)
+        for spec, why in reasons:
+            sys.stderr.write(f"Running {spec} because {why}.\n")
+        specs = [spec for spec, _ in reasons]
+
+    selections = []
+    if config.impacted_by is not None:
+        impacted = _impacted(config.impacted_by, cache)
+        specs = impacted.specs(specs)
+        selections.append(impacted)
+    if config.keywords:
+        selections.append(selection.Keywords(config.keywords))
+    if config.last_failed or config.failed_first:
+        last_failed = selection.LastFailed(cache.failures().load())
+        if config.last_failed and last_failed:
+            specs = last_failed.specs(specs)
+            selections.append(last_failed)
+        if config.failed_first:
+            specs = last_failed.first(specs)
+
+    options = {}
+    if config.record_imports or changes is not None:
+        options["record_imports"] = True
+    if selections:
+        options["select"] = selection.All(selections)
+    if config.timeout is not None:
+        options["timeout"] = config.timeout
+    load = partial(load_spec, **options) if options else load_spec
+    if config.record_impact:
+        if impact.monitoring is None:
+            sys.exit("Recording impact needs Python 3.12 or newer.")
+        if config.threads > 1:
+            # sys.monitoring sees every thread, not just the example's.
+            sys.exit("Recording impact can't be done with --threads.")
+        load = partial(events.load_wrapped, impact.Recording, load)
+    if config.profile:
+        if config.threads > 1:
+            # Profilers see every thread, not just the example's.
+            sys.exit("Profiling can't be done with --threads.")
+        load = partial(
+            events.load_wrapped,
+            profiling.Profiling,
+            load,
+            slower_than=config.profile_slower_than,
+        )
+    if config.sample is not None:
+        if config.interpreters > 1:
+            # Looking at stacks isn't safe from subinterpreters.
+            sys.exit("Sampling can't be done with --interpreters.")
+        load = partial(
+            events.load_wrapped,
+            sampling.Sampling,
+            load,
+            rate=config.sample_rate,
+        )
+
+    if config.preload:
         try:
-            load_by_name(spec)
-        except Exception:
-            ivoire.current_result.addError(
-                _ExampleNotRunning(),
-                sys.exc_info(),
-            )
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            sys.exit("Preloading modules needs fork(), which isn't available.")
+        _preload(config.preload)
+
+    ivoire.current_result.startTestRun()
+
+    if config.preload:
+        parallel.run(
+            specs=specs,
+            result=ivoire.current_result,
+            jobs=config.jobs,
+            load=load,
+            context=context,
+            specs_per_worker=config.batch,
+        )
+    elif config.jobs > 1:
+        parallel.run(
+            specs=specs,
+            result=ivoire.current_result,
+            jobs=config.jobs,
+            load=load,
+        )
+    elif config.interpreters > 1:
+        _run_in_interpreters(config, specs, load)
+    elif config.threads > 1:
+        threads.run(
+            specs=specs,
+            result=ivoire.current_result,
+            threads=config.threads,
+            load=load,
+        )
+    else:
+        for spec in specs:
+            load(spec, ivoire.current_result)
 
     ivoire.current_result.stopTestRun()
 
+    # Every shard is split using the same recorded durations, so none of them
+    # record their own (merging their results does instead).
+    _remember(cache, ivoire.current_result, durations=config.shard is None)
+    if config.profile and ivoire.current_result.profiles:
+        ivoire.current_result.profiles.dump(config.profile_dir)
+        sys.stderr.write(f"Wrote profiles to {config.profile_dir}.\n")
+    if config.sample is not None:
+        sampling.write(config.sample, ivoire.current_result.samples)
+        sys.stderr.write(f"Wrote samples to {config.sample}.\n")
+
+
+def _run_in_interpreters(config, specs, load):
+    """
+    Run specs in subinterpreters, or in worker processes if they can't be.
+    """
+    if interpreters.available:
+        specs = interpreters.run(
+            specs=specs,
+            result=ivoire.current_result,
+            interpreters=config.interpreters,
+            load=load,
+        )
+        for spec in specs:
+            sys.stderr.write(
+                f"Running {spec} in a worker process because it imports "
+                "an extension module which can't be loaded in a "
+                "subinterpreter.\n",
+            )
+    else:
+        sys.stderr.write(
+            "Subinterpreters need Python 3.13 or newer, so running specs in "
+            "worker processes instead.\n",
+        )
+
+    if specs and not ivoire.current_result.shouldStop:
+        parallel.run(
+            specs=specs,
+            result=ivoire.current_result,
+            jobs=config.interpreters,
+            load=load,
+        )
+
+
+def _preload(names):
+    """
+    Import some modules once, to be shared by the workers forked afterwards.
+    """
+    for name in names:
+        load_by_name(name)
+
+    # Hide everything which exists now from the garbage collector, so that
+    # collections in the workers don't write to (and so copy) its pages.
+    gc.freeze()
+
+
+def _changes(config):
+    """
+    The files which changed, if we were told (or asked git) which did.
+    """
+    if config.changed_since is None:
+        return config.changed
+    try:
+        changes = selection.changed_since(config.changed_since)
+    except (OSError, subprocess.CalledProcessError) as error:
+        details = getattr(error, "stderr", None) or str(error)
+        sys.exit(
+            f"Couldn't tell what changed since {config.changed_since}: "
+            f"{details.strip()}",
+        )
+    return [*changes, *(config.changed or ())]
+
+
+def _impacted(diff, cache):
+    """
+    Select the examples impacted by the changes in a diff (file).
+    """
+    with sys.stdin if diff == "-" else Path(diff).open() as file:
+        changes = impact.parse_diff(file)
+    impacted = cache.impact()
+    return selection.Impacted(
+        impacted=impacted.impacted(changes),
+        recorded=impacted.recorded(),
+        changed=changes,
+    )
+
+
+def _remember(cache, result, durations=True):
+    """
+    Remember what happened in a run for next time.
+
+    The run has already happened, so if the cache can't be written to, this
+    just says so.
+    """
+    try:
+        if durations:
+            cache.durations().record(result.timings)
+        cache.failures().record(result.timings, result.failed)
+        cache.imports().record(result.imports)
+        if result.coverage:
+            cache.impact().record(result.coverage)
+    except (OSError, sqlite3.Error) as error:
+        sys.stderr.write(f"Couldn't cache this run in {cache.root}: {error}\n")
+
+
+def merge_results(config):
+    """
+    Show the combined results of previous runs from their result files.
+    """
+    setup(config)
+
+    with closing(ivoire.current_result):
+        ivoire.current_result.startTestRun()
+        for path in config.result_files:
+            replayer = events.Replayer(ivoire.current_result)
+            try:
+                replayer.replay(events.load(path))
+            except OSError as error:
+                sys.exit(
+                    f"{path} is not an Ivoire result file: "
+                    f"{error.strerror}.",
+                )
+            except ValueError:
+                sys.exit(f"{path} is not an Ivoire result file.")
+            if not replayer.finished:
+                replayer.abort(f"The results in {path} end unexpectedly.\n")
+        ivoire.current_result.stopTestRun()
+
+    _remember(Cache(config.cache_dir), ivoire.current_result)
+
     sys.exit(not ivoire.current_result.wasSuccessful())
 
 
+def list_examples(config):
+    """
+    Show the examples in some specs (as JSON) without running them.
+    """
+    cache = Cache(config.cache_dir)
+    index = cache.index()
+
+    specs = []
+    for spec in _discover(config, cache):
+        try:
+            indexed = index_file(spec, cache=index)
+        except OSError as error:
+            indexed = {"error": str(error)}
+        specs.append({"file": spec, **indexed})
+
+    index.save()
+    sys.stdout.write(json.dumps(specs) + "\n")
+
+
+def watch_specs(config):
+    """
+    Run specs, then rerun the ones affected by each change, until interrupted.
+    """
+    cache = Cache(config.cache_dir)
+    graph = Graph()
+
+    def run(specs):
+        setup(config)
+        with closing(ivoire.current_result):
+            ivoire.current_result.startTestRun()
+            for spec in specs:
+                load_spec(spec, ivoire.current_result, record_imports=True)
+            ivoire.current_result.stopTestRun()
+        _remember(cache, ivoire.current_result, durations=config.shard is None)
+        for _, imported in ivoire.current_result.imports:
+            graph.update(imported)
+
+    with suppress(KeyboardInterrupt):
+        watch.watch(
+            discover=partial(_discover, config, cache),
+            run=run,
+            imports=graph,
+            interval=config.interval,
+        )
+
+
+def serve_specs(config):
+    """
+    Serve runs from a warm daemon, restarting it whenever its imports change.
+    """
+    _preload(config.preload or ())
+    with suppress(KeyboardInterrupt):
+        serve.serve(
+            path=Cache(config.cache_dir).socket(),
+            run=main,
+            interval=config.interval,
+        )
+
+
+def load_spec(spec, result, select=None, timeout=None, record_imports=False):
+    """
+    Load a spec, logging any error from outside of an example to the result.
+
+    If ``select`` is given, only examples it selects (see ``selection``) are
+    run, and if ``timeout`` is, it's how long (in seconds) examples which
+    don't say otherwise may run for. If ``record_imports`` is true, what the
+    spec imports (see ``ivoire.imports``) is recorded, if the result wants to
+    know.
+    """
+    result.enterSpec(spec)
+    addImports = None
+    if record_imports:
+        addImports = getattr(result, "addImports", None)
+    imports = None if addImports is None else Graph()
+    selecting, limit = ivoire._manager.select, ivoire._manager.timeout
+    if select is not None:
+        ivoire._manager.select = partial(select, spec)
+    if timeout is not None:
+        ivoire._manager.timeout = timeout
+    try:
+        load_by_name(spec, imports=imports)
+    except Exception:
+        result.addError(_ExampleNotRunning(), sys.exc_info())
+    finally:
+        ivoire._manager.select, ivoire._manager.timeout = selecting, limit
+    if addImports is not None:
+        addImports(spec, sorted(imports))
+    result.exitSpec(spec)
+
+
 def transform(config):
     """
     Run in transform mode.
@@ -124,11 +570,22 @@ def main(argv=None):
 _parser = argparse.ArgumentParser(description="The Ivoire test runner.")
 _subparsers = _parser.add_subparsers()
 
-_run = _subparsers.add_parser(
-    "run",
-    help="Run Ivoire specs.",
+_output = argparse.ArgumentParser(add_help=False)
+_output.add_argument(
+    "--buffer",
+    choices=["always", "background", "never", "auto"],
+    default="auto",
+    help="Show output in batches rather than as it happens (other than "
+    "failures, which are shown right away). 'auto' buffers unless output is "
+    "going to a terminal, and 'background' also shows batches while examples "
+    "take a while.",
 )
-_run.add_argument(
+_output.add_argument(
+    "--cache-dir",
+    default=".ivoire_cache",
+    help="Keep information between runs (e.g. durations) in this directory.",
+)
+_output.add_argument(
     "-c",
     "--color",
     choices=["always", "never", "auto"],
@@ -136,7 +593,34 @@ _run.add_argument(
     dest="color",
     help="Format colored output.",
 )
-_run.add_argument(
+_output.add_argument(
+    "--deduplicate",
+    action="store_true",
+    help="Show each distinct error (or failure) just once, along with every "
+    "example it happened in.",
+)
+_output.add_argument(
+    "--durations",
+    metavar="N",
+    type=int,
+    help="Show the N slowest examples and groups.",
+)
+_output.add_argument(
+    "--flush-interval",
+    default=0.5,
+    metavar="SECONDS",
+    type=float,
+    help="Show buffered output at least this often.",
+)
+_output.add_argument(
+    "--full-tracebacks",
+    metavar="N",
+    type=int,
+    help="Show only the first N errors and failures in full, showing the "
+    "rest briefly (and keeping them on disk rather than in memory until "
+    "then).",
+)
+_output.add_argument(
     "-f",
     "--formatter",
     choices=FORMATTERS,
@@ -145,12 +629,203 @@ _run.add_argument(
     type=lambda formatter: FORMATTERS[formatter],  # type: ignore[arg-type, return-value]
     help="Format output with the given formatter.",
 )
-_run.add_argument(
+_output.add_argument(
+    "--hotspots",
+    default=10,
+    metavar="N",
+    type=int,
+    help="Show the N functions profiled examples (see --profile) spent the "
+    "most time in, along with the examples which spent the longest in each.",
+)
+_output.add_argument(
     "-v",
     "--verbose",
     action="store_true",
     help="Format verbose output.",
 )
+
+_discovery = argparse.ArgumentParser(add_help=False)
+_discovery.add_argument(
+    "--exclude",
+    action="append",
+    metavar="GLOB",
+    help="Don't look for specs in directories (or files) whose names or "
+    "paths match this, in addition to those never worth looking in (e.g. "
+    ".git or virtualenvs). May be given more than once.",
+)
+_discovery.add_argument(
+    "--spec-pattern",
+    action="append",
+    dest="spec_patterns",
+    metavar="GLOB",
+    help="Look for specs in files whose names match this (rather than "
+    "*_spec.py). May be given more than once.",
+)
+
+_run = _subparsers.add_parser(
+    "run",
+    help="Run Ivoire specs.",
+    parents=[_output, _discovery],
+)
+_run.add_argument(
+    "--batch",
+    default=1,
+    metavar="N",
+    type=int,
+    help="With --preload, run this many specs in each worker before forking "
+    "a fresh one.",
+)
+_run.add_argument(
+    "--changed",
+    action="append",
+    metavar="FILE",
+    help="Run only the specs which import this file, however indirectly "
+    "(as recorded when they last ran, see --record-imports). May be given "
+    "more than once.",
+)
+_run.add_argument(
+    "--changed-since",
+    metavar="REF",
+    help="Run only the specs which import files changed since this git "
+    "commit (or branch), however indirectly (as recorded when they last "
+    "ran, see --record-imports).",
+)
+_run.add_argument(
+    "--daemon",
+    action="store_true",
+    help="Have the daemon (see serve) run the specs, rather than running "
+    "them here.",
+)
+_run.add_argument(
+    "--ff",
+    "--failed-first",
+    action="store_true",
+    dest="failed_first",
+    help="Run specs which failed last time first, then the rest.",
+)
+_run.add_argument(
+    "--impacted-by",
+    metavar="DIFF",
+    help="Run only the examples which ran lines changed by this diff (file, "
+    "or - for stdin) when last run with --record-impact, along with any "
+    "which weren't recorded. Paths in the diff are relative to the current "
+    "directory.",
+)
+_run.add_argument(
+    "--interpreters",
+    default=1,
+    metavar="N",
+    type=int,
+    help="Run specs in parallel across this many subinterpreters (needs "
+    "Python 3.13 or newer), falling back to worker processes for specs "
+    "which can't be run in them.",
+)
+_run.add_argument(
+    "-j",
+    "--jobs",
+    default=1,
+    type=int,
+    help="Run specs in parallel across this many worker processes.",
+)
+_run.add_argument(
+    "-k",
+    action="append",
+    dest="keywords",
+    metavar="KEYWORD",
+    help="Run only examples whose names (including their group and "
+    "contexts) contain this. May be given more than once to run examples "
+    "matching any of them.",
+)
+_run.add_argument(
+    "--lf",
+    "--last-failed",
+    action="store_true",
+    dest="last_failed",
+    help="Run only the examples which failed last time (or everything, if "
+    "nothing did).",
+)
+_run.add_argument(
+    "--preload",
+    action="append",
+    metavar="MODULE",
+    help="Import this module (or file) once, then fork a fresh worker for "
+    "each spec (or --batch of specs), so they share what it imports rather "
+    "than each importing it again. May be given more than once.",
+)
+_run.add_argument(
+    "--profile",
+    action="store_true",
+    help="Profile each example (along with its hooks), writing the profiles "
+    "of the run and of each group (see --profile-dir) and showing the "
+    "functions examples spent the most time in.",
+)
+_run.add_argument(
+    "--profile-dir",
+    default="prof",
+    metavar="DIRECTORY",
+    help="With --profile, write .pstats files into this directory.",
+)
+_run.add_argument(
+    "--profile-slower-than",
+    metavar="SECONDS",
+    type=float,
+    help="With --profile, keep the profiles only of examples which took at "
+    "least this long.",
+)
+_run.add_argument(
+    "--record-impact",
+    action="store_true",
+    help="Record which lines each example runs, for --impacted-by (needs "
+    "Python 3.12 or newer).",
+)
+_run.add_argument(
+    "--record-imports",
+    action="store_true",
+    help="Record what each spec imports, for --changed and --changed-since "
+    "(which record it too, for the specs they run).",
+)
+_run.add_argument(
+    "--result-file",
+    metavar="PATH",
+    help="Also write results to this file as the run progresses (see "
+    "merge-results).",
+)
+_run.add_argument(
+    "--sample",
+    metavar="FILE",
+    help="Sample what each example is doing (from another thread, which "
+    "barely slows it down), writing collapsed stacks (with one root for "
+    "each group) to this file for flame graph tools.",
+)
+_run.add_argument(
+    "--sample-rate",
+    default=sampling.RATE,
+    metavar="HZ",
+    type=float,
+    help="With --sample, sample each example this many times a second.",
+)
+_run.add_argument(
+    "--shard",
+    metavar="I/N",
+    type=_shard,
+    help="Run only the I-th of N shards of the specs, split so that each "
+    "takes about as long to run as the others (based on previous runs).",
+)
+_run.add_argument(
+    "--threads",
+    default=1,
+    metavar="N",
+    type=int,
+    help="Run specs in parallel across this many threads (which run on "
+    "separate cores on free-threaded builds of Python).",
+)
+_run.add_argument(
+    "--timeout",
+    metavar="SECONDS",
+    type=float,
+    help="Interrupt (and record an error for) examples which run for longer "
+    "than this, unless they give their own timeout.",
+)
 _run.add_argument(
     "-x",
     "--exitfirst",
@@ -160,6 +835,70 @@ _run.add_argument(
 _run.add_argument("specs", nargs="+")
 _run.set_defaults(func=run)
 
+_merge_results = _subparsers.add_parser(
+    "merge-results",
+    help="Show the combined results of runs from their result files.",
+    parents=[_output],
+)
+_merge_results.add_argument("result_files", metavar="RESULT_FILE", nargs="+")
+_merge_results.set_defaults(func=merge_results)
+
+_list = _subparsers.add_parser(
+    "list",
+    help="Show the groups, contexts and examples in specs as JSON, without "
+    "running (or importing) them.",
+    parents=[_discovery],
+)
+_list.add_argument(
+    "--cache-dir",
+    default=".ivoire_cache",
+    help="Keep the indices of specs in this directory.",
+)
+_list.add_argument("specs", nargs="+")
+_list.set_defaults(func=list_examples)
+
+_watch = _subparsers.add_parser(
+    "watch",
+    help="Run specs, then rerun them whenever they (or the modules they "
+    "import) change.",
+    parents=[_output, _discovery],
+)
+_watch.add_argument(
+    "--interval",
+    default=0.5,
+    metavar="SECONDS",
+    type=float,
+    help="Check for changes this often.",
+)
+_watch.add_argument("specs", nargs="+")
+_watch.set_defaults(func=watch_specs)
+
+_serve = _subparsers.add_parser(
+    "serve",
+    help="Preload modules, then serve runs (see run --daemon) from forks of "
+    "this warm process, restarting whenever the modules change.",
+)
+_serve.add_argument(
+    "--cache-dir",
+    default=".ivoire_cache",
+    help="Listen on a socket in this directory.",
+)
+_serve.add_argument(
+    "--interval",
+    default=1.0,
+    metavar="SECONDS",
+    type=float,
+    help="Check for changes this often.",
+)
+_serve.add_argument(
+    "--preload",
+    action="append",
+    metavar="MODULE",
+    help="Import this module (or file) before serving. May be given more "
+    "than once.",
+)
+_serve.set_defaults(func=serve_specs)
+
 _transform = _subparsers.add_parser(
     "transform",
     help="Run an Ivoire spec through another test runner by translating its "
@@ -0,0 +1,156 @@
+"""
+Sample what each example is doing, to see where its time goes.
+
+Unlike profiling (see ``ivoire.profiling``), sampling doesn't slow down the
+code being run, since it's done by another thread which looks at the stack of
+the thread running examples every so often. Samples are passed along to the
+result as collapsed stacks (which flame graph tools read), which are given
+their example's group, contexts and name there.
+
+Sampling uses ``sys._current_frames``, which isn't safe to call from
+subinterpreters (as of Python 3.13).
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+import sys
+import threading
+
+from ivoire.events import Wrapper
+import ivoire
+
+#: How many times a second examples are sampled, by default.
+RATE = 100
+
+_IVOIRE = Path(ivoire.__file__).parent
+
+
+class Sampling(Wrapper):
+    """
+    Pass events along to a result, sampling each example's stack.
+
+    The samples are passed along to the result's ``addSamples`` just before
+    each example stops.
+    """
+
+    def __init__(self, result, rate=RATE):
+        super().__init__(result)
+        self.rate = rate
+        self._ident = threading.get_ident()
+        self._lock = threading.Lock()
+        self._root = None
+        self._samples = Counter()
+        self._stopped = threading.Event()
+        self._sampler = None
+
+    @contextmanager
+    def running(self):
+        """
+        Sample in the background within the block.
+        """
+        self.start()
+        try:
+            yield self
+        finally:
+            self.stop()
+
+    def start(self):
+        """
+        Start sampling (the thread which called this) in the background.
+        """
+        self._sampler = threading.Thread(
+            target=self._sample,
+            name="ivoire-sampler",
+            daemon=True,
+        )
+        self._sampler.start()
+
+    def stop(self):
+        """
+        Stop sampling.
+        """
+        self._stopped.set()
+        self._sampler.join()
+
+    def startTest(self, example):
+        """
+        Start sampling the example.
+        """
+        self.result.startTest(example)
+        self._root = _outside_ivoire(sys._getframe(1))
+
+    def stopTest(self, example):
+        """
+        Pass along the example's samples, then stop.
+        """
+        with self._lock:
+            self._root = None
+            samples, self._samples = self._samples, Counter()
+        addSamples = getattr(self.result, "addSamples", None)
+        if addSamples is not None and samples:
+            addSamples(example, dict(samples))
+        self.result.stopTest(example)
+
+    def _sample(self):
+        interval = 1 / self.rate
+        while not self._stopped.wait(interval):
+            root = self._root
+            if root is None:
+                continue
+            frame = sys._current_frames().get(self._ident)
+            if frame is None:
+                continue
+            stack = collapse(frame, root)
+            with self._lock:
+                if self._root is root:
+                    self._samples[stack] += 1
+
+
+def collapse(frame, root=None):
+    """
+    Collapse a stack into one line, from its outermost frame to ``frame``.
+
+    Frames are separated by semicolons, and are left out beyond ``root`` (the
+    frame an example was run from) if it's in the stack.
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})",
+        )
+        if frame is root:
+            break
+        frame = frame.f_back
+    return ";".join(label(name) for name in reversed(names))
+
+
+def write(path, samples):
+    """
+    Write collapsed stacks (and how many times each was sampled) to a file.
+    """
+    with Path(path).open("w") as file:
+        file.writelines(
+            f"{stack} {count}\n" for stack, count in sorted(samples.items())
+        )
+
+
+def label(name):
+    """
+    Make a name usable as (part of) a collapsed stack.
+    """
+    return " ".join(name.replace(";", ":").split())
+
+
+def _outside_ivoire(frame):
+    """
+    The innermost frame (from ``frame`` outwards) which isn't ivoire's own.
+
+    Ivoire's own specs don't count as its own.
+    """
+    while frame is not None and (
+        Path(frame.f_code.co_filename).parent == _IVOIRE
+    ):
+        frame = frame.f_back
+    return frame
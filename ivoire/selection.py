@@ -0,0 +1,189 @@
+"""
+Select which specs and examples are to be run.
+
+Examples are selected by callables which are given the spec an example is in
+along with its name path (see ``ContextManager.selects``).
+"""
+
+from collections import defaultdict
+from pathlib import Path
+import os
+import subprocess
+
+from ivoire.imports import absolute
+
+
+class LastFailed:
+    """
+    Select what failed in previous runs.
+
+    ``failures`` are pairs of specs and the name paths of examples in them
+    which failed, where a path of ``None`` means something went wrong in the
+    spec outside of any example, so the whole spec should be run again.
+    """
+
+    def __init__(self, failures):
+        self._failures = defaultdict(set)
+        for spec, path in failures:
+            self._failures[spec].add(path)
+
+    def __bool__(self):
+        return bool(self._failures)
+
+    def __call__(self, spec, path):
+        """
+        Whether the given example failed (or its spec went wrong) last time.
+        """
+        failed = self._failures.get(spec, ())
+        return None in failed or path in failed
+
+    def specs(self, specs):
+        """
+        Only those specs which had failures.
+        """
+        return [spec for spec in specs if spec in self._failures]
+
+    def first(self, specs):
+        """
+        Reorder the specs so that those which had failures come first.
+        """
+        return sorted(specs, key=lambda spec: spec not in self._failures)
+
+
+class Keywords:
+    """
+    Select examples whose name paths contain any of the given keywords.
+
+    Keywords are matched case-insensitively against the example's group,
+    contexts and name, joined by spaces (the way verbose output shows them).
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [keyword.casefold() for keyword in keywords]
+
+    def __call__(self, spec, path):
+        """
+        Whether the given example's name contains any of the keywords.
+        """
+        name = " ".join(path).casefold()
+        return any(keyword in name for keyword in self.keywords)
+
+
+class All:
+    """
+    Select examples which are selected by every one of the given selections.
+    """
+
+    def __init__(self, selections):
+        self.selections = selections
+
+    def __call__(self, spec, path):
+        """
+        Whether every selection selects the given example.
+        """
+        return all(select(spec, path) for select in self.selections)
+
+
+class Impacted:
+    """
+    Select examples which ran any changed lines when they were last recorded.
+
+    ``impacted`` are the specs and name paths of those examples, and
+    ``recorded`` those of every example which was recorded (see
+    ``ivoire.impact``). Examples which weren't (e.g. new ones) are always
+    selected, since there's no telling what they might run, and so specs
+    which are among the ``changed`` files are always run.
+    """
+
+    def __init__(self, impacted, recorded, changed=()):
+        self._changed = {absolute(path) for path in changed}
+        self._impacted = set(impacted)
+        self._recorded = set(recorded)
+
+    def __call__(self, spec, path):
+        """
+        Whether the given example was impacted (or never recorded).
+        """
+        return (spec, path) in self._impacted or (
+            (spec, path) not in self._recorded
+        )
+
+    def specs(self, specs):
+        """
+        Only those specs which have examples which may be selected.
+        """
+        recorded = {spec for spec, _ in self._recorded}
+        impacted = {spec for spec, _ in self._impacted}
+        return [
+            spec
+            for spec in specs
+            if spec in impacted
+            or spec not in recorded
+            or absolute(spec) in self._changed
+        ]
+
+
+class Changed:
+    """
+    Select the specs which are, or import (however indirectly), changed files.
+
+    What specs import comes from an import ``Graph`` recorded when they last
+    ran (see ``ivoire.imports``). Specs whose imports were never recorded
+    (e.g. new ones) are always selected, since there's no telling what they
+    might import.
+    """
+
+    def __init__(self, changes, imports):
+        self.changes = [absolute(path) for path in changes]
+        self.imports = imports
+
+    def why(self, spec):
+        """
+        Why the given spec is selected, or ``None`` if it isn't.
+        """
+        if spec not in self.imports:
+            return "what it imports is unknown"
+        chain = self.imports.chain(spec, self.changes)
+        if chain is None:
+            return None
+        if len(chain) == 1:
+            return "it changed"
+        return "it imports " + " -> ".join(
+            os.path.relpath(path) for path in chain[1:]
+        )
+
+    def reasons(self, specs):
+        """
+        Only the selected specs, each along with why it is selected.
+        """
+        selected = []
+        for spec in specs:
+            why = self.why(spec)
+            if why is not None:
+                selected.append((spec, why))
+        return selected
+
+
+def changed_since(ref, cwd=None):
+    """
+    The files changed since the given git ref (including uncommitted ones).
+
+    Changes are those since the commit where the current branch forked from
+    ``ref``, so that changes made to ``ref`` since then aren't included.
+    """
+
+    # git is run however it would be run by whoever is running this.
+    def run(*args, cwd):
+        return subprocess.run(  # noqa: S603
+            ["git", *args],  # noqa: S607
+            capture_output=True,
+            check=True,
+            cwd=cwd,
+            text=True,
+        ).stdout.splitlines()
+
+    (root,) = run("rev-parse", "--show-toplevel", cwd=cwd)
+    (base,) = run("merge-base", ref, "HEAD", cwd=root)
+    changed = run("diff", "--name-only", base, "--", cwd=root)
+    changed += run("ls-files", "--others", "--exclude-standard", cwd=root)
+    return [str(Path(root) / path) for path in changed]
@@ -0,0 +1,221 @@
+"""
+A daemon which runs specs from a warm (preloaded) process.
+
+``ivoire serve`` imports whatever it's asked to preload, then listens on a
+Unix socket. Each request (from ``ivoire run --daemon``) is run in a fresh
+child forked from the daemon, which writes straight to the stdout and stderr
+the client sent along with its request. The daemon restarts itself whenever
+a file it imported changes, so that results are never stale.
+"""
+
+from contextlib import contextmanager, suppress
+from pathlib import Path
+import json
+import os
+import selectors
+import signal
+import socket
+import sys
+import traceback
+
+from ivoire import watch
+from ivoire.imports import project_file
+
+_LISTENER = "IVOIRE_SERVE_LISTENER"
+_MAX_REQUEST = 2**20
+
+
+class NotServing(Exception):
+    """
+    No daemon is listening on the socket.
+    """
+
+
+def serve(path, run, interval=1.0, restart=None):
+    """
+    Serve requests on a Unix socket at ``path`` until interrupted.
+
+    ``run`` is called (in a child process) with the arguments of each
+    request, and may exit (with ``SystemExit``) to set its exit status.
+
+    Once a file imported by the daemon changes, new requests are left waiting
+    until those already running have finished, and then the daemon restarts
+    (by calling ``restart`` with the listening socket, which by default
+    re-executes the daemon, keeping the socket open for the requests).
+    """
+    if restart is None:
+        restart = _restart
+
+    files = watch.mtimes(_imported())
+    children = {}
+
+    with _listening(path) as listener, selectors.DefaultSelector() as ready:
+        ready.register(listener, selectors.EVENT_READ)
+        while listener.fileno() in ready.get_map() or children:
+            for key, _ in ready.select(timeout=interval):
+                if key.fileobj is listener:
+                    connection, _ = listener.accept()
+                    pid = _fork(connection, listener, run)
+                    if pid is not None:
+                        children[pid] = connection
+                        ready.register(connection, selectors.EVENT_READ, pid)
+                else:
+                    # Clients send nothing more, so they must have gone away.
+                    ready.unregister(key.fileobj)
+                    os.kill(key.data, signal.SIGINT)
+
+            _reap(children, ready)
+            listening = listener.fileno() in ready.get_map()
+            if listening and watch.changed(files, watch.mtimes(files)):
+                ready.unregister(listener)
+        restart(listener)
+
+
+def request(path, argv, stdout=None, stderr=None):
+    """
+    Have the daemon listening on ``path`` run with the given arguments.
+
+    Output goes to the given file descriptors (or to this process's own
+    stdout and stderr). Returns the exit status of the run.
+    """
+    if stdout is None:
+        stdout = sys.stdout.fileno()
+    if stderr is None:
+        stderr = sys.stderr.fileno()
+    message = json.dumps({"argv": argv, "cwd": str(Path.cwd())}).encode()
+
+    with socket.socket(socket.AF_UNIX) as connection:
+        try:
+            connection.connect(os.fspath(path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise NotServing(path) from None
+        socket.send_fds(connection, [message], [stdout, stderr])
+        with connection.makefile() as responses:
+            response = responses.readline()
+    if not response:
+        raise NotServing(path)
+    return json.loads(response)["exit"]
+
+
+@contextmanager
+def _listening(path):
+    """
+    Listen on a Unix socket which only the current user can connect to.
+
+    The socket is inherited if the daemon is restarting, and is closed (and
+    removed) only if something goes wrong (e.g. the daemon is interrupted).
+    """
+    path = os.fspath(path)
+    inherited = os.environ.pop(_LISTENER, None)
+    if inherited is not None:
+        listener = socket.socket(fileno=int(inherited))
+        os.set_inheritable(listener.fileno(), False)
+    else:
+        # Clients shouldn't find the socket until it's listening.
+        binding = f"{path}.{os.getpid()}"
+        listener = socket.socket(socket.AF_UNIX)
+        umask = os.umask(0o077)
+        try:
+            listener.bind(binding)
+        finally:
+            os.umask(umask)
+        listener.listen()
+        Path(binding).replace(path)
+
+    try:
+        yield listener
+    except BaseException:
+        listener.close()
+        Path(path).unlink()
+        raise
+
+
+def _restart(listener):
+    """
+    Re-execute the daemon, handing it the socket to keep listening on.
+    """
+    os.set_inheritable(listener.fileno(), True)
+    os.environ[_LISTENER] = str(listener.fileno())
+    # The same interpreter with the same arguments, not any shell command.
+    os.execv(sys.executable, sys.orig_argv)  # noqa: S606
+
+
+def _imported():
+    """
+    The project files which have been imported.
+    """
+    files = (getattr(each, "__file__", None) for each in sys.modules.values())
+    return {path for path in map(project_file, files) if path is not None}
+
+
+def _fork(connection, listener, run):
+    """
+    Run a request in a child process, returning its PID (in the parent).
+    """
+    connection.settimeout(5)
+    try:
+        message, fds, _, _ = socket.recv_fds(connection, _MAX_REQUEST, 2)
+        request = json.loads(message)
+    except (OSError, ValueError):
+        connection.close()
+        return None
+    connection.settimeout(None)
+
+    pid = os.fork()
+    if pid:
+        for fd in fds:
+            os.close(fd)
+        return pid
+
+    status = 1
+    try:
+        listener.close()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        stdout, stderr = fds
+        os.dup2(stdout, sys.stdout.fileno())
+        os.dup2(stderr, sys.stderr.fileno())
+        os.chdir(request["cwd"])
+        status = _status(run, request["argv"])
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(status)
+
+
+def _status(run, argv):
+    """
+    Run, returning the exit status it would have had as its own process.
+    """
+    try:
+        run(argv)
+    except SystemExit as exit:
+        if exit.code is None or isinstance(exit.code, int):
+            return exit.code or 0
+        sys.stderr.write(f"{exit.code}\n")
+        return 1
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _reap(children, ready):
+    """
+    Tell the clients of any finished children how their runs went.
+
+    Only children forked to run specs are waited on, since any others (e.g.
+    subprocesses a preloaded module started) are someone else's to wait on.
+    """
+    for pid in list(children):
+        waited, status = os.waitpid(pid, os.WNOHANG)
+        if not waited:
+            continue
+        connection = children.pop(pid)
+        if connection.fileno() in ready.get_map():
+            ready.unregister(connection)
+        _respond(connection, {"exit": os.waitstatus_to_exitcode(status)})
+
+
+def _respond(connection, response):
+    with connection, suppress(OSError):
+        connection.sendall(json.dumps(response).encode() + b"\n")
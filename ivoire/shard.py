@@ -0,0 +1,79 @@
+"""
+Split specs into shards which take roughly the same time to run.
+
+Every shard is computed from the same inputs (the specs and their recorded
+durations) in the same way, so separate machines each running one shard will
+agree on the split without needing to talk to each other.
+"""
+
+from pathlib import Path
+import heapq
+
+
+def parse(value):
+    """
+    Parse a shard given as ``I/N`` (the 1-indexed I-th of N shards).
+    """
+    index, _, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(  # noqa: TRY003
+            f"{value!r} is not of the form I/N",
+        ) from None
+    if not 1 <= index <= count:
+        raise ValueError(  # noqa: TRY003
+            f"{value!r} is not a shard between 1 and {count}",
+        )
+    return index, count
+
+
+def estimate(specs, durations):
+    """
+    Estimate how long each spec will take to run.
+
+    Specs with recorded durations are expected to take as long as they did
+    last time. Those without any are guessed at from their size, at the rate
+    the specs which were timed ran at (or by size alone if none were).
+    """
+    sizes = {spec: _size(spec) for spec in specs}
+
+    known = [spec for spec in specs if spec in durations]
+    timed = sum(durations[spec] for spec in known)
+    size = sum(sizes[spec] for spec in known)
+    rate = timed / size if timed and size else 1.0
+
+    return {spec: durations.get(spec, sizes[spec] * rate) for spec in specs}
+
+
+def split(specs, count, durations):
+    """
+    Split the specs into the given number of shards.
+
+    Specs are assigned longest first, each to whichever shard is expected
+    to finish soonest (ties going to the earliest shard).
+    """
+    estimates = estimate(sorted(set(specs)), durations)
+    shards = [[] for _ in range(count)]
+    loads = [(0.0, index) for index in range(count)]
+
+    for spec in sorted(estimates, key=lambda spec: (-estimates[spec], spec)):
+        load, index = heapq.heappop(loads)
+        shards[index].append(spec)
+        heapq.heappush(loads, (load + estimates[spec], index))
+
+    return [sorted(shard) for shard in shards]
+
+
+def select(specs, index, count, durations):
+    """
+    Select the specs belonging to the (1-indexed) shard out of ``count``.
+    """
+    return split(specs, count, durations)[index - 1]
+
+
+def _size(spec):
+    try:
+        return Path(spec).stat().st_size
+    except OSError:
+        return 0
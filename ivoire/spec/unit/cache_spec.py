@@ -0,0 +1,287 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sys
+
+from ivoire import describe
+from ivoire.cache import (
+    Cache,
+    Durations,
+    Failures,
+    Impact,
+    Imports,
+    Index,
+)
+from ivoire.result import Timing
+from ivoire.spec.util import ExampleWithPatch, mock
+
+with describe(Cache, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name) / "cache"
+        test.cache = Cache(test.root)
+
+    with it("creates itself when a path is needed") as test:
+        test.assertFalse(test.root.exists())
+        test.assertEqual(test.cache.path("foo"), test.root / "foo")
+        test.assertTrue(test.root.is_dir())
+
+    with it("ignores itself in version control") as test:
+        test.cache.path("foo")
+        test.assertIn("*", (test.root / ".gitignore").read_text())
+
+    with it("keeps nothing if it can't be created") as test:
+        test.root.parent.joinpath("file").touch()
+        cache = Cache(test.root.parent / "file" / "cache")
+        stderr = test.patchObject(sys, "stderr")
+
+        path = cache.path("foo")
+        path.write_text("bar")
+
+        test.assertFalse(path.is_relative_to(cache.root))
+        test.assertEqual(cache.path("foo").read_text(), "bar")
+        stderr.write.assert_called_once_with(mock.ANY)
+
+
+with describe(Durations, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.durations = Cache(directory.name).durations()
+
+    def rows(test):
+        with test.durations._connect() as connection:
+            return connection.execute(
+                'SELECT spec, "group", context, example, wall, cpu '
+                "FROM durations ORDER BY wall",
+            ).fetchall()
+
+    with it("records timings") as test:
+        test.durations.record(
+            [
+                Timing("a_spec.py", "Foo", ("when",), "bars", 2.0, 1.0),
+                Timing("a_spec.py", "Foo", (), "bazzes", 3.0, 1.5),
+            ],
+        )
+        test.assertEqual(
+            rows(test),
+            [
+                ("a_spec.py", "Foo", '["when"]', "bars", 2.0, 1.0),
+                ("a_spec.py", "Foo", "[]", "bazzes", 3.0, 1.5),
+            ],
+        )
+
+    with it("keeps only the most recent timing of each example") as test:
+        test.durations.record([Timing("a_spec.py", "Foo", (), "bar", 2, 1)])
+        test.durations.record([Timing("a_spec.py", "Foo", (), "bar", 3, 1)])
+        test.assertEqual(rows(test), [("a_spec.py", "Foo", "[]", "bar", 3, 1)])
+
+    with it("forgets examples which are gone when their spec runs") as test:
+        test.durations.record(
+            [
+                Timing("a_spec.py", "Foo", (), "bar", 2, 1),
+                Timing("a_spec.py", "Foo", (), "baz", 3, 1),
+                Timing("b_spec.py", "Foo", (), "quux", 4, 1),
+            ],
+        )
+        test.durations.record([Timing("a_spec.py", "Foo", (), "bar", 1, 1)])
+        test.assertEqual(
+            rows(test),
+            [
+                ("a_spec.py", "Foo", "[]", "bar", 1, 1),
+                ("b_spec.py", "Foo", "[]", "quux", 4, 1),
+            ],
+        )
+
+    with it("ignores timings from outside of any spec") as test:
+        test.durations.record([Timing(None, "Foo", (), "bar", 2, 1)])
+        test.assertEqual(rows(test), [])
+
+    with it("totals the durations of each spec") as test:
+        test.durations.record(
+            [
+                Timing("a_spec.py", "Foo", (), "bar", 2.0, 1.0),
+                Timing("a_spec.py", "Foo", (), "baz", 3.0, 1.0),
+                Timing("b_spec.py", "Bar", (), "quux", 1.0, 1.0),
+            ],
+        )
+        test.assertEqual(
+            test.durations.by_spec(),
+            {"a_spec.py": 5.0, "b_spec.py": 1.0},
+        )
+
+
+with describe(Failures, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.failures = Cache(directory.name).failures()
+
+    with it("has no failures to begin with") as test:
+        test.assertEqual(test.failures.load(), set())
+
+    with it("records failures") as test:
+        test.failures.record(
+            timings=[Timing("a_spec.py", "Foo", ("when",), "bars", 2, 1)],
+            failed=[
+                ("a_spec.py", ("Foo", "when", "bars")),
+                ("b_spec.py", None),
+            ],
+        )
+        test.assertEqual(
+            test.failures.load(),
+            {("a_spec.py", ("Foo", "when", "bars")), ("b_spec.py", None)},
+        )
+
+    with it("forgets failures of examples which ran again") as test:
+        test.failures.record(
+            timings=[],
+            failed=[
+                ("a_spec.py", ("Foo", "bars")),
+                ("a_spec.py", ("Foo", "bazzes")),
+            ],
+        )
+        test.failures.record(
+            timings=[Timing("a_spec.py", "Foo", (), "bars", 2, 1)],
+            failed=[],
+        )
+        test.assertEqual(
+            test.failures.load(),
+            {("a_spec.py", ("Foo", "bazzes"))},
+        )
+
+    with it("forgets failures outside examples of specs which ran") as test:
+        test.failures.record(timings=[], failed=[("a_spec.py", None)])
+        test.failures.record(
+            timings=[Timing("a_spec.py", "Foo", (), "bars", 2, 1)],
+            failed=[],
+        )
+        test.assertEqual(test.failures.load(), set())
+
+    with it("ignores failures from outside of any spec") as test:
+        test.failures.record(timings=[], failed=[(None, ("Foo", "bars"))])
+        test.assertEqual(test.failures.load(), set())
+
+
+with describe(Index, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.cache = Cache(directory.name)
+        test.stat = Path(directory.name).stat()
+
+    with it("has nothing indexed to begin with") as test:
+        test.assertIsNone(test.cache.index().get("a_spec.py"))
+
+    with it("remembers indices once saved") as test:
+        index = test.cache.index()
+        index.set("a_spec.py", stat=test.stat, digest="abc", index={"a": 1})
+        index.save()
+
+        indexed = test.cache.index().get("a_spec.py")
+        test.assertEqual(
+            (indexed.digest, indexed.contents, indexed.matches(test.stat)),
+            ("abc", {"a": 1}, True),
+        )
+
+    with it("does not remember unsaved indices") as test:
+        index = test.cache.index()
+        index.set("a_spec.py", stat=test.stat, digest="abc", index={"a": 1})
+        test.assertIsNone(test.cache.index().get("a_spec.py"))
+
+
+with describe(Imports, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.imports = Cache(directory.name).imports()
+
+    with it("has nothing recorded to begin with") as test:
+        test.assertEqual(set(test.imports.load()), set())
+
+    with it("records what specs imported") as test:
+        test.imports.record(
+            [
+                ("/a_spec.py", [("/a_spec.py", "/app.py")]),
+                ("/b_spec.py", []),
+            ],
+        )
+        imports = test.imports.load()
+        test.assertEqual(
+            (set(imports), "/b_spec.py" in imports, "/c_spec.py" in imports),
+            ({("/a_spec.py", "/app.py")}, True, False),
+        )
+
+    with it("replaces what files imported when recorded again") as test:
+        test.imports.record(
+            [
+                ("/a_spec.py", [("/a_spec.py", "/app.py")]),
+                ("/b_spec.py", [("/b_spec.py", "/app.py")]),
+            ],
+        )
+        test.imports.record([("/a_spec.py", [("/a_spec.py", "/db.py")])])
+        test.assertEqual(
+            set(test.imports.load()),
+            {("/a_spec.py", "/db.py"), ("/b_spec.py", "/app.py")},
+        )
+
+
+with describe(Impact, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.impact = Cache(directory.name).impact()
+
+    with it("has nothing recorded to begin with") as test:
+        test.assertEqual(test.impact.recorded(), set())
+
+    with it("records which examples were recorded") as test:
+        test.impact.record(
+            [
+                ("a_spec.py", ("Foo", "bars"), {"/app.py": [1, 2]}),
+                ("a_spec.py", ("Foo", "bazzes"), {}),
+                (None, ("Foo", "quuxes"), {"/app.py": [1, 2]}),
+            ],
+        )
+        test.assertEqual(
+            test.impact.recorded(),
+            {("a_spec.py", ("Foo", "bars")), ("a_spec.py", ("Foo", "bazzes"))},
+        )
+
+    with it("finds examples which ran changed lines") as test:
+        test.impact.record(
+            [
+                ("a_spec.py", ("Foo", "bars"), {"/app.py": [1, 2]}),
+                ("a_spec.py", ("Foo", "bazzes"), {"/app.py": [3, 40]}),
+                ("b_spec.py", ("Bar", "quuxes"), {"/db.py": [2]}),
+            ],
+        )
+        test.assertEqual(
+            test.impact.impacted({"/app.py": {40, 50}, "/db.py": {2}}),
+            {
+                ("a_spec.py", ("Foo", "bazzes")),
+                ("b_spec.py", ("Bar", "quuxes")),
+            },
+        )
+
+    with it("replaces what examples ran when recorded again") as test:
+        test.impact.record(
+            [("a_spec.py", ("Foo", "bars"), {"/app.py": [1], "/db.py": [1]})],
+        )
+        test.impact.record([("a_spec.py", ("Foo", "bars"), {"/app.py": [2]})])
+        test.assertEqual(
+            test.impact.impacted({"/app.py": {1}, "/db.py": {1}}),
+            set(),
+        )
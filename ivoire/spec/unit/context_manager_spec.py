@@ -33,9 +33,34 @@ with describe(ContextManager, Example=ExampleWithPatch) as it:
         test.manager.exit()
         test.result.exitContext.assert_called_once_with(depth=0)
 
+    with it("keeps track of the contexts it is in") as test:
+        inner = test.manager.create_context("inner")
+        test.manager.enter(test.context)
+        test.manager.enter(inner)
+        test.assertEqual(test.manager.contexts, [test.context, inner])
+
+        test.manager.exit()
+        test.assertEqual(test.manager.contexts, [test.context])
+
     with it("doesn't call methods if the result doesn't know how") as test:
         del test.result.enterContext, test.result.exitContext
 
         test.manager.enter(test.context)
         test.manager.exit()
         test.assertFalse(test.result.method_calls)
+
+    with it("selects everything by default") as test:
+        test.assertTrue(test.manager.selects(mock.Mock()))
+
+    with it("selects examples by their name path") as test:
+        select = test.manager.select = mock.Mock()
+        example = mock.MagicMock(**{"__str__.return_value": "an example"})
+        example.group = mock.MagicMock(**{"__str__.return_value": "Thing"})
+
+        test.manager.enter(test.context)
+        selected = test.manager.selects(example)
+
+        select.assert_called_once_with(
+            ("Thing", "a test context", "an example"),
+        )
+        test.assertEqual(selected, select.return_value)
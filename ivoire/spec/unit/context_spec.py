@@ -13,3 +13,32 @@ with describe(Context, Example=ExampleWithPatch) as it:
         with test.context:
             test.manager.enter.assert_called_once_with(test.context)
         test.manager.exit.assert_called_once_with()
+
+    with it("runs its after_all hook when exited") as test:
+        example = mock.Mock()
+        after_all = mock.Mock()
+        test.context.before_all(lambda scope: setattr(scope, "thing", 12))
+        test.context.after_all(after_all)
+
+        with test.context:
+            test.context.set_up(example)
+            after_all.assert_not_called()
+
+        test.assertEqual(example.thing, 12)
+        ((scope,), _) = after_all.call_args
+        test.assertEqual(scope.thing, 12)
+
+    with it("reports after_all errors to the manager's result") as test:
+        test.context.before_all(lambda scope: None)
+        test.context.after_all(lambda scope: 1 / 0)
+
+        with test.context:
+            test.context.set_up(mock.Mock())
+
+        ((example, (exc_type, _, _)), _) = (
+            test.manager.result.addError.call_args
+        )
+        test.assertEqual(
+            (str(example), exc_type),
+            ("<after all: a test context>", ZeroDivisionError),
+        )
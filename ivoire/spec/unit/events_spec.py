@@ -0,0 +1,432 @@
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sys
+
+from ivoire import describe, events, impact, profiling, sampling
+from ivoire.manager import Context
+from ivoire.spec.util import ExampleWithPatch, mock
+import ivoire
+
+
+def fake_exc_info():
+    try:
+        raise ValueError("Used to construct exc_info")
+    except ValueError:
+        return sys.exc_info()
+
+
+with describe(events.Recorder, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.events = []
+        test.recorder = events.Recorder(emit=test.events.append)
+        test.example = mock.Mock(failureException=AssertionError)
+        test.example.__str__ = mock.Mock(return_value="an example")
+        test.example.group.__str__ = mock.Mock(return_value="Thing")
+
+    with it("records groups") as test:
+        test.recorder.enterGroup(test.example.group)
+        test.recorder.exitGroup(test.example.group)
+        test.assertEqual(
+            test.events,
+            [("enterGroup", "Thing"), ("exitGroup", "Thing")],
+        )
+
+    with it("records contexts") as test:
+        test.recorder.enterContext(Context("nested", mock.Mock()), depth=1)
+        test.recorder.exitContext(depth=0)
+        test.assertEqual(
+            test.events,
+            [("enterContext", "nested", 1), ("exitContext", 0)],
+        )
+
+    with it("records examples") as test:
+        test.recorder.startTest(test.example)
+        test.recorder.addSuccess(test.example)
+        test.recorder.addSkip(test.example, "a reason")
+        test.recorder.stopTest(test.example)
+        test.assertEqual(
+            test.events,
+            [
+                ("startTest", "Thing", "an example"),
+                ("addSuccess", "Thing", "an example"),
+                ("addSkip", "Thing", "an example", "a reason"),
+                ("stopTest", "Thing", "an example"),
+            ],
+        )
+
+    with it("records specs") as test:
+        test.recorder.enterSpec("a_spec.py")
+        test.recorder.exitSpec("a_spec.py")
+        test.assertEqual(
+            test.events,
+            [("enterSpec", "a_spec.py"), ("exitSpec", "a_spec.py")],
+        )
+
+    with it("records timings") as test:
+        test.recorder.addTiming(test.example, wall=2, cpu=1)
+        test.assertEqual(
+            test.events,
+            [("addTiming", "Thing", "an example", 2, 1)],
+        )
+
+    with it("records lines") as test:
+        test.recorder.addLines(test.example, {"/app.py": [1, 2]})
+        test.assertEqual(
+            test.events,
+            [("addLines", "Thing", "an example", {"/app.py": [1, 2]})],
+        )
+
+    with it("records profiles") as test:
+        rows = [["app.py", 1, "f", 1, 1, 0.5, 0.5, []]]
+        test.recorder.addProfile(test.example, rows)
+        test.assertEqual(
+            test.events,
+            [("addProfile", "Thing", "an example", rows)],
+        )
+
+    with it("records samples") as test:
+        test.recorder.addSamples(test.example, {"f (app.py:1)": 3})
+        test.assertEqual(
+            test.events,
+            [("addSamples", "Thing", "an example", {"f (app.py:1)": 3})],
+        )
+
+    with it("records imports") as test:
+        test.recorder.addImports("a_spec.py", [("a_spec.py", "app.py")])
+        test.assertEqual(
+            test.events,
+            [("addImports", "a_spec.py", [["a_spec.py", "app.py"]])],
+        )
+
+    with it("passes along tracebacks which are already formatted") as test:
+        test.recorder.addError(test.example, "Traceback\n")
+        test.assertEqual(
+            test.events,
+            [("addError", "Thing", "an example", "Traceback\n")],
+        )
+
+    with it("records examples outside of any group") as test:
+        test.example.group = None
+        test.recorder.addSuccess(test.example)
+        test.assertEqual(test.events, [("addSuccess", None, "an example")])
+
+    with it("formats tracebacks for errors and failures") as test:
+        test.recorder.addError(test.example, fake_exc_info())
+        test.recorder.addFailure(test.example, fake_exc_info())
+
+        (error, _, _, error_tb), (failure, _, _, failure_tb) = test.events
+        test.assertEqual((error, failure), ("addError", "addFailure"))
+        test.assertIn("ValueError: Used to construct exc_info", error_tb)
+        test.assertIn("ValueError: Used to construct exc_info", failure_tb)
+
+
+with describe(events.Replayer, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.result = mock.Mock()
+        test.replayer = events.Replayer(test.result)
+
+    with it("replays groups and contexts") as test:
+        test.replayer.replay(
+            [
+                ("enterGroup", "Thing"),
+                ("enterContext", "nested", 1),
+                ("exitContext", 0),
+                ("exitGroup", "Thing"),
+            ],
+        )
+
+        (group,), _ = test.result.enterGroup.call_args
+        (context,), _ = test.result.enterContext.call_args
+        test.assertEqual((str(group), context.name), ("Thing", "nested"))
+        test.assertEqual(
+            test.result.method_calls,
+            [
+                mock.call.enterGroup(group),
+                mock.call.enterContext(context, depth=1),
+                mock.call.exitContext(depth=0),
+                mock.call.exitGroup(group),
+            ],
+        )
+
+    with it("replays examples with the same names") as test:
+        test.replayer.replay(
+            [
+                ("startTest", "Thing", "an example"),
+                ("addFailure", "Thing", "an example", "Traceback\n"),
+                ("stopTest", "Thing", "an example"),
+            ],
+        )
+
+        (example,), _ = test.result.startTest.call_args
+        test.assertEqual(
+            (str(example), str(example.group)),
+            ("an example", "Thing"),
+        )
+        test.assertEqual(
+            test.result.method_calls,
+            [
+                mock.call.startTest(example),
+                mock.call.addFailure(example, "Traceback\n"),
+                mock.call.stopTest(example),
+            ],
+        )
+
+    with it("replays specs and timings") as test:
+        test.replayer.replay(
+            [
+                ("enterSpec", "a_spec.py"),
+                ("addTiming", "Thing", "an example", 2, 1),
+                ("exitSpec", "a_spec.py"),
+            ],
+        )
+
+        (example,), _ = test.result.addTiming.call_args
+        test.assertEqual(
+            test.result.method_calls,
+            [
+                mock.call.enterSpec("a_spec.py"),
+                mock.call.addTiming(example, wall=2, cpu=1),
+                mock.call.exitSpec("a_spec.py"),
+            ],
+        )
+
+    with it("replays lines") as test:
+        test.replayer(("addLines", "Thing", "an example", {"/app.py": [1]}))
+        (example, lines), _ = test.result.addLines.call_args
+        test.assertEqual(
+            (str(example.group), str(example), lines),
+            ("Thing", "an example", {"/app.py": [1]}),
+        )
+
+    with it("replays profiles") as test:
+        rows = [["app.py", 1, "f", 1, 1, 0.5, 0.5, []]]
+        test.replayer(("addProfile", "Thing", "an example", rows))
+        (example, replayed), _ = test.result.addProfile.call_args
+        test.assertEqual(
+            (str(example.group), str(example), replayed),
+            ("Thing", "an example", rows),
+        )
+
+    with it("replays samples") as test:
+        samples = {"f (app.py:1)": 3}
+        test.replayer(("addSamples", "Thing", "an example", samples))
+        (example, replayed), _ = test.result.addSamples.call_args
+        test.assertEqual(
+            (str(example.group), str(example), replayed),
+            ("Thing", "an example", samples),
+        )
+
+    with it("replays imports") as test:
+        test.replayer(("addImports", "a_spec.py", [["a_spec.py", "app.py"]]))
+        test.result.addImports.assert_called_once_with(
+            "a_spec.py",
+            [("a_spec.py", "app.py")],
+        )
+
+    with it("replays errors from outside of any example") as test:
+        test.replayer(("addError", None, "<not in example>", "Traceback\n"))
+        (example, traceback), _ = test.result.addError.call_args
+        test.assertEqual(
+            (str(example), example.group, traceback),
+            ("<not in example>", None, "Traceback\n"),
+        )
+
+    with it("attributes aborts to the running example") as test:
+        test.replayer.replay(
+            [
+                ("enterSpec", "a_spec.py"),
+                ("enterGroup", "Thing"),
+                ("enterContext", "nested", 1),
+                ("startTest", "Thing", "an example"),
+            ],
+        )
+        test.result.reset_mock()
+
+        test.replayer.abort("It died.\n")
+
+        (example, _), _ = test.result.addError.call_args
+        (group,), _ = test.result.exitGroup.call_args
+        test.assertEqual(
+            test.result.method_calls,
+            [
+                mock.call.addError(example, "It died.\n"),
+                mock.call.stopTest(example),
+                mock.call.exitContext(depth=0),
+                mock.call.exitGroup(group),
+                mock.call.exitSpec("a_spec.py"),
+            ],
+        )
+        test.assertEqual(str(example), "an example")
+
+    with it("doesn't add a second error to examples which errored") as test:
+        test.replayer.replay(
+            [
+                ("startTest", "Thing", "hangs"),
+                ("addError", "Thing", "hangs", "It hung.\n"),
+            ],
+        )
+        test.result.reset_mock()
+
+        test.replayer.abort("It died.\n")
+
+        (example,), _ = test.result.stopTest.call_args
+        test.assertEqual(
+            (test.result.method_calls, str(example)),
+            ([mock.call.stopTest(example)], "hangs"),
+        )
+
+    with it("knows when everything it started has finished") as test:
+        test.assertTrue(test.replayer.finished)
+        test.replayer(("enterSpec", "a_spec.py"))
+        test.replayer(("enterGroup", "Thing"))
+        test.assertFalse(test.replayer.finished)
+        test.replayer(("exitGroup", "Thing"))
+        test.replayer(("exitSpec", "a_spec.py"))
+        test.assertTrue(test.replayer.finished)
+
+    with it("attributes aborts outside of examples to no example") as test:
+        test.replayer.abort("It died.\n")
+        (example, traceback), _ = test.result.addError.call_args
+        test.assertEqual(
+            (str(example), traceback),
+            ("<not in example>", "It died.\n"),
+        )
+
+
+with describe(events.Wrapper, Example=ExampleWithPatch) as it:
+    with it("delegates everything to the result") as test:
+        result = mock.Mock()
+        test.assertIs(events.Wrapper(result).addSuccess, result.addSuccess)
+
+
+with describe(events.load_wrapped, Example=ExampleWithPatch) as it:
+    with it("wraps the current result while loading the spec") as test:
+        result = test.patchObject(ivoire, "current_result")
+        test.patchObject(ivoire._manager, "result", result)
+        wrappers = [
+            (events.Wrapper, {}),
+            (profiling.Profiling, {"slower_than": 2}),
+            (sampling.Sampling, {"rate": 10}),
+        ]
+        if impact.monitoring is not None:
+            wrappers.append((impact.Recording, {}))
+
+        loaded: list[tuple[str, events.Wrapper]] = []
+
+        def load(spec, result):
+            loaded.append((spec, ivoire.current_result))
+
+        for Wrapper, kwargs in wrappers:
+            with test.subTest(Wrapper=Wrapper):
+                events.load_wrapped(
+                    Wrapper,
+                    load,
+                    "a_spec.py",
+                    result,
+                    **kwargs,
+                )
+
+                spec, wrapper = loaded.pop()
+                test.assertEqual(
+                    (spec, type(wrapper), wrapper.result),
+                    ("a_spec.py", Wrapper, result),
+                )
+                test.assertEqual(
+                    {name: getattr(wrapper, name) for name in kwargs},
+                    kwargs,
+                )
+                test.assertIs(ivoire.current_result, result)
+
+
+with describe(events.Tee, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.result = mock.Mock()
+        test.recorder = mock.Mock()
+        test.tee = events.Tee(test.result, test.recorder)
+
+    with it("passes events to both the result and the recorder") as test:
+        example = mock.Mock()
+        test.tee.addSuccess(example)
+        test.result.addSuccess.assert_called_once_with(example)
+        test.recorder.addSuccess.assert_called_once_with(example)
+
+    with it("records events the result doesn't know about") as test:
+        del test.result.enterSpec
+        test.tee.enterSpec("a_spec.py")
+        test.recorder.enterSpec.assert_called_once_with("a_spec.py")
+
+    with it("delegates everything else to the result") as test:
+        test.assertIs(test.tee.wasSuccessful, test.result.wasSuccessful)
+
+
+with describe(events.Writer, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.path = Path(directory.name) / "results.res"
+
+    def write(test, *written):
+        with test.path.open("w") as file:
+            writer = events.Writer(file)
+            for event in written:
+                writer(event)
+
+    with it("writes events which can be loaded back") as test:
+        written = [
+            ("enterSpec", "a_spec.py"),
+            ("startTest", "Thing", "an example"),
+            ("addTiming", "Thing", "an example", 2.5, 1.5),
+            ("stopTest", "Thing", "an example"),
+            ("exitSpec", "a_spec.py"),
+        ]
+        write(test, *written)
+        test.assertEqual(list(events.load(test.path)), written)
+
+    with it("reads tracebacks back only when they're needed") as test:
+        write(test, ("addError", "Thing", "an example", "Traceback\n"))
+        ((name, group, example, traceback),) = events.load(test.path)
+        test.assertEqual(
+            (name, group, example, str(traceback)),
+            ("addError", "Thing", "an example", "Traceback\n"),
+        )
+        test.assertNotIsInstance(traceback, str)
+
+    with it("trims very long tracebacks") as test:
+        long = "Traceback\n" + "x" * events.TRACEBACK_LIMIT + "\nError!\n"
+        write(test, ("addFailure", "Thing", "an example", long))
+        ((*_, traceback),) = events.load(test.path)
+        traceback = str(traceback)
+        test.assertLessEqual(len(traceback), events.TRACEBACK_LIMIT)
+        test.assertTrue(traceback.startswith("Traceback\n"))
+        test.assertTrue(traceback.endswith("\nError!\n"))
+        test.assertIn("characters trimmed", traceback)
+
+    with it("ignores a partially written last event") as test:
+        write(test, ("enterSpec", "a_spec.py"), ("exitSpec", "a_spec.py"))
+        test.path.write_text(test.path.read_text()[:-5])
+        test.assertEqual(
+            list(events.load(test.path)),
+            [("enterSpec", "a_spec.py")],
+        )
+
+    with it("refuses to load other files") as test:
+        test.path.write_text("something else\n")
+        with test.assertRaises(ValueError):
+            list(events.load(test.path))
+
+    with it("flushes after each spec") as test:
+        file = mock.Mock(wraps=StringIO())
+        writer = events.Writer(file)
+        writer(("enterSpec", "a_spec.py"))
+        file.flush.assert_not_called()
+        writer(("exitSpec", "a_spec.py"))
+        file.flush.assert_called_once_with()
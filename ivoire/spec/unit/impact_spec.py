@@ -0,0 +1,152 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import importlib
+import sys
+
+from ivoire import describe, impact
+from ivoire.imports import absolute
+from ivoire.spec.util import ExampleWithPatch, mock
+
+with describe(impact.Recording, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name).resolve()
+        test.patchObject(sys, "path", [str(test.root), *sys.path])
+        test.patchDict(sys.modules)
+        (test.root / "app.py").write_text(
+            "def f(x):\n"
+            "    if x:\n"
+            "        return 1\n"
+            "    return 2\n",
+        )
+        if impact.monitoring is not None:
+            test.app = importlib.import_module("app")
+        test.result = mock.Mock()
+        test.recording = impact.Recording(test.result)
+
+    def lines(test):
+        (_, lines), _ = test.result.addLines.call_args
+        return lines.get(str(test.root / "app.py"))
+
+    with it("records the lines each example runs") as test:
+        test.skip_if(impact.monitoring is None, "Needs sys.monitoring.")
+        with test.recording.running():
+            test.recording.startTest(test)
+            test.app.f(True)
+            test.recording.stopTest(test)
+        test.assertEqual(lines(test), [2, 3])
+
+    with it("records examples separately") as test:
+        test.skip_if(impact.monitoring is None, "Needs sys.monitoring.")
+        with test.recording.running():
+            test.recording.startTest(test)
+            test.app.f(True)
+            test.recording.stopTest(test)
+            test.recording.startTest(test)
+            test.app.f(False)
+            test.app.f(True)
+            test.recording.stopTest(test)
+        test.assertEqual(lines(test), [2, 3, 4])
+
+    with it("passes events along to the result") as test:
+        test.skip_if(impact.monitoring is None, "Needs sys.monitoring.")
+        with test.recording.running():
+            test.recording.startTest(test)
+            test.recording.addSuccess(test)
+            test.recording.stopTest(test)
+        test.assertEqual(
+            [name for name, _, _ in test.result.method_calls],
+            ["startTest", "addSuccess", "addLines", "stopTest"],
+        )
+
+    with it("stops monitoring afterwards") as test:
+        test.skip_if(impact.monitoring is None, "Needs sys.monitoring.")
+        with test.recording.running():
+            pass
+        test.assertIsNone(impact.monitoring.get_tool(impact._free_tool()))
+
+    with it("leaves the tool IDs reserved for other tools alone") as test:
+        test.patchObject(
+            impact,
+            "monitoring",
+            mock.Mock(
+                DEBUGGER_ID=0,
+                COVERAGE_ID=1,
+                PROFILER_ID=2,
+                OPTIMIZER_ID=5,
+                get_tool=lambda each: "other" if each == 3 else None,
+            ),
+        )
+        test.assertEqual(impact._free_tool(), 4)
+
+
+with describe(impact.parse_diff, Example=ExampleWithPatch) as it:
+
+    def parse(diff):
+        return impact.parse_diff(diff.splitlines(keepends=True))
+
+    with it("finds removed lines") as test:
+        changed = parse(
+            "--- a/app.py\n"
+            "+++ b/app.py\n"
+            "@@ -3,3 +3,2 @@\n"
+            " a\n"
+            "-b\n"
+            " c\n",
+        )
+        test.assertEqual(changed, {absolute("app.py"): {4}})
+
+    with it("finds the lines around added lines") as test:
+        changed = parse(
+            "--- a/app.py\n"
+            "+++ b/app.py\n"
+            "@@ -3,2 +3,3 @@\n"
+            " a\n"
+            "+b\n"
+            " c\n",
+        )
+        test.assertEqual(changed, {absolute("app.py"): {3, 4}})
+
+    with it("finds the lines around lines added on their own") as test:
+        changed = parse(
+            "--- a/app.py\n"
+            "+++ b/app.py\n"
+            "@@ -10,0 +11,2 @@\n"
+            "+a\n"
+            "+b\n",
+        )
+        test.assertEqual(changed, {absolute("app.py"): {10, 11}})
+
+    with it("finds changes in each file") as test:
+        changed = parse(
+            "diff --git a/a.py b/a.py\n"
+            "--- a/a.py\n"
+            "+++ b/a.py\n"
+            "@@ -1 +1 @@\n"
+            "-a\n"
+            "+b\n"
+            "diff --git a/b.py b/b.py\n"
+            "--- a/b.py\n"
+            "+++ b/b.py\n"
+            "@@ -2,2 +2,2 @@\n"
+            "--- a\n"
+            "+++ b\n"
+            " c\n",
+        )
+        test.assertEqual(
+            changed,
+            {absolute("a.py"): {1}, absolute("b.py"): {2}},
+        )
+
+    with it("ignores new files") as test:
+        changed = parse(
+            "--- /dev/null\n"
+            "+++ b/new.py\n"
+            "@@ -0,0 +1,2 @@\n"
+            "+a\n"
+            "+b\n",
+        )
+        test.assertEqual(changed, {})
@@ -0,0 +1,107 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sys
+
+from ivoire import describe
+from ivoire.imports import Graph
+from ivoire.spec.util import ExampleWithPatch
+
+with describe(Graph, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name).resolve()
+        test.patchObject(sys, "path", [str(test.root), *sys.path])
+        test.patchDict(sys.modules)
+
+        package = test.root / "app"
+        package.mkdir()
+        (package / "__init__.py").write_text("")
+        (package / "models.py").write_text("from . import db\n")
+        (package / "db.py").write_text("import json\n")
+        (test.root / "unrelated.py").write_text("")
+
+        test.graph = Graph()
+
+    def record(test, source):
+        namespace = {"__file__": str(test.root / "a_spec.py")}
+        with test.graph.recording():
+            exec(source, namespace)
+
+    with it("records what is imported, and what that imports") as test:
+        record(test, "from app import models\n")
+        test.assertEqual(
+            test.graph.dependencies(test.root / "a_spec.py"),
+            {
+                str(test.root / "app" / "__init__.py"),
+                str(test.root / "app" / "models.py"),
+                str(test.root / "app" / "db.py"),
+            },
+        )
+
+    with it("records modules imported with importlib") as test:
+        record(test, "import importlib\nimportlib.import_module('app.db')\n")
+        test.assertEqual(
+            test.graph.dependencies(test.root / "a_spec.py"),
+            {
+                str(test.root / "app" / "__init__.py"),
+                str(test.root / "app" / "db.py"),
+            },
+        )
+
+    with it("ignores modules from outside the project") as test:
+        record(test, "import json\n")
+        test.assertEqual(test.graph.files(), set())
+
+    with it("knows what depends on a file") as test:
+        record(test, "import app.models\nimport unrelated\n")
+        test.assertEqual(
+            test.graph.dependents([test.root / "app" / "db.py"]),
+            {
+                str(test.root / "app" / "models.py"),
+                str(test.root / "a_spec.py"),
+            },
+        )
+
+    with it("forgets what changed files import") as test:
+        record(test, "import app.models\n")
+        test.graph.forget([test.root / "app" / "models.py"])
+        test.assertEqual(
+            test.graph.dependencies(test.root / "a_spec.py"),
+            {
+                str(test.root / "app" / "__init__.py"),
+                str(test.root / "app" / "models.py"),
+            },
+        )
+
+    with it("stops recording afterwards") as test:
+        record(test, "")
+        exec("import unrelated\n", {"__file__": "b_spec.py"})
+        test.assertEqual(test.graph.files(), set())
+
+    with it("finds the chain of imports leading to a file") as test:
+        record(test, "import app.models\n")
+        test.assertEqual(
+            test.graph.chain(
+                test.root / "a_spec.py",
+                [test.root / "app" / "db.py"],
+            ),
+            [
+                str(test.root / "a_spec.py"),
+                str(test.root / "app" / "models.py"),
+                str(test.root / "app" / "db.py"),
+            ],
+        )
+
+    with it("finds no chain to files which aren't imported") as test:
+        record(test, "import app.models\n")
+        test.assertIsNone(
+            test.graph.chain(test.root / "a_spec.py", [test.root / "b.py"]),
+        )
+
+    with it("knows which files were recorded") as test:
+        graph = Graph(recorded=[str(test.root / "a_spec.py")])
+        test.assertIn(test.root / "a_spec.py", graph)
+        test.assertNotIn(test.root / "b_spec.py", graph)
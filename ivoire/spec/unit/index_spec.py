@@ -0,0 +1,175 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+import os
+
+from ivoire import describe, index
+from ivoire.cache import Cache
+from ivoire.spec.util import ExampleWithPatch, mock
+
+with describe(index.index_source, Example=ExampleWithPatch) as it:
+
+    def index_source(source):
+        return index.index_source(dedent(source))
+
+    with it("indexes groups, contexts and examples") as test:
+        indexed = index_source(
+            """
+            from ivoire import context, describe
+            with describe(Calculator) as it:
+                @it.before
+                def before(test):
+                    test.calc = Calculator()
+
+                with it("adds") as test:
+                    pass
+
+                with context(Calculator.divide):
+                    with it("divides") as test:
+                        pass
+            """,
+        )
+        test.assertEqual(
+            indexed,
+            [
+                {
+                    "kind": "group",
+                    "name": "Calculator",
+                    "line": 3,
+                    "children": [
+                        {"kind": "example", "name": "adds", "line": 8},
+                        {
+                            "kind": "context",
+                            "name": "divide",
+                            "line": 11,
+                            "children": [
+                                {
+                                    "kind": "example",
+                                    "name": "divides",
+                                    "line": 12,
+                                },
+                            ],
+                        },
+                    ],
+                },
+            ],
+        )
+
+    with it("uses whatever name the group is bound to") as test:
+        indexed = index_source(
+            """
+            with ivoire.describe(len) as group:
+                with group("works"):
+                    pass
+                with it("is not an example of this group"):
+                    pass
+            """,
+        )
+        test.assertEqual(
+            indexed[0]["children"],
+            [{"kind": "example", "name": "works", "line": 3}],
+        )
+
+    with it("finds examples inside other statements") as test:
+        indexed = index_source(
+            """
+            with describe(len) as it:
+                if True:
+                    with it("works"):
+                        pass
+                with open("foo") as file:
+                    with it("also works"):
+                        pass
+            """,
+        )
+        test.assertEqual(
+            [child["name"] for child in indexed[0]["children"]],
+            ["works", "also works"],
+        )
+
+    with it("has no name for examples named dynamically") as test:
+        indexed = index_source(
+            """
+            with describe(len) as it:
+                for each in range(3):
+                    with it(f"works for {each}"):
+                        pass
+            """,
+        )
+        test.assertEqual(
+            indexed[0]["children"],
+            [{"kind": "example", "name": None, "line": 4}],
+        )
+
+    with it("doesn't look inside functions") as test:
+        indexed = index_source(
+            """
+            def helper():
+                with describe(len) as it:
+                    pass
+            """,
+        )
+        test.assertEqual(indexed, [])
+
+
+with describe(index.index_file, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.path = Path(directory.name) / "a_spec.py"
+        test.path.write_text(
+            'with describe(len) as it:\n    with it("a"):\n        pass\n',
+        )
+        test.cache = Cache(directory.name).index()
+
+    with it("indexes files") as test:
+        test.assertEqual(
+            index.index_file(test.path),
+            {
+                "children": [
+                    {
+                        "kind": "group",
+                        "name": "len",
+                        "line": 1,
+                        "children": [
+                            {"kind": "example", "name": "a", "line": 2},
+                        ],
+                    },
+                ],
+            },
+        )
+
+    with it("reports files which don't parse") as test:
+        test.path.write_text("with describe(len) as it\n")
+        indexed = index.index_file(test.path)
+        test.assertIn("SyntaxError", indexed["error"])
+
+    with it("uses the cache for files which haven't changed") as test:
+        cached = index.index_file(test.path, cache=test.cache)
+        test.cache.save()
+
+        index_source = mock.Mock()
+        test.patchObject(index, "index_source", index_source)
+        test.assertEqual(index.index_file(test.path, cache=test.cache), cached)
+        index_source.assert_not_called()
+
+    with it("uses the cache for files which were only touched") as test:
+        cached = index.index_file(test.path, cache=test.cache)
+        test.cache.save()
+        stat = test.path.stat()
+        os.utime(test.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        index_source = mock.Mock()
+        test.patchObject(index, "index_source", index_source)
+        test.assertEqual(index.index_file(test.path, cache=test.cache), cached)
+        index_source.assert_not_called()
+
+    with it("reindexes files which have changed") as test:
+        index.index_file(test.path, cache=test.cache)
+        test.cache.save()
+        test.path.write_text("with describe(abs) as it:\n    pass\n")
+
+        indexed = index.index_file(test.path, cache=test.cache)
+        test.assertEqual(indexed["children"][0]["name"], "abs")
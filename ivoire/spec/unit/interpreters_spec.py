@@ -0,0 +1,133 @@
+from importlib.util import find_spec
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+
+from ivoire import describe, interpreters, result, run
+from ivoire.spec.util import ExampleWithPatch
+
+with describe(interpreters.run, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+
+        test.stream = StringIO()
+        formatter = result.Verbose(result.DotsFormatter(test.stream))
+        test.result = result.ExampleResult(formatter)
+
+    def spec(test, name, source):
+        path = test.root / name
+        path.write_text(dedent(source))
+        return str(path)
+
+    def run_specs(test, *specs, count=2):
+        return interpreters.run(
+            specs,
+            result=test.result,
+            interpreters=count,
+            load=run.load_spec,
+        )
+
+    with it("replays each spec's results") as test:
+        test.skip_if(not interpreters.available, "Needs subinterpreters.")
+        one = spec(
+            test,
+            "one_spec.py",
+            """
+            from ivoire import context, describe
+            with describe(len) as it:
+                with context("in a context"):
+                    with it("passes") as test:
+                        pass
+                with it("fails") as test:
+                    test.fail("Nope!")
+            """,
+        )
+        two = spec(
+            test,
+            "two_spec.py",
+            """
+            from ivoire import describe
+            with describe(abs) as it:
+                with it("errors") as test:
+                    raise ZeroDivisionError()
+            """,
+        )
+
+        test.assertEqual(run_specs(test, one, two), [])
+
+        test.assertEqual(test.result.testsRun, 3)
+        test.assertEqual(
+            [str(example) for example, _ in test.result.errors],
+            ["errors"],
+        )
+        ((failed, traceback),) = test.result.failures
+        test.assertEqual(str(failed), "fails")
+        test.assertIn("AssertionError: Nope!", traceback)
+        test.assertIn(
+            "len\n    in a context\n        passes\n    fails - FAIL\n",
+            test.stream.getvalue(),
+        )
+
+    with it("hands back specs which can't run in subinterpreters") as test:
+        test.skip_if(not interpreters.available, "Needs subinterpreters.")
+        test.skip_if(
+            find_spec("_testsinglephase") is None,
+            "Needs an extension module which doesn't support them.",
+        )
+        unsupported = spec(
+            test,
+            "unsupported_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("imports") as test:
+                    import _testsinglephase
+            """,
+        )
+        fine = spec(
+            test,
+            "fine_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+            """,
+        )
+
+        test.assertEqual(run_specs(test, unsupported, fine), [unsupported])
+        test.assertEqual(
+            (test.result.testsRun, test.result.errors),
+            (1, []),
+        )
+
+    with it("reports specs which crash the subinterpreter") as test:
+        test.skip_if(not interpreters.available, "Needs subinterpreters.")
+        crashes = spec(test, "crashes_spec.py", "raise SystemExit(12)\n")
+        run_specs(test, crashes, count=1)
+        ((example, traceback),) = test.result.errors
+        test.assertEqual(str(example), "<not in example>")
+        test.assertIn("SystemExit", traceback)
+
+    with it("stops early if the result says to") as test:
+        test.skip_if(not interpreters.available, "Needs subinterpreters.")
+        fails = spec(
+            test,
+            "fails_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("fails") as test:
+                    test.fail()
+            """,
+        )
+        test.result.failfast = True
+
+        run_specs(test, fails, fails, fails, count=1)
+
+        test.assertEqual(test.result.testsRun, 1)
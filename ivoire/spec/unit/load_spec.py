@@ -1,4 +1,12 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import os
+import sys
+
 from ivoire import describe, load
+from ivoire.cache import Cache
+from ivoire.imports import Graph
+from ivoire.load import SpecLoader
 from ivoire.spec.util import ExampleWithPatch, mock
 
 with describe(load.load_by_name, Example=ExampleWithPatch) as it:
@@ -12,7 +20,7 @@ with describe(load.load_by_name, Example=ExampleWithPatch) as it:
     with it("loads paths") as test:
         test.path_exists.return_value = True
         load.load_by_name("foo")
-        test.load_from_path.assert_called_once_with("foo")
+        test.load_from_path.assert_called_once_with("foo", imports=None)
 
     with it("loads modules") as test:
         test.path_exists.return_value = False
@@ -25,8 +33,8 @@ with describe(load.load_from_path, Example=ExampleWithPatch) as it:
     @it.before
     def before(test):
         test.is_dir = test.patchObject(load.Path, "is_dir")
-        test.SourceFileLoader = test.patchObject(load, "SourceFileLoader")
-        test.SourceFileLoader.return_value.name = "some name"
+        test.SpecLoader = test.patchObject(load, "SpecLoader")
+        test.SpecLoader.return_value.name = "some name"
         test.path = "foo/bar"
 
     with it("discovers specs if given a directory") as test:
@@ -37,7 +45,7 @@ with describe(load.load_from_path, Example=ExampleWithPatch) as it:
         load.load_from_path(test.path)
 
         test.assertEqual(
-            test.SourceFileLoader.call_args_list,
+            test.SpecLoader.call_args_list,
             [
                 mock.call("bar", "foo/bar"),
                 mock.call("baz", "bar/baz"),
@@ -48,7 +56,70 @@ with describe(load.load_from_path, Example=ExampleWithPatch) as it:
     with it("loads paths") as test:
         test.is_dir.return_value = False
         load.load_from_path(test.path)
-        test.SourceFileLoader.assert_called_once_with("bar", test.path)
+        test.SpecLoader.assert_called_once_with("bar", test.path)
+
+    with it("records what specs import if asked") as test:
+        test.patchObject(load, "SpecLoader", SpecLoader)
+        test.is_dir.return_value = False
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        root = Path(directory.name).resolve()
+        (root / "a_spec.py").write_text("import b\n")
+        (root / "b.py").write_text("")
+        test.patchObject(sys, "path", [str(root), *sys.path])
+        test.patchDict(sys.modules)
+        imports = Graph()
+
+        load.load_from_path(str(root / "a_spec.py"), imports=imports)
+
+        test.assertEqual(
+            set(imports),
+            {(str(root / "a_spec.py"), str(root / "b.py"))},
+        )
+
+    with it("runs specs which await at their top level") as test:
+        test.patchObject(load, "SpecLoader", SpecLoader)
+        test.is_dir.return_value = False
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "a_spec.py"
+        path.write_text(
+            "import asyncio, sys\n"
+            "await asyncio.sleep(0)\n"
+            "sys.awaited = asyncio.get_running_loop()\n",
+        )
+        test.addCleanup(vars(sys).pop, "awaited", None)
+
+        load.load_from_path(str(path))
+
+        test.assertTrue(vars(sys)["awaited"].is_closed())
+
+    with it("doesn't cache specs which await at their top level") as test:
+        test.patchObject(load, "SpecLoader", SpecLoader)
+        test.patchObject(sys, "dont_write_bytecode", False)
+        test.is_dir.return_value = False
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        (root / "a_spec.py").write_text("import asyncio\n")
+        (root / "b_spec.py").write_text("await __import__('asyncio').sleep(0)")
+
+        load.load_from_path(str(root / "a_spec.py"))
+        load.load_from_path(str(root / "b_spec.py"))
+
+        cached = [each.name for each in (root / "__pycache__").iterdir()]
+        test.assertEqual([name.split(".")[0] for name in cached], ["a_spec"])
+
+
+with describe(load.expand, Example=ExampleWithPatch) as it:
+    with it("discovers specs inside directories") as test:
+        test.patchObject(load.Path, "is_dir", side_effect=[True, False])
+        discover = mock.Mock(return_value=["a", "b"])
+
+        specs = list(load.expand(["dir", "c_spec.py"], discover=discover))
+
+        test.assertEqual(specs, ["a", "b", "c_spec.py"])
+        discover.assert_called_once_with("dir")
 
 
 with describe(load.filter_specs, Example=ExampleWithPatch) as it:
@@ -57,20 +128,118 @@ with describe(load.filter_specs, Example=ExampleWithPatch) as it:
         specs = load.filter_specs(files)
         test.assertEqual(specs, ["dir/c_spec.py", "d_spec.py"])
 
+    with it("can filter by other patterns") as test:
+        files = ["a.py", "test_b.py", "c_spec.py", "d_test.py"]
+        specs = load.filter_specs(files, patterns=["test_*.py", "*_test.py"])
+        test.assertEqual(specs, ["test_b.py", "d_test.py"])
+
 
 with describe(load.discover, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory, cache = TemporaryDirectory(), TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.addCleanup(cache.cleanup)
+        test.root = Path(directory.name)
+        test.cache = Cache(cache.name)
+
+    def tree(test, *paths):
+        for path in paths:
+            path = test.root / path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.touch()
+
+    def discover(test, **kwargs):
+        specs = load.discover(test.root, **kwargs)
+        return [os.path.relpath(spec, test.root) for spec in specs]
+
+    def settle(test, *directories):
+        # Pretend directories were last modified a while ago.
+        for directory in directories:
+            os.utime(test.root / directory, ns=(0, 0))
+
     with it("discovers specs") as test:
-        subdirs = mock.Mock()
-        files, more_files = ["one"], ["two", "three"]
+        tree(test, "a_spec.py", "b.py", "dir/c_spec.py", "dir/sub/d_spec.py")
+        test.assertEqual(
+            discover(test),
+            ["a_spec.py", "dir/c_spec.py", "dir/sub/d_spec.py"],
+        )
+
+    with it("discovers specs in order") as test:
+        tree(test, "b/b_spec.py", "a/z_spec.py", "a/a_spec.py", "c_spec.py")
+        test.assertEqual(
+            discover(test),
+            ["c_spec.py", "a/a_spec.py", "a/z_spec.py", "b/b_spec.py"],
+        )
+
+    with it("skips directories which are excluded by default") as test:
+        tree(test, ".git/a_spec.py", "node_modules/x/b_spec.py", "c_spec.py")
+        test.assertEqual(discover(test), ["c_spec.py"])
+
+    with it("skips other excluded directories and files") as test:
+        tree(test, "build/a_spec.py", "b_spec.py", "c/slow_spec.py")
+        test.assertEqual(
+            discover(test, exclude=["build", "*/c/slow_spec.py"]),
+            ["b_spec.py"],
+        )
 
-        tree = [("dir", subdirs, files), ("dir/child", subdirs, more_files)]
-        walk = test.patchObject(load.os, "walk", return_value=tree)
+    with it("skips virtualenvs") as test:
+        tree(test, "env/pyvenv.cfg", "env/lib/a_spec.py", "b_spec.py")
+        test.assertEqual(discover(test), ["b_spec.py"])
 
+    with it("uses the given filter") as test:
+        tree(test, "a_spec.py", "test_b.py")
         no_filter = mock.Mock(side_effect=lambda paths: paths)
+        test.assertEqual(
+            discover(test, filter_specs=no_filter),
+            ["a_spec.py", "test_b.py"],
+        )
+
+    with it("doesn't list unchanged directories again") as test:
+        tree(test, "a_spec.py", "dir/b_spec.py")
+        settle(test, ".", "dir")
+        index = test.cache.directories(settings=[])
+        discover(test, index=index)
+        index.save()
+
+        index = test.cache.directories(settings=[])
+        scandir = test.patchObject(load.os, "scandir")
+        test.assertEqual(
+            discover(test, index=index),
+            ["a_spec.py", "dir/b_spec.py"],
+        )
+        scandir.assert_not_called()
+
+    with it("lists changed directories again") as test:
+        tree(test, "a_spec.py", "dir/b_spec.py")
+        settle(test, ".", "dir")
+        index = test.cache.directories(settings=[])
+        discover(test, index=index)
+        index.save()
+
+        tree(test, "dir/c_spec.py")
+        index = test.cache.directories(settings=[])
+        test.assertEqual(
+            discover(test, index=index),
+            ["a_spec.py", "dir/b_spec.py", "dir/c_spec.py"],
+        )
+
+    with it("doesn't remember directories which just changed") as test:
+        tree(test, "a_spec.py")
+        index = test.cache.directories(settings=[])
+        discover(test, index=index)
+        index.save()
+
+        index = test.cache.directories(settings=[])
+        test.assertIsNone(index.get(str(test.root)))
 
-        specs = list(load.discover("a/path", filter_specs=no_filter))
+    with it("only uses listings from discovering the same way") as test:
+        tree(test, "a_spec.py")
+        settle(test, ".")
+        index = test.cache.directories(settings=["*_spec.py"])
+        discover(test, index=index)
+        index.save()
 
-        expected = ["dir/one", "dir/child/two", "dir/child/three"]
-        test.assertEqual(specs, expected)
-        test.assertTrue(no_filter.called)
-        walk.assert_called_once_with("a/path")
+        index = test.cache.directories(settings=["test_*.py"])
+        test.assertIsNone(index.get(str(test.root)))
@@ -0,0 +1,197 @@
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+import multiprocessing
+
+from ivoire import describe, parallel, result, run
+from ivoire.spec.util import ExampleWithPatch
+
+with describe(parallel.run, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+
+        test.stream = StringIO()
+        formatter = result.Verbose(result.DotsFormatter(test.stream))
+        test.result = result.ExampleResult(formatter)
+
+    def spec(test, name, source):
+        path = test.root / name
+        path.write_text(dedent(source))
+        return str(path)
+
+    def run_specs(test, *specs, jobs=2, **kwargs):
+        parallel.run(
+            specs,
+            result=test.result,
+            jobs=jobs,
+            load=run.load_spec,
+            **kwargs,
+        )
+
+    def pids(test, count, **kwargs):
+        pid = spec(
+            test,
+            "pid_spec.py",
+            f"""
+            import os
+            from ivoire import describe
+            with describe(os.getpid) as it:
+                with it("is written") as test:
+                    with open({str(test.root / "pids")!r}, "a") as file:
+                        file.write(f"{{os.getpid()}}\\n")
+            """,
+        )
+        run_specs(test, *[pid] * count, jobs=1, **kwargs)
+        return (test.root / "pids").read_text().split()
+
+    with it("replays each spec's results") as test:
+        one = spec(
+            test,
+            "one_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+                with it("fails") as test:
+                    test.fail("Nope!")
+            """,
+        )
+        two = spec(
+            test,
+            "two_spec.py",
+            """
+            from ivoire import describe
+            with describe(abs) as it:
+                with it("errors") as test:
+                    raise ZeroDivisionError()
+            """,
+        )
+
+        run_specs(test, one, two)
+
+        test.assertEqual(test.result.testsRun, 3)
+        test.assertEqual(
+            [str(example) for example, _ in test.result.errors],
+            ["errors"],
+        )
+        ((failed, traceback),) = test.result.failures
+        test.assertEqual(str(failed), "fails")
+        test.assertIn("AssertionError: Nope!", traceback)
+        test.assertIn(
+            "len\n    passes\n    fails - FAIL\n",
+            test.stream.getvalue(),
+        )
+
+    with it("reports specs which fail to load") as test:
+        broken = spec(test, "broken_spec.py", "import does_not_exist\n")
+        run_specs(test, broken)
+        ((example, traceback),) = test.result.errors
+        test.assertEqual(str(example), "<not in example>")
+        test.assertIn("does_not_exist", traceback)
+
+    with it("reports crashed workers as errors and carries on") as test:
+        crashes = spec(
+            test,
+            "crashes_spec.py",
+            """
+            import os
+            from ivoire import describe
+            with describe(os) as it:
+                with it("passes") as test:
+                    pass
+                with it("crashes") as test:
+                    os._exit(12)
+            """,
+        )
+        fine = spec(
+            test,
+            "fine_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+            """,
+        )
+
+        run_specs(test, crashes, fine, crashes, fine, jobs=1)
+
+        test.assertEqual(test.result.testsRun, 6)
+        test.assertEqual(
+            [str(example) for example, _ in test.result.errors],
+            ["crashes", "crashes"],
+        )
+        _, traceback = test.result.errors[0]
+        test.assertIn("exited with code 12", traceback)
+
+    with it("replaces workers whose examples won't stop") as test:
+        stubborn = spec(
+            test,
+            "stubborn_spec.py",
+            """
+            import time
+            from ivoire import describe, timeout
+            timeout.GRACE = 0
+            with describe(time.sleep) as it:
+                with it("won't stop", timeout=0.1) as test:
+                    while True:
+                        try:
+                            time.sleep(1)
+                        except timeout.Timeout:
+                            pass
+                with it("never runs") as test:
+                    pass
+            """,
+        )
+        fine = spec(
+            test,
+            "fine_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+            """,
+        )
+
+        run_specs(test, stubborn, fine, jobs=1)
+
+        test.assertEqual(test.result.testsRun, 2)
+        ((example, hung),) = test.result.errors
+        test.assertEqual(str(example), "won't stop")
+        test.assertIn("didn't stop when interrupted", hung)
+
+    with it("reuses workers") as test:
+        test.assertEqual(len(set(pids(test, 3))), 1)
+
+    with it("replaces workers after running enough specs if asked") as test:
+        test.assertEqual(len(set(pids(test, 5, specs_per_worker=2))), 3)
+
+    with it("starts workers in the given context") as test:
+        context = multiprocessing.get_context("spawn")
+        Process = test.patchObject(context, "Process", wraps=context.Process)
+        pids(test, 1, context=context)
+        test.assertTrue(Process.called)
+
+    with it("stops early if the result says to") as test:
+        fails = spec(
+            test,
+            "fails_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("fails") as test:
+                    test.fail()
+            """,
+        )
+        test.result.failfast = True
+
+        run_specs(test, fails, fails, fails, jobs=1)
+
+        test.assertEqual(test.result.testsRun, 1)
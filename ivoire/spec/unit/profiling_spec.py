@@ -0,0 +1,137 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import pstats
+import time
+
+from ivoire import describe, profiling
+from ivoire.spec.util import ExampleWithPatch, mock
+
+
+def busy():
+    return sum(range(1000))
+
+
+def read_stats(path):
+    return pstats.Stats(str(path)).stats  # type: ignore[attr-defined]
+
+
+def rows_for(*functions):
+    return [
+        ["app.py", line, name, 1, 1, seconds, seconds, []]
+        for line, (name, seconds) in enumerate(functions, start=1)
+    ]
+
+
+with describe(profiling.Profiling, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.result = mock.Mock()
+        test.profiling = profiling.Profiling(test.result)
+
+    def profiled(test):
+        (_, rows), _ = test.result.addProfile.call_args
+        return {name: row for _, _, name, *row in rows}
+
+    with it("profiles each example") as test:
+        test.profiling.startTest(test)
+        busy()
+        test.profiling.stopTest(test)
+        test.assertIn("busy", profiled(test))
+
+    with it("profiles examples separately") as test:
+        test.profiling.startTest(test)
+        busy()
+        test.profiling.stopTest(test)
+        test.profiling.startTest(test)
+        test.profiling.stopTest(test)
+        test.assertNotIn("busy", profiled(test))
+
+    with it("passes events along to the result") as test:
+        test.profiling.startTest(test)
+        test.profiling.addSuccess(test)
+        test.profiling.stopTest(test)
+        test.assertEqual(
+            [name for name, _, _ in test.result.method_calls],
+            ["startTest", "addSuccess", "addProfile", "stopTest"],
+        )
+
+    with it("keeps only the profiles of slow examples if asked") as test:
+        test.profiling.slower_than = 0.05
+        test.profiling.startTest(test)
+        test.profiling.stopTest(test)
+        test.assertFalse(test.result.addProfile.called)
+
+        test.profiling.startTest(test)
+        time.sleep(0.05)
+        test.profiling.stopTest(test)
+        test.assertTrue(test.result.addProfile.called)
+
+    with it("profiles into plain values") as test:
+        test.profiling.startTest(test)
+        busy()
+        test.profiling.stopTest(test)
+        (_, rows), _ = test.result.addProfile.call_args
+        test.assertEqual(json.loads(json.dumps(rows)), rows)
+
+
+with describe(profiling.Profiles, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.profiles = profiling.Profiles()
+
+    with it("merges profiles by group and for the run") as test:
+        test.profiles.add("Foo", "Foo: bars", rows_for(("f", 1), ("g", 2)))
+        test.profiles.add("Foo", "Foo: bazzes", rows_for(("f", 3)))
+        test.profiles.add("Baz", "Baz: quuxes", rows_for(("f", 5)))
+
+        foo = test.profiles.by_group["Foo"].stats
+        test.assertEqual(foo["app.py", 1, "f"][:4], (2, 2, 4, 4))
+        run = test.profiles.run().stats
+        test.assertEqual(run["app.py", 1, "f"][:4], (3, 3, 9, 9))
+        test.assertEqual(run["app.py", 2, "g"][:4], (1, 1, 2, 2))
+
+    with it("finds hotspots along with the slowest examples in them") as test:
+        test.patchObject(profiling, "EXAMPLES_PER_HOTSPOT", 2)
+        test.profiles.add("Foo", "Foo: bars", rows_for(("f", 1), ("g", 2)))
+        test.profiles.add("Foo", "Foo: bazzes", rows_for(("f", 3)))
+        test.profiles.add("Baz", "Baz: quuxes", rows_for(("f", 5)))
+
+        test.assertEqual(
+            test.profiles.hotspots(1),
+            [("app.py:1(f)", 9, [(5, "Baz: quuxes"), (3, "Foo: bazzes")])],
+        )
+
+    with it("leaves out ivoire's own functions from hotspots") as test:
+        rows = rows_for(("f", 1))
+        rows.append([profiling.__file__, 1, "run", 1, 1, 2, 2, []])
+        test.profiles.add("Foo", "Foo: bars", rows)
+        test.assertEqual(
+            [function for function, _, _ in test.profiles.hotspots(5)],
+            ["app.py:1(f)"],
+        )
+
+    with it("writes profiles which pstats can read") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        test.profiles.add("Foo", "Foo: bars", rows_for(("f", 1)))
+        test.profiles.add("a/b", "a/b: quuxes", rows_for(("g", 1)))
+        test.profiles.add(None, "None: bazzes", rows_for(("h", 1)))
+
+        test.profiles.dump(root)
+
+        test.assertEqual(
+            sorted(name for _, _, name in read_stats(root / "run.pstats")),
+            ["f", "g", "h"],
+        )
+        test.assertEqual(
+            sorted(each.name for each in (root / "groups").iterdir()),
+            ["Foo.pstats", "a_b.pstats"],
+        )
+        test.assertEqual(
+            list(read_stats(root / "groups" / "Foo.pstats")),
+            [("app.py", 1, "f")],
+        )
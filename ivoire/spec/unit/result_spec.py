@@ -1,5 +1,7 @@
 from io import StringIO
+from pathlib import Path
 import sys
+import threading
 
 from ivoire import describe, result
 from ivoire.spec.util import ExampleWithPatch, mock
@@ -12,6 +14,18 @@ def fake_exc_info():
         return sys.exc_info()
 
 
+def deep_exc_info(depth, message="Deep"):
+    def recurse(depth):
+        if not depth:
+            raise Exception(message)
+        recurse(depth - 1)
+
+    try:
+        recurse(depth)
+    except Exception:
+        return sys.exc_info()
+
+
 with describe(result.ExampleResult, Example=ExampleWithPatch) as it:
 
     @it.before
@@ -52,6 +66,204 @@ with describe(result.ExampleResult, Example=ExampleWithPatch) as it:
         )
         assertShown(test, test.formatter.failure.return_value)
 
+    with it("shows errors and failures right away") as test:
+        test.result.addError(test.test, test.exc_info)
+        test.result.addFailure(test.test, test.exc_info)
+        test.assertEqual(test.formatter.flush.call_count, 2)
+
+    with it("only flushes if the formatter knows how") as test:
+        del test.formatter.flush
+        test.result.addError(test.test, test.exc_info)
+        test.result.flush()
+
+    with it("closes the formatter") as test:
+        test.result.close()
+        test.formatter.close.assert_called_once_with()
+
+    with it("flushes formatters which can't be closed when closed") as test:
+        del test.formatter.close
+        test.result.close()
+        test.formatter.flush.assert_called_once_with()
+
+    with it("keeps only some errors and failures in full if asked") as test:
+        test.result.keep = 1
+        test.result.addError(test.test, deep_exc_info(20))
+        test.result.addFailure(test.test, deep_exc_info(20))
+
+        ((_, kept),) = test.result.errors
+        ((example, spilled),) = test.result.failures
+        test.assertIsInstance(kept, str)
+        test.assertIn("in deep_exc_info", kept)
+
+        test.assertIsNot(example, test.test)
+        test.assertEqual(
+            (str(example.group), str(example)),
+            (str(test.test.group), str(test.test)),
+        )
+        test.assertNotIn("in deep_exc_info", str(spilled))
+        test.assertIn("in recurse", str(spilled))
+        test.assertIn("Exception: Deep", str(spilled))
+
+    with it("closes what errors and failures not kept are stored in") as test:
+        test.result.keep = 0
+        test.result.addError(test.test, deep_exc_info(0))
+        test.result.close()
+        ((_, spilled),) = test.result.errors
+        test.assertTrue(spilled.file.closed)
+
+    with it("keeps everything in full by default") as test:
+        for _ in range(3):
+            test.result.addFailure(test.test, deep_exc_info(20))
+        test.assertEqual(
+            [example for example, _ in test.result.failures],
+            [test.test] * 3,
+        )
+
+    with it("trims errors and failures not kept in full") as test:
+        test.result.keep = 0
+        test.result.addError(test.test, deep_exc_info(0, "x" * 10**6))
+        ((_, spilled),) = test.result.errors
+        test.assertLessEqual(len(str(spilled)), result.BRIEF_LIMIT)
+
+    with it("reads back errors and failures not kept to show them") as test:
+        formatter = result.DotsFormatter(StringIO())
+        test.result.keep = 0
+        test.result.addError(test.test, deep_exc_info(0, "first"))
+        test.result.addError(test.test, deep_exc_info(0, "second"))
+        shown = formatter.errors(test.result.errors)
+        test.assertLess(shown.index("first"), shown.index("second"))
+
+    with it("keeps tracebacks which are already stored elsewhere") as test:
+        stored = mock.Mock()
+        test.result.keep = 0
+        test.result.addError(test.test, stored)
+        test.assertEqual(test.result.errors, [(test.test, stored)])
+
+    with it("groups errors and failures which happen the same way") as test:
+        test.result.dedupe = True
+        formatter = result.DotsFormatter(StringIO())
+        test.formatter.recurrences = formatter.recurrences
+        first, second, third = mock.Mock(), mock.Mock(), mock.Mock()
+        for example in first, second, third:
+            test.result.addError(example, deep_exc_info(3))
+        test.result.addError(test.test, deep_exc_info(3, "Different"))
+        test.result.addFailure(first, deep_exc_info(3))
+        test.assertEqual(len(test.result.errors), 4)
+
+        errors = list(test.result._deduplicated(test.result._distinct_errors))
+        failures = list(
+            test.result._deduplicated(test.result._distinct_failures),
+        )
+
+        ((example, traceback), (other, different)) = errors
+        test.assertEqual((example, other), (first, test.test))
+        test.assertIn("Exception: Deep", traceback)
+        test.assertIn("... and 2 more the same way:", traceback)
+        test.assertIn(f"{second.group}: {second}", traceback)
+        test.assertIn(f"{third.group}: {third}", traceback)
+        test.assertNotIn("more the same way", different)
+        test.assertEqual(failures, [(first, test.result.failures[0][1])])
+
+    with it("doesn't format errors which happened the same way") as test:
+        test.result.dedupe = True
+        test.result.addError(test.test, deep_exc_info(3))
+        format = test.patchObject(result.traceback, "format_exception")
+        test.result.addError(test.test, deep_exc_info(3))
+        test.assertFalse(format.called)
+
+    with it("ignores numbers and addresses when grouping") as test:
+        test.result.dedupe = True
+        test.result.addError(test.test, deep_exc_info(0, "<x at 0xabc> 12"))
+        test.result.addError(test.test, deep_exc_info(0, "<x at 0xdef> 37"))
+        test.assertEqual(len(test.result._distinct_errors), 1)
+
+    with it("tells apart errors which happened in different places") as test:
+        test.result.dedupe = True
+        test.result.addError(test.test, deep_exc_info(0))
+        try:
+            raise Exception("Deep")
+        except Exception:
+            test.result.addError(test.test, sys.exc_info())
+        test.assertEqual(len(test.result._distinct_errors), 2)
+
+    with it("groups errors and failures which ran elsewhere") as test:
+        test.result.dedupe = True
+        plain = result.TestResult()
+        formatted = plain._exc_info_to_string(  # type: ignore[attr-defined]
+            deep_exc_info(3),
+            test.test,
+        )
+        test.result.addError(test.test, deep_exc_info(3))
+        test.result.addError(test.test, formatted)
+        test.assertEqual(len(test.result._distinct_errors), 1)
+
+    with it("doesn't count directories beside the project as in it") as test:
+        test.result.dedupe = True
+        test.patchObject(result.Path, "cwd", return_value=Path("/src/app"))
+        for line in 2, 3:
+            test.result.addError(
+                test.test,
+                "Traceback (most recent call last):\n"
+                '  File "/src/app/a.py", line 1, in <module>\n'
+                f'  File "/src/app2/b.py", line {line}, in f\n'
+                "ValueError: bad\n",
+            )
+        test.assertEqual(len(test.result._distinct_errors), 1)
+
+    with it("shows distinct errors and failures if deduplicating") as test:
+        test.result.dedupe = True
+        test.result.addError(test.test, test.exc_info)
+        test.result.startTestRun()
+        test.result.stopTestRun()
+        ((errors,), _), ((failures,), _) = (
+            test.formatter.errors.call_args,
+            test.formatter.failures.call_args,
+        )
+        test.assertEqual(list(errors), test.result.errors)
+        test.assertEqual(list(failures), [])
+
+    with it("merges profiles by group") as test:
+        rows = [["app.py", 1, "f", 1, 1, 0.5, 0.5, []]]
+        test.test.group = "Foo"
+        test.test.__str__ = lambda _: "bars"
+        test.result._context = ["when baz"]
+        test.result.addProfile(test.test, rows)
+        test.assertEqual(
+            test.result.profiles.hotspots(1),
+            [("app.py:1(f)", 0.5, [(0.5, "Foo: when baz bars")])],
+        )
+
+    with it("shows hotspots if asked") as test:
+        test.result.hotspots = 2
+        rows = [["app.py", 1, "f", 1, 1, 0.5, 0.5, []]]
+        test.result.addProfile(test.test, rows)
+        test.result.startTestRun()
+        test.result.stopTestRun()
+
+        test.formatter.hotspots.assert_called_once_with(
+            test.result.profiles.hotspots(2),
+        )
+        test.formatter.show.assert_any_call(
+            test.formatter.hotspots.return_value,
+        )
+
+    with it("shows no hotspots if nothing was profiled") as test:
+        test.result.hotspots = 2
+        test.result.startTestRun()
+        test.result.stopTestRun()
+        test.assertFalse(test.formatter.hotspots.called)
+
+    with it("roots samples at their group") as test:
+        test.test.group = "Foo"
+        test.test.__str__ = lambda _: "bars"
+        test.result._context = ["when; baz"]
+        test.result.addSamples(test.test, {"f (app.py:1)": 2})
+        test.result.addSamples(test.test, {"f (app.py:1)": 1})
+        test.assertEqual(
+            test.result.samples,
+            {"Foo;when: baz;bars;f (app.py:1)": 3},
+        )
+
     with it("shows skips") as test:
         test.result.addSkip(test.test, "a reason")
         test.formatter.skip.assert_called_once_with(test.test, "a reason")
@@ -75,6 +287,150 @@ with describe(result.ExampleResult, Example=ExampleWithPatch) as it:
             ],
         )
 
+    with it("shows tracebacks one at a time if it can") as test:
+        formatter = result.DotsFormatter(StringIO())
+        show = test.patchObject(formatter, "show")
+        test.result = result.ExampleResult(formatter)
+        test.result.addError(test.test, test.exc_info)
+        test.result.addError(test.test, test.exc_info)
+        test.result.startTestRun()
+        test.result.stopTestRun()
+
+        shown = [output for (output,), _ in show.call_args_list]
+        test.assertEqual(
+            len([each for each in shown if "Used to construct" in each]),
+            2,
+        )
+
+    with it("shows errors formatted by a formatter's own way whole") as test:
+
+        class Formatter(result.DotsFormatter):
+            def errors(self, errors):
+                return "Some errors.\n"
+
+        formatter = Formatter(StringIO())
+        show = test.patchObject(formatter, "show")
+        test.result = result.ExampleResult(formatter)
+        test.result.addError(test.test, test.exc_info)
+        test.result.startTestRun()
+        test.result.stopTestRun()
+
+        show.assert_any_call("Some errors.\n")
+
+    with it("shows the slowest examples and groups if asked") as test:
+        test.result.durations = 2
+        test.result.startTestRun()
+        test.result.stopTestRun()
+
+        test.formatter.durations.assert_called_once_with([], [])
+        test.formatter.show.assert_any_call(
+            test.formatter.durations.return_value,
+        )
+
+    with it("records lines") as test:
+        context = mock.Mock()
+        context.name = "when nested"
+
+        test.result.enterSpec("a_spec.py")
+        test.result.enterContext(context, depth=1)
+        test.result.addLines(test.test, {"/app.py": [1, 2]})
+
+        test.assertEqual(
+            test.result.coverage,
+            [
+                (
+                    "a_spec.py",
+                    (str(test.test.group), "when nested", str(test.test)),
+                    {"/app.py": [1, 2]},
+                ),
+            ],
+        )
+
+    with it("records imports") as test:
+        test.result.addImports("a_spec.py", [("a_spec.py", "app.py")])
+        test.assertEqual(
+            test.result.imports,
+            [("a_spec.py", [("a_spec.py", "app.py")])],
+        )
+
+    with it("records timings") as test:
+        context = mock.Mock()
+        context.name = "when nested"
+
+        test.result.enterSpec("a_spec.py")
+        test.result.enterContext(context, depth=1)
+        test.result.addTiming(test.test, wall=1.5, cpu=0.5)
+
+        test.assertEqual(
+            test.result.timings,
+            [
+                result.Timing(
+                    spec="a_spec.py",
+                    group=str(test.test.group),
+                    context=("when nested",),
+                    example=str(test.test),
+                    wall=1.5,
+                    cpu=0.5,
+                ),
+            ],
+        )
+
+    with it("remembers which examples failed") as test:
+        context = mock.Mock()
+        context.name = "when nested"
+        outside = mock.Mock(group=None)
+
+        test.result.enterSpec("a_spec.py")
+        test.result.enterContext(context, depth=1)
+        test.result.addFailure(test.test, test.exc_info)
+        test.result.addError(outside, test.exc_info)
+
+        test.assertEqual(
+            test.result.failed,
+            [
+                (
+                    "a_spec.py",
+                    (str(test.test.group), "when nested", str(test.test)),
+                ),
+                ("a_spec.py", None),
+            ],
+        )
+
+    with it("tracks the context path for timings") as test:
+        first, second, third = mock.Mock(), mock.Mock(), mock.Mock()
+        first.name, second.name, third.name = "a", "b", "c"
+
+        test.result.enterContext(first, depth=1)
+        test.result.enterContext(second, depth=2)
+        test.result.addTiming(test.test, wall=1, cpu=1)
+        test.result.exitContext(depth=1)
+        test.result.enterContext(third, depth=2)
+        test.result.addTiming(test.test, wall=1, cpu=1)
+        test.result.exitContext(depth=1)
+        test.result.exitContext(depth=0)
+        test.result.exitSpec("a_spec.py")
+        test.result.addTiming(test.test, wall=1, cpu=1)
+
+        test.assertEqual(
+            [(each.spec, each.context) for each in test.result.timings],
+            [(None, ("a", "b")), (None, ("a", "c")), (None, ())],
+        )
+
+    with it("finds the slowest examples and groups") as test:
+        test.result.durations = 2
+        fast, slow, slowest = [
+            result.Timing("a_spec.py", group, (), "example", wall, 0)
+            for group, wall in [("A", 1), ("B", 3), ("A", 4)]
+        ]
+        test.result.timings = [fast, slow, slowest]
+
+        examples, groups = test.result.slowest()
+        test.assertEqual(examples, [slowest, slow])
+        test.assertEqual(
+            groups,
+            [(("a_spec.py", "A"), 5), (("a_spec.py", "B"), 3)],
+        )
+
     with it("times the example run") as test:
         start, end = [1.234567, 8.9101112]
         test.patchObject(result.time, "time", side_effect=[start, end])
@@ -85,6 +441,71 @@ with describe(result.ExampleResult, Example=ExampleWithPatch) as it:
         test.assertEqual(test.result.elapsed, end - start)
 
 
+with describe(result.Buffered, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.formatter = mock.Mock()
+        test.buffered = result.Buffered(test.formatter, size=5, interval=60)
+
+    def all_shown(test):
+        return "".join(call.args[0] for call in test.formatter.show.mock_calls)
+
+    with it("delegates to the formatter") as test:
+        test.assertEqual(test.buffered.foo, test.formatter.foo)
+
+    with it("holds on to output") as test:
+        test.buffered.show(".")
+        test.buffered.show(".")
+        test.assertFalse(test.formatter.show.called)
+
+    with it("shows output once enough is waiting") as test:
+        for _ in range(5):
+            test.buffered.show(".")
+        test.formatter.show.assert_called_once_with(".....")
+
+    with it("shows output once it's been long enough") as test:
+        buffered = result.Buffered(test.formatter, interval=0)
+        buffered.show(".")
+        buffered.show("F")
+        test.assertEqual(all_shown(test), ".F")
+
+    with it("shows output when flushed") as test:
+        test.buffered.show(".")
+        test.buffered.show("F")
+        test.buffered.flush()
+        test.buffered.flush()
+        test.formatter.show.assert_called_once_with(".F")
+
+    with it("shows output before finishing") as test:
+        test.buffered.show(".")
+        test.buffered.finished()
+        test.assertEqual(
+            test.formatter.method_calls,
+            [mock.call.show("."), mock.call.finished()],
+        )
+
+    with it("can show output from a writer thread") as test:
+        shown_ = threading.Event()
+        test.formatter.show.side_effect = lambda text: shown_.set()
+        buffered = result.Buffered(
+            test.formatter,
+            interval=0.01,
+            background=True,
+        )
+        test.addCleanup(buffered.close)
+
+        buffered.show(".")
+        test.assertTrue(shown_.wait(timeout=5))
+        test.formatter.show.assert_called_once_with(".")
+
+    with it("shows output when closed") as test:
+        buffered = result.Buffered(test.formatter, background=True)
+        buffered.show(".")
+        buffered.close()
+        test.formatter.show.assert_called_once_with(".")
+
+
 with describe(result.Verbose, Example=ExampleWithPatch) as it:
 
     @it.before
@@ -173,6 +594,20 @@ with describe(result.DotsFormatter, Example=ExampleWithPatch) as it:
             f"Finished in {test.elapsed:.6f} seconds.\n",
         )
 
+    with it("formats durations") as test:
+        examples = [result.Timing("a_spec.py", "Foo", ("when",), "bars", 2, 1)]
+        groups = [(("a_spec.py", "Foo"), 2), ((None, "Baz"), 1)]
+        test.assertEqual(
+            test.formatter.durations(examples, groups),
+            "Slowest examples:\n"
+            "  2.000000s  Foo: when bars\n"
+            "\n"
+            "Slowest groups:\n"
+            "  2.000000s  Foo (a_spec.py)\n"
+            "  1.000000s  Baz\n"
+            "\n",
+        )
+
     with it("formats tracebacks") as test:
         example = mock.MagicMock()
         example.__str__.return_value = "Example"  # type: ignore[attr-defined]
@@ -183,6 +618,34 @@ with describe(result.DotsFormatter, Example=ExampleWithPatch) as it:
             "\n".join([str(example), traceback]),
         )
 
+    with it("formats hotspots") as test:
+        hotspots = [
+            ("app.py:1(f)", 3.0, [(2.0, "Foo: bars"), (1.0, "Foo: bazzes")]),
+            ("app.py:2(g)", 1.0, [(1.0, "Foo: bars")]),
+        ]
+        test.assertEqual(
+            test.formatter.hotspots(hotspots),
+            "Hotspots:\n"
+            "  3.000000s  app.py:1(f)\n"
+            "      2.000000s  Foo: bars\n"
+            "      1.000000s  Foo: bazzes\n"
+            "  1.000000s  app.py:2(g)\n"
+            "      1.000000s  Foo: bars\n"
+            "\n",
+        )
+
+    with it("formats where errors and failures recurred") as test:
+        examples = [
+            result.events._Example(group="Foo", name="bars"),
+            result.events._Example(group="Foo", name="bazzes"),
+        ]
+        test.assertEqual(
+            test.formatter.recurrences(examples),
+            "\n... and 2 more the same way:\n"
+            "    Foo: bars\n"
+            "    Foo: bazzes\n",
+        )
+
 
 with describe(result.DotsFormatter.show, Example=ExampleWithPatch) as it:
 
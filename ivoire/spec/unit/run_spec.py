@@ -1,4 +1,11 @@
-from ivoire import describe, result, run
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import json
+import sqlite3
+
+from ivoire import describe, events, result, run
+from ivoire.cache import Cache
+from ivoire.imports import Graph, absolute
 from ivoire.spec.util import ExampleWithPatch, mock
 import ivoire
 
@@ -10,19 +17,52 @@ with describe(run.parse, Example=ExampleWithPatch) as it:
 
     with it("sets reasonable defaults") as test:
         should_color = test.patchObject(run, "should_color")
+        should_buffer = test.patchObject(run, "should_buffer")
         arguments = run.parse(test.specs)
         test.assertEqual(
             vars(arguments),
             {
                 "Formatter": result.DotsFormatter,
+                "batch": 1,
+                "buffer": should_buffer.return_value,
+                "cache_dir": ".ivoire_cache",
+                "changed": None,
+                "changed_since": None,
                 "color": should_color.return_value,
+                "daemon": False,
+                "deduplicate": False,
+                "durations": None,
+                "exclude": None,
                 "exitfirst": False,
+                "failed_first": False,
+                "flush_interval": 0.5,
+                "full_tracebacks": None,
+                "hotspots": 10,
+                "impacted_by": None,
+                "interpreters": 1,
+                "jobs": 1,
+                "keywords": None,
+                "last_failed": False,
+                "preload": None,
+                "profile": False,
+                "profile_dir": "prof",
+                "profile_slower_than": None,
+                "record_impact": False,
+                "record_imports": False,
+                "result_file": None,
+                "sample": None,
+                "sample_rate": 100,
+                "shard": None,
+                "spec_patterns": None,
                 "specs": test.specs,
                 "func": run.run,
+                "threads": 1,
+                "timeout": None,
                 "verbose": False,
             },
         )
         should_color.assert_called_once_with("auto")
+        should_buffer.assert_called_once_with("auto")
 
     with it("can exitfirst") as test:
         arguments = run.parse(["--exitfirst", *test.specs])
@@ -38,6 +78,196 @@ with describe(run.parse, Example=ExampleWithPatch) as it:
         arguments = run.parse(["-v", *test.specs])
         test.assertTrue(arguments.verbose)
 
+    with it("can buffer output") as test:
+        arguments = run.parse(["--buffer", "background", *test.specs])
+        test.assertEqual(arguments.buffer, "background")
+
+        arguments = run.parse(["--flush-interval", "2", *test.specs])
+        test.assertEqual(arguments.flush_interval, 2)
+
+    with it("can show only some tracebacks in full") as test:
+        arguments = run.parse(["--full-tracebacks", "10", *test.specs])
+        test.assertEqual(arguments.full_tracebacks, 10)
+
+    with it("can deduplicate errors and failures") as test:
+        arguments = run.parse(["--deduplicate", *test.specs])
+        test.assertTrue(arguments.deduplicate)
+
+    with it("can show durations") as test:
+        arguments = run.parse(["--durations", "10", *test.specs])
+        test.assertEqual(arguments.durations, 10)
+
+    with it("can run specs in parallel") as test:
+        arguments = run.parse(["--jobs", "4", *test.specs])
+        test.assertEqual(arguments.jobs, 4)
+
+        arguments = run.parse(["-j", "2", *test.specs])
+        test.assertEqual(arguments.jobs, 2)
+
+    with it("can run specs in subinterpreters") as test:
+        arguments = run.parse(["--interpreters", "4", *test.specs])
+        test.assertEqual(arguments.interpreters, 4)
+
+    with it("can run specs in threads") as test:
+        arguments = run.parse(["--threads", "4", *test.specs])
+        test.assertEqual(arguments.threads, 4)
+
+    with it("can time out examples") as test:
+        arguments = run.parse(["--timeout", "2.5", *test.specs])
+        test.assertEqual(arguments.timeout, 2.5)
+
+    with it("can run a shard of the specs") as test:
+        arguments = run.parse(["--shard", "3/12", *test.specs])
+        test.assertEqual(arguments.shard, (3, 12))
+
+    with it("rejects shards which do not exist") as test:
+        stderr = test.patchObject(run.sys, "stderr")
+        with test.assertRaises(SystemExit):
+            run.parse(["--shard", "13/12", *test.specs])
+        test.assertIn(
+            "not a shard between 1 and 12",
+            "".join(str(call) for call in stderr.write.mock_calls),
+        )
+
+    with it("can exclude directories from discovery") as test:
+        arguments = run.parse(["--exclude", "build", *test.specs])
+        test.assertEqual(arguments.exclude, ["build"])
+
+    with it("can discover specs with other names") as test:
+        arguments = run.parse(["--spec-pattern", "test_*.py", *test.specs])
+        test.assertEqual(arguments.spec_patterns, ["test_*.py"])
+
+    with it("can filter examples by name") as test:
+        arguments = run.parse(["-k", "divides", "-k", "adds", *test.specs])
+        test.assertEqual(arguments.keywords, ["divides", "adds"])
+
+    with it("can run what failed last time") as test:
+        arguments = run.parse(["--lf", *test.specs])
+        test.assertTrue(arguments.last_failed)
+
+        arguments = run.parse(["--last-failed", *test.specs])
+        test.assertTrue(arguments.last_failed)
+
+    with it("can run what failed last time first") as test:
+        arguments = run.parse(["--ff", *test.specs])
+        test.assertTrue(arguments.failed_first)
+
+        arguments = run.parse(["--failed-first", *test.specs])
+        test.assertTrue(arguments.failed_first)
+
+    with it("can run only specs affected by changes") as test:
+        arguments = run.parse(
+            ["--changed", "a.py", "--changed-since", "main", *test.specs],
+        )
+        test.assertEqual(
+            (arguments.changed, arguments.changed_since),
+            (["a.py"], "main"),
+        )
+
+    with it("can record what specs import") as test:
+        arguments = run.parse(["--record-imports", *test.specs])
+        test.assertTrue(arguments.record_imports)
+
+    with it("can record and run what changes impact") as test:
+        arguments = run.parse(
+            ["--record-impact", "--impacted-by", "a.diff", *test.specs],
+        )
+        test.assertEqual(
+            (arguments.record_impact, arguments.impacted_by),
+            (True, "a.diff"),
+        )
+
+    with it("can profile examples") as test:
+        arguments = run.parse(
+            [
+                "--profile",
+                "--profile-dir",
+                "p",
+                "--profile-slower-than",
+                "0.5",
+                "--hotspots",
+                "3",
+                *test.specs,
+            ],
+        )
+        test.assertEqual(
+            (
+                arguments.profile,
+                arguments.profile_dir,
+                arguments.profile_slower_than,
+                arguments.hotspots,
+            ),
+            (True, "p", 0.5, 3),
+        )
+
+    with it("can sample examples") as test:
+        arguments = run.parse(
+            ["--sample", "a.folded", "--sample-rate", "1000", *test.specs],
+        )
+        test.assertEqual(
+            (arguments.sample, arguments.sample_rate),
+            ("a.folded", 1000),
+        )
+
+    with it("can preload modules for forked workers") as test:
+        arguments = run.parse(
+            ["--preload", "a", "--preload", "b", "--batch", "3", *test.specs],
+        )
+        test.assertEqual(
+            (arguments.preload, arguments.batch),
+            (["a", "b"], 3),
+        )
+
+    with it("can run specs on a daemon") as test:
+        arguments = run.parse(["run", "-v", "--daemon", *test.specs])
+        test.assertEqual(
+            (arguments.func.func, arguments.func.keywords),
+            (run.run_on_daemon, {"argv": ["run", "-v", *test.specs]}),
+        )
+
+    with it("can serve runs") as test:
+        arguments = run.parse(["serve", "--preload", "a"])
+        test.assertEqual(
+            vars(arguments),
+            {
+                "cache_dir": ".ivoire_cache",
+                "func": run.serve_specs,
+                "interval": 1.0,
+                "preload": ["a"],
+            },
+        )
+
+    with it("can write a result file") as test:
+        arguments = run.parse(["--result-file", "a.res", *test.specs])
+        test.assertEqual(arguments.result_file, "a.res")
+
+    with it("can merge results") as test:
+        arguments = run.parse(["merge-results", "-v", "a.res", "b.res"])
+        test.assertEqual(
+            (arguments.func, arguments.result_files, arguments.verbose),
+            (run.merge_results, ["a.res", "b.res"], True),
+        )
+
+    with it("can list examples") as test:
+        arguments = run.parse(["list", "specs/"])
+        test.assertEqual(
+            vars(arguments),
+            {
+                "cache_dir": ".ivoire_cache",
+                "exclude": None,
+                "func": run.list_examples,
+                "spec_patterns": None,
+                "specs": ["specs/"],
+            },
+        )
+
+    with it("can watch specs") as test:
+        arguments = run.parse(["watch", "--interval", "2", "specs/"])
+        test.assertEqual(
+            (arguments.func, arguments.interval, arguments.specs),
+            (run.watch_specs, 2.0, ["specs/"]),
+        )
+
     with it("can transform") as test:
         arguments = run.parse(["transform", "foo", "bar"])
         test.assertEqual(
@@ -69,12 +299,38 @@ with describe(run.should_color, Example=ExampleWithPatch) as it:
         test.assertFalse(run.should_color("auto"))
 
 
+with describe(run.should_buffer, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.stderr = test.patchObject(run.sys, "stderr")
+
+    with it("doesn't buffer when stderr is a tty") as test:
+        test.stderr.isatty.return_value = True
+        test.assertEqual(run.should_buffer("auto"), "never")
+
+    with it("buffers otherwise") as test:
+        test.stderr.isatty.return_value = False
+        test.assertEqual(run.should_buffer("auto"), "always")
+
+    with it("does what it's told") as test:
+        test.assertEqual(run.should_buffer("background"), "background")
+
+
 with describe(run.setup, Example=ExampleWithPatch) as it:
 
     @it.before
     def before(test):
         test.patchObject(ivoire, "current_result", None)
-        test.config = mock.Mock(verbose=False, color=False)
+        test.config = mock.Mock(
+            buffer="never",
+            verbose=False,
+            color=False,
+            deduplicate=False,
+            durations=None,
+            full_tracebacks=None,
+            hotspots=None,
+        )
 
     with it("sets a result") as test:
         test.assertIsNone(ivoire.current_result)
@@ -96,6 +352,21 @@ with describe(run.setup, Example=ExampleWithPatch) as it:
             result.Verbose,
         )
 
+    with it("makes a buffered Formatter if asked") as test:
+        Buffered = test.patchObject(result, "Buffered")
+        test.config.buffer = "background"
+        test.config.flush_interval = 2
+        run.setup(test.config)
+        Buffered.assert_called_once_with(
+            test.config.Formatter.return_value,
+            interval=2,
+            background=True,
+        )
+        test.assertEqual(
+            ivoire.current_result.formatter,  # type: ignore[attr-defined]
+            Buffered.return_value,
+        )
+
     with it("makes a colored Formatter if color is True") as test:
         test.config.color = True
         run.setup(test.config)
@@ -104,16 +375,70 @@ with describe(run.setup, Example=ExampleWithPatch) as it:
             result.Colored,
         )
 
+    with it("keeps only some tracebacks in full if asked") as test:
+        test.config.full_tracebacks = 3
+        run.setup(test.config)
+        test.assertEqual(
+            ivoire.current_result.keep,  # type: ignore[attr-defined]
+            3,
+        )
+
+    with it("deduplicates errors and failures if asked") as test:
+        test.config.deduplicate = True
+        run.setup(test.config)
+        test.assertTrue(
+            ivoire.current_result.dedupe,  # type: ignore[attr-defined]
+        )
+
+    with it("shows durations if asked") as test:
+        test.config.durations = 3
+        run.setup(test.config)
+        test.assertEqual(
+            ivoire.current_result.durations,  # type: ignore[attr-defined]
+            3,
+        )
+
+    with it("shows hotspots if asked") as test:
+        test.config.hotspots = 3
+        run.setup(test.config)
+        test.assertEqual(
+            ivoire.current_result.hotspots,  # type: ignore[attr-defined]
+            3,
+        )
+
 
 with describe(run.run, Example=ExampleWithPatch) as it:
 
     @it.before
     def before(test):
-        test.config = mock.Mock(specs=[])
+        test.config = mock.Mock(
+            specs=[],
+            changed=None,
+            changed_since=None,
+            failed_first=False,
+            batch=1,
+            impacted_by=None,
+            interpreters=1,
+            jobs=1,
+            keywords=None,
+            last_failed=False,
+            exclude=None,
+            record_impact=False,
+            record_imports=False,
+            result_file=None,
+            shard=None,
+            spec_patterns=None,
+            preload=None,
+            profile=False,
+            sample=None,
+            threads=1,
+            timeout=None,
+        )
         test.load_by_name = test.patchObject(run, "load_by_name")
         test.result = test.patch("ivoire.current_result", failfast=False)
         test.setup = test.patchObject(run, "setup")
         test.exit = test.patchObject(run.sys, "exit")
+        test.Cache = test.patchObject(run, "Cache")
 
     with it("sets up the environment") as test:
         run.run(test.config)
@@ -131,12 +456,493 @@ with describe(run.run, Example=ExampleWithPatch) as it:
         test.result.stopTestRun.assert_called_once_with()
 
     with it("loads specs") as test:
-        test.config.specs = [mock.Mock(), mock.Mock(), mock.Mock()]
+        test.config.specs = ["a_spec.py", "b_spec.py", "c_spec.py"]
+        run.run(test.config)
+        test.assertEqual(
+            test.load_by_name.mock_calls,
+            [mock.call(spec, imports=mock.ANY) for spec in test.config.specs],
+        )
+
+    with it("discovers specs in directories") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        for name in "a_spec.py", "test_b.py", "build/test_c.py":
+            (root / name).parent.mkdir(exist_ok=True)
+            (root / name).touch()
+        test.config.specs = [directory.name]
+        test.config.spec_patterns = ["test_*.py"]
+        test.config.exclude = ["build"]
+
+        run.run(test.config)
+
+        test.load_by_name.assert_called_once_with(
+            str(root / "test_b.py"),
+            imports=mock.ANY,
+        )
+
+    with it("discovers specs without an index it can't use") as test:
+        index = test.Cache.return_value.directories.return_value
+        index.get.side_effect = sqlite3.OperationalError("unable to open")
+        index.save.side_effect = sqlite3.OperationalError("readonly")
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        (Path(directory.name) / "a_spec.py").touch()
+        test.config.specs = [directory.name]
+
+        run.run(test.config)
+
+        test.load_by_name.assert_called_once_with(
+            str(Path(directory.name) / "a_spec.py"),
+            imports=mock.ANY,
+        )
+
+    with it("tells the result which spec is running") as test:
+        test.config.specs = ["a_spec.py"]
+        run.run(test.config)
+        test.assertEqual(
+            test.result.method_calls,
+            [
+                mock.call.startTestRun(),
+                mock.call.enterSpec("a_spec.py"),
+                mock.call.exitSpec("a_spec.py"),
+                mock.call.stopTestRun(),
+                mock.call.close(),
+                mock.call.wasSuccessful(),
+            ],
+        )
+
+    with it("records what specs import if asked") as test:
+        test.config.specs = ["a_spec.py"]
+        test.config.record_imports = True
+        run.run(test.config)
+        ((_, kwargs),) = test.load_by_name.call_args_list
+        test.assertIsInstance(kwargs["imports"], Graph)
+        test.result.addImports.assert_called_once_with("a_spec.py", [])
+
+    with it("shows buffered output if interrupted") as test:
+        test.config.specs = ["a_spec.py"]
+        test.load_by_name.side_effect = KeyboardInterrupt
+        with test.assertRaises(KeyboardInterrupt):
+            run.run(test.config)
+        test.result.close.assert_called_once_with()
+
+    with it("records timings in the cache") as test:
+        run.run(test.config)
+        test.Cache.assert_called_once_with(test.config.cache_dir)
+        durations = test.Cache.return_value.durations.return_value
+        durations.record.assert_called_once_with(test.result.timings)
+
+    with it("carries on if the run can't be cached") as test:
+        durations = test.Cache.return_value.durations.return_value
+        durations.record.side_effect = sqlite3.OperationalError("readonly")
+        stderr = test.patchObject(run.sys, "stderr")
+        run.run(test.config)
+        (message,), _ = stderr.write.call_args
+        test.assertIn("readonly", message)
+        test.exit.assert_called_once_with(False)
+
+    with it("records failures in the cache") as test:
+        run.run(test.config)
+        failures = test.Cache.return_value.failures.return_value
+        failures.record.assert_called_once_with(
+            test.result.timings,
+            test.result.failed,
+        )
+
+    with it("runs only what failed last time if asked") as test:
+        failures = test.Cache.return_value.failures.return_value
+        failures.load.return_value = {("b_spec.py", ("Foo", "fails"))}
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        test.config.last_failed = True
+        select = test.patchObject(ivoire._manager, "select", None)
+
+        selected = []
+        test.load_by_name.side_effect = lambda spec, imports: selected.append(
+            ivoire._manager.select(("Foo", "fails")),
+        )
+        run.run(test.config)
+
+        test.load_by_name.assert_called_once_with(
+            "b_spec.py",
+            imports=mock.ANY,
+        )
+        test.assertEqual(selected, [True])
+        test.assertIs(ivoire._manager.select, select)
+
+    with it("runs only examples matching keywords if asked") as test:
+        test.config.specs = ["a_spec.py"]
+        test.config.keywords = ["divides"]
+        select = test.patchObject(ivoire._manager, "select", None)
+
+        selected = []
+        test.load_by_name.side_effect = lambda spec, imports: selected.extend(
+            [
+                ivoire._manager.select(("Calculator", "divides")),
+                ivoire._manager.select(("Calculator", "adds")),
+            ],
+        )
+        run.run(test.config)
+
+        test.assertEqual(selected, [True, False])
+        test.assertIs(ivoire._manager.select, select)
+
+    with it("times out examples if asked") as test:
+        test.config.specs = ["a_spec.py"]
+        test.config.timeout = 2.5
+        timeout = test.patchObject(ivoire._manager, "timeout", None)
+
+        timeouts = []
+        test.load_by_name.side_effect = lambda spec, imports: timeouts.append(
+            ivoire._manager.timeout,
+        )
+        run.run(test.config)
+
+        test.assertEqual(timeouts, [2.5])
+        test.assertIs(ivoire._manager.timeout, timeout)
+
+    with it("runs everything if nothing failed last time") as test:
+        failures = test.Cache.return_value.failures.return_value
+        failures.load.return_value = set()
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        test.config.last_failed = True
+
+        run.run(test.config)
+
+        test.assertEqual(
+            test.load_by_name.mock_calls,
+            [
+                mock.call("a_spec.py", imports=mock.ANY),
+                mock.call("b_spec.py", imports=mock.ANY),
+            ],
+        )
+
+    with it("runs what failed last time first if asked") as test:
+        failures = test.Cache.return_value.failures.return_value
+        failures.load.return_value = {("b_spec.py", ("Foo", "fails"))}
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        test.config.failed_first = True
+
         run.run(test.config)
+
         test.assertEqual(
             test.load_by_name.mock_calls,
-            [mock.call(spec) for spec in test.config.specs],
+            [
+                mock.call("b_spec.py", imports=mock.ANY),
+                mock.call("a_spec.py", imports=mock.ANY),
+            ],
+        )
+
+    with it("runs only specs affected by changes if asked") as test:
+        imports = test.Cache.return_value.imports.return_value
+        imports.load.return_value = Graph(
+            [(absolute("b_spec.py"), absolute("app.py"))],
+            recorded=[absolute("a_spec.py")],
         )
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        test.config.changed = ["app.py"]
+        stderr = test.patchObject(run.sys, "stderr")
+
+        run.run(test.config)
+
+        ((spec,), kwargs) = test.load_by_name.call_args
+        test.assertEqual(spec, "b_spec.py")
+        test.assertIsInstance(kwargs["imports"], Graph)
+        stderr.write.assert_called_once_with(
+            "Running b_spec.py because it imports app.py.\n",
+        )
+
+    with it("asks git what changed if asked") as test:
+        changed_since = test.patchObject(run.selection, "changed_since")
+        changed_since.return_value = [absolute("a_spec.py")]
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        imports = test.Cache.return_value.imports.return_value
+        imports.load.return_value = Graph(
+            recorded=[absolute(spec) for spec in test.config.specs],
+        )
+        test.config.changed_since = "main"
+        test.patchObject(run.sys, "stderr")
+
+        run.run(test.config)
+
+        changed_since.assert_called_once_with("main")
+        test.assertEqual(
+            test.load_by_name.mock_calls,
+            [mock.call("a_spec.py", imports=mock.ANY)],
+        )
+
+    with it("runs only examples impacted by a diff if asked") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        diff = Path(directory.name) / "a.diff"
+        diff.write_text("--- a/app.py\n+++ b/app.py\n@@ -1 +1 @@\n-a\n+b\n")
+        impact = test.Cache.return_value.impact.return_value
+        impact.impacted.return_value = {("b_spec.py", ("Foo", "bars"))}
+        impact.recorded.return_value = {
+            ("a_spec.py", ("Foo", "bazzes")),
+            ("b_spec.py", ("Foo", "bars")),
+            ("b_spec.py", ("Foo", "quuxes")),
+        }
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+        test.config.impacted_by = str(diff)
+        select = test.patchObject(ivoire._manager, "select", None)
+
+        selected = []
+        test.load_by_name.side_effect = lambda spec, imports: selected.extend(
+            [
+                ivoire._manager.select(("Foo", "bars")),
+                ivoire._manager.select(("Foo", "quuxes")),
+            ],
+        )
+        run.run(test.config)
+
+        impact.impacted.assert_called_once_with(
+            {absolute("app.py"): {1}},
+        )
+        test.load_by_name.assert_called_once_with(
+            "b_spec.py",
+            imports=mock.ANY,
+        )
+        test.assertEqual(selected, [True, False])
+        test.assertIs(ivoire._manager.select, select)
+
+    with it("records what examples run if asked") as test:
+        test.config.specs = ["a_spec.py"]
+        test.config.record_impact = True
+        load_wrapped = test.patchObject(run.events, "load_wrapped")
+        test.patchObject(run.impact, "monitoring", mock.Mock())
+
+        run.run(test.config)
+
+        load_wrapped.assert_called_once_with(
+            run.impact.Recording,
+            run.load_spec,
+            "a_spec.py",
+            test.result,
+        )
+
+    with it("profiles examples if asked") as test:
+        test.config.specs = ["a_spec.py"]
+        test.config.profile = True
+        test.config.profile_slower_than = 0.5
+        load_wrapped = test.patchObject(run.events, "load_wrapped")
+        test.patchObject(run.sys, "stderr")
+
+        run.run(test.config)
+
+        load_wrapped.assert_called_once_with(
+            run.profiling.Profiling,
+            run.load_spec,
+            "a_spec.py",
+            test.result,
+            slower_than=0.5,
+        )
+        test.result.profiles.dump.assert_called_once_with(
+            test.config.profile_dir,
+        )
+
+    with it("won't profile examples in threads") as test:
+        test.config.profile = True
+        test.config.threads = 4
+        test.exit.side_effect = SystemExit
+        with test.assertRaises(SystemExit):
+            run.run(test.config)
+
+    with it("samples examples if asked") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "a.folded"
+        test.config.specs = ["a_spec.py"]
+        test.config.sample = str(path)
+        test.config.sample_rate = 1000
+        test.result.samples = {"Foo;bars;f (app.py:1)": 3}
+        load_wrapped = test.patchObject(run.events, "load_wrapped")
+        test.patchObject(run.sys, "stderr")
+
+        run.run(test.config)
+
+        load_wrapped.assert_called_once_with(
+            run.sampling.Sampling,
+            run.load_spec,
+            "a_spec.py",
+            test.result,
+            rate=1000,
+        )
+        test.assertEqual(path.read_text(), "Foo;bars;f (app.py:1) 3\n")
+
+    with it("won't sample examples in subinterpreters") as test:
+        test.config.sample = "a.folded"
+        test.config.interpreters = 4
+        test.exit.side_effect = SystemExit
+        with test.assertRaises(SystemExit):
+            run.run(test.config)
+
+    with it("records what specs import in the cache") as test:
+        run.run(test.config)
+        imports = test.Cache.return_value.imports.return_value
+        imports.record.assert_called_once_with(test.result.imports)
+
+    with it("loads specs in parallel when given multiple jobs") as test:
+        parallel = test.patchObject(run.parallel, "run")
+        test.config.jobs = 4
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+
+        run.run(test.config)
+
+        _, kwargs = parallel.call_args
+        test.assertEqual(
+            (list(kwargs["specs"]), kwargs["jobs"], kwargs["load"]),
+            (test.config.specs, 4, run.load_spec),
+        )
+        test.assertFalse(test.load_by_name.called)
+
+    with it("loads specs in threads when given multiple threads") as test:
+        threads = test.patchObject(run.threads, "run")
+        test.config.threads = 4
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+
+        run.run(test.config)
+
+        _, kwargs = threads.call_args
+        test.assertEqual(
+            (list(kwargs["specs"]), kwargs["threads"], kwargs["load"]),
+            (test.config.specs, 4, run.load_spec),
+        )
+        test.assertFalse(test.load_by_name.called)
+
+    with it("loads specs in subinterpreters when asked") as test:
+        test.patchObject(run.interpreters, "available", True)
+        interpreters = test.patchObject(
+            run.interpreters,
+            "run",
+            return_value=["b_spec.py"],
+        )
+        parallel = test.patchObject(run.parallel, "run")
+        stderr = test.patchObject(run.sys, "stderr")
+        test.result.shouldStop = False
+        test.config.interpreters = 4
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+
+        run.run(test.config)
+
+        (message,), _ = stderr.write.call_args
+        test.assertIn("Running b_spec.py in a worker process", message)
+        _, kwargs = interpreters.call_args
+        test.assertEqual(
+            (list(kwargs["specs"]), kwargs["interpreters"], kwargs["load"]),
+            (test.config.specs, 4, run.load_spec),
+        )
+        _, kwargs = parallel.call_args
+        test.assertEqual(
+            (kwargs["specs"], kwargs["jobs"]),
+            (["b_spec.py"], 4),
+        )
+
+    with it("loads specs in processes without subinterpreters") as test:
+        test.patchObject(run.interpreters, "available", False)
+        test.patchObject(run.sys, "stderr")
+        parallel = test.patchObject(run.parallel, "run")
+        test.result.shouldStop = False
+        test.config.interpreters = 4
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+
+        run.run(test.config)
+
+        _, kwargs = parallel.call_args
+        test.assertEqual(
+            (list(kwargs["specs"]), kwargs["jobs"]),
+            (test.config.specs, 4),
+        )
+
+    with it("forks workers after preloading modules if asked") as test:
+        parallel = test.patchObject(run.parallel, "run")
+        freeze = test.patchObject(run.gc, "freeze")
+        freeze.side_effect = lambda: test.assertEqual(
+            test.load_by_name.mock_calls,
+            [mock.call("django"), mock.call("conftest.py")],
+        )
+        test.config.preload = ["django", "conftest.py"]
+        test.config.batch = 5
+        test.config.specs = ["a_spec.py", "b_spec.py"]
+
+        run.run(test.config)
+
+        freeze.assert_called_once_with()
+        _, kwargs = parallel.call_args
+        test.assertEqual(
+            (
+                list(kwargs["specs"]),
+                kwargs["context"].get_start_method(),
+                kwargs["specs_per_worker"],
+            ),
+            (test.config.specs, "fork", 5),
+        )
+
+    with it("loads only the specs in its shard") as test:
+        durations = test.Cache.return_value.durations.return_value
+        durations.by_spec.return_value = {"a_spec.py": 3, "b_spec.py": 2}
+        test.config.specs = ["a_spec.py", "b_spec.py", "c_spec.py"]
+        test.config.shard = 2, 2
+
+        run.run(test.config)
+
+        test.assertEqual(
+            test.load_by_name.mock_calls,
+            [
+                mock.call("b_spec.py", imports=mock.ANY),
+                mock.call("c_spec.py", imports=mock.ANY),
+            ],
+        )
+
+    with it("doesn't record the timings of a shard") as test:
+        test.config.shard = 1, 2
+        run.run(test.config)
+        durations = test.Cache.return_value.durations.return_value
+        test.assertFalse(durations.record.called)
+
+    with it("runs each spec in exactly one of its shards") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        cache = test.Cache.return_value = Cache(directory.name)
+        specs = [f"{name}_spec.py" for name in "abcd"]
+        cache.durations().record(
+            [result.Timing(spec, "Foo", (), "bar", 1, 1) for spec in specs],
+        )
+        test.config.specs = specs
+        test.result.configure_mock(timings=[], failed=[], coverage={})
+
+        ran: list[str] = []
+
+        def load_by_name(spec, imports):
+            ran.append(spec)
+            timing = result.Timing(spec, "Foo", (), "bar", len(ran) * 10, 1)
+            test.result.timings.append(timing)
+
+        test.load_by_name.side_effect = load_by_name
+
+        for index in 1, 2:
+            test.config.shard = index, 2
+            run.run(test.config)
+
+        test.assertEqual(sorted(ran), specs)
+
+    with it("writes results to a result file if asked") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.config.result_file = Path(directory.name) / "results.res"
+        test.config.specs = ["a_spec.py"]
+        test.patchObject(ivoire._manager, "result", test.result)
+
+        run.run(test.config)
+
+        test.assertEqual(
+            list(events.load(test.config.result_file)),
+            [
+                ("enterSpec", "a_spec.py"),
+                ("exitSpec", "a_spec.py"),
+            ],
+        )
+        test.result.enterSpec.assert_called_once_with("a_spec.py")
 
     with it("succeeds with status code 0") as test:
         test.result.wasSuccessful.return_value = True
@@ -159,6 +965,213 @@ with describe(run.run, Example=ExampleWithPatch) as it:
         test.assertEqual(traceback[0], IndexError)
 
 
+with describe(run.run_on_daemon, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.request = test.patchObject(run.serve, "request")
+        test.exit = test.patchObject(run.sys, "exit")
+        test.Cache = test.patchObject(run, "Cache")
+        test.config = mock.Mock(cache_dir="cache")
+
+    with it("exits with the status of the daemon's run") as test:
+        run.run_on_daemon(test.config, argv=["run", "a_spec"])
+        test.Cache.assert_called_once_with("cache")
+        test.request.assert_called_once_with(
+            test.Cache.return_value.socket.return_value,
+            ["run", "a_spec"],
+        )
+        test.exit.assert_called_once_with(test.request.return_value)
+
+    with it("complains if no daemon is serving") as test:
+        test.request.side_effect = run.serve.NotServing
+        test.exit.side_effect = SystemExit
+        with test.assertRaises(SystemExit):
+            run.run_on_daemon(test.config, argv=["run", "a_spec"])
+        (message,), _ = test.exit.call_args
+        test.assertIn("No daemon is serving", message)
+
+
+with describe(run.merge_results, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+
+        test.result = test.patch("ivoire.current_result")
+        test.setup = test.patchObject(run, "setup")
+        test.exit = test.patchObject(run.sys, "exit")
+        test.Cache = test.patchObject(run, "Cache")
+        test.config = mock.Mock(result_files=[])
+
+    def result_file(test, name, *written):
+        path = test.root / name
+        with path.open("w") as file:
+            writer = events.Writer(file)
+            for event in written:
+                writer(event)
+        return path
+
+    with it("replays each result file") as test:
+        test.config.result_files = [
+            result_file(test, "a.res", ("enterSpec", "a_spec.py")),
+            result_file(test, "b.res", ("exitSpec", "b_spec.py")),
+        ]
+
+        run.merge_results(test.config)
+
+        test.setup.assert_called_once_with(test.config)
+        test.assertEqual(
+            test.result.method_calls[:3],
+            [
+                mock.call.startTestRun(),
+                mock.call.enterSpec("a_spec.py"),
+                mock.call.addError(mock.ANY, mock.ANY),
+            ],
+        )
+        test.assertEqual(
+            test.result.method_calls[-5:],
+            [
+                mock.call.exitSpec("a_spec.py"),
+                mock.call.exitSpec("b_spec.py"),
+                mock.call.stopTestRun(),
+                mock.call.close(),
+                mock.call.wasSuccessful(),
+            ],
+        )
+
+    with it("reports result files which end unexpectedly") as test:
+        path = result_file(test, "a.res", ("enterSpec", "a_spec.py"))
+        test.config.result_files = [path]
+
+        run.merge_results(test.config)
+
+        (example, traceback), _ = test.result.addError.call_args
+        test.assertEqual(
+            (str(example), traceback),
+            ("<not in example>", f"The results in {path} end unexpectedly.\n"),
+        )
+
+    with it("refuses files which aren't result files") as test:
+        path = test.root / "a.res"
+        path.write_text("not json\n")
+        test.config.result_files = [path]
+        test.exit.side_effect = SystemExit
+
+        with test.assertRaises(SystemExit):
+            run.merge_results(test.config)
+
+        test.exit.assert_called_once_with(
+            f"{path} is not an Ivoire result file.",
+        )
+
+    with it("refuses result files which don't exist") as test:
+        path = test.root / "a.res"
+        test.config.result_files = [path]
+        test.exit.side_effect = SystemExit
+
+        with test.assertRaises(SystemExit):
+            run.merge_results(test.config)
+
+        (message,), _ = test.exit.call_args
+        test.assertEqual(
+            message,
+            f"{path} is not an Ivoire result file: No such file or directory.",
+        )
+
+    with it("records the merged timings in the cache") as test:
+        run.merge_results(test.config)
+        test.Cache.assert_called_once_with(test.config.cache_dir)
+        durations = test.Cache.return_value.durations.return_value
+        durations.record.assert_called_once_with(test.result.timings)
+
+    with it("exits unsuccessfully if any example was unsuccessful") as test:
+        test.result.wasSuccessful.return_value = False
+        run.merge_results(test.config)
+        test.exit.assert_called_once_with(1)
+
+
+with describe(run.watch_specs, Example=ExampleWithPatch) as it:
+    with it("closes the output of each run") as test:
+        results: list[mock.Mock] = []
+
+        def setup(config):
+            results.append(mock.Mock(imports=[]))
+            ivoire.current_result = results[-1]
+
+        def watch(discover, run, imports, interval):
+            run([])
+            run([])
+
+        test.patch("ivoire.current_result")
+        test.patchObject(run, "setup", setup)
+        test.patchObject(run.watch, "watch", watch)
+        test.patchObject(run, "Cache")
+
+        run.watch_specs(mock.Mock())
+
+        test.assertEqual(
+            [result.close.call_count for result in results],
+            [1, 1],
+        )
+
+
+with describe(run.list_examples, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+        test.stdout = test.patchObject(run.sys, "stdout")
+
+    def listed(test, *specs):
+        config = mock.Mock(
+            cache_dir=test.root / "cache",
+            exclude=None,
+            spec_patterns=None,
+            specs=specs,
+        )
+        run.list_examples(config)
+        (output,), _ = test.stdout.write.call_args
+        return json.loads(output)
+
+    with it("shows the examples in each spec as JSON") as test:
+        spec = test.root / "a_spec.py"
+        spec.write_text("with describe(len) as it:\n    pass\n")
+        test.assertEqual(
+            listed(test, str(spec)),
+            [
+                {
+                    "file": str(spec),
+                    "children": [
+                        {
+                            "kind": "group",
+                            "name": "len",
+                            "line": 1,
+                            "children": [],
+                        },
+                    ],
+                },
+            ],
+        )
+
+    with it("reports specs which can't be read") as test:
+        (missing,) = listed(test, "does_not_exist_spec.py")
+        test.assertEqual(missing["file"], "does_not_exist_spec.py")
+        test.assertIn("No such file", missing["error"])
+
+    with it("doesn't import the specs") as test:
+        spec = test.root / "a_spec.py"
+        spec.write_text("raise ZeroDivisionError()\n")
+        test.assertEqual(
+            listed(test, str(spec)),
+            [{"file": str(spec), "children": []}],
+        )
+
+
 with describe(run.main, Example=ExampleWithPatch) as it:
     with it("runs the correct func with parsed args") as test:
         parse = test.patchObject(run, "parse")
@@ -0,0 +1,94 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import sys
+import time
+
+from ivoire import describe, sampling
+from ivoire.spec.util import ExampleWithPatch, mock
+
+
+def current_frame():
+    return sys._getframe()
+
+
+def busy(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+with describe(sampling.Sampling, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.result = mock.Mock()
+        test.sampling = sampling.Sampling(test.result, rate=1000)
+        test.sampling.start()
+        test.addCleanup(test.sampling.stop)
+
+    def sampled(test):
+        (_, samples), _ = test.result.addSamples.call_args
+        return samples
+
+    with it("samples what each example is doing") as test:
+        test.sampling.startTest(test)
+        busy(0.1)
+        test.sampling.stopTest(test)
+        stacks = sampled(test)
+        test.assertTrue(any("busy" in stack for stack in stacks))
+        test.assertGreater(sum(stacks.values()), 10)
+
+    with it("samples examples separately") as test:
+        test.sampling.startTest(test)
+        busy(0.05)
+        test.sampling.stopTest(test)
+        test.sampling.startTest(test)
+        time.sleep(0.05)
+        test.sampling.stopTest(test)
+        test.assertFalse(any("busy" in stack for stack in sampled(test)))
+
+    with it("leaves out what ran the example") as test:
+        test.sampling.startTest(test)
+        busy(0.05)
+        test.sampling.stopTest(test)
+        for stack in sampled(test):
+            test.assertNotIn("load_spec", stack)
+
+    with it("doesn't sample outside of examples") as test:
+        busy(0.05)
+        test.sampling.startTest(test)
+        test.sampling.stopTest(test)
+        test.assertFalse(test.result.addSamples.called)
+
+    with it("passes events along to the result") as test:
+        test.sampling.startTest(test)
+        test.sampling.addSuccess(test)
+        busy(0.05)
+        test.sampling.stopTest(test)
+        test.assertEqual(
+            [name for name, _, _ in test.result.method_calls],
+            ["startTest", "addSuccess", "addSamples", "stopTest"],
+        )
+
+
+with describe(sampling.collapse, Example=ExampleWithPatch) as it:
+    with it("collapses stacks from their outermost frame") as test:
+        stack = sampling.collapse(current_frame(), root=sys._getframe())
+        line = current_frame.__code__.co_firstlineno
+        test.assertEqual(
+            stack.split(";")[1:],
+            [f"current_frame ({__file__}:{line})"],
+        )
+        test.assertTrue(stack.startswith("<module> ("))
+
+    with it("can't be confused by semicolons") as test:
+        test.assertEqual(sampling.label("a;b\n c"), "a:b c")
+
+
+with describe(sampling.write, Example=ExampleWithPatch) as it:
+    with it("writes collapsed stacks along with their counts") as test:
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "a.folded"
+        sampling.write(path, {"Foo;b": 2, "Foo;a": 1})
+        test.assertEqual(path.read_text(), "Foo;a 1\nFoo;b 2\n")
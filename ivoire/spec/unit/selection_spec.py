@@ -0,0 +1,180 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import subprocess
+
+from ivoire import describe, selection
+from ivoire.imports import Graph, absolute
+from ivoire.spec.util import ExampleWithPatch
+
+with describe(selection.LastFailed, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.last_failed = selection.LastFailed(
+            [
+                ("a_spec.py", ("Foo", "when nested", "fails")),
+                ("b_spec.py", None),
+            ],
+        )
+
+    with it("selects examples which failed") as test:
+        test.assertTrue(
+            test.last_failed("a_spec.py", ("Foo", "when nested", "fails")),
+        )
+
+    with it("doesn't select examples which didn't fail") as test:
+        test.assertFalse(test.last_failed("a_spec.py", ("Foo", "passes")))
+        test.assertFalse(test.last_failed("c_spec.py", ("Foo", "passes")))
+
+    with it("selects everything in specs which failed to load") as test:
+        test.assertTrue(test.last_failed("b_spec.py", ("Bar", "anything")))
+
+    with it("selects specs with failures") as test:
+        test.assertEqual(
+            test.last_failed.specs(["c_spec.py", "b_spec.py", "a_spec.py"]),
+            ["b_spec.py", "a_spec.py"],
+        )
+
+    with it("orders specs with failures first") as test:
+        test.assertEqual(
+            test.last_failed.first(["c_spec.py", "b_spec.py", "d_spec.py"]),
+            ["b_spec.py", "c_spec.py", "d_spec.py"],
+        )
+
+    with it("is empty if nothing failed") as test:
+        test.assertFalse(selection.LastFailed([]))
+        test.assertTrue(test.last_failed)
+
+
+with describe(selection.Keywords, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.path = "Calculator", "when dividing", "divides two numbers"
+
+    with it("selects examples whose names contain a keyword") as test:
+        select = selection.Keywords(["divides"])
+        test.assertTrue(select("a_spec.py", test.path))
+        test.assertFalse(select("a_spec.py", ("Calculator", "adds")))
+
+    with it("matches across the group and contexts") as test:
+        select = selection.Keywords(["calculator when dividing"])
+        test.assertTrue(select("a_spec.py", test.path))
+
+    with it("ignores case") as test:
+        test.assertTrue(selection.Keywords(["DIVIDES"])("a", test.path))
+
+    with it("selects examples matching any keyword") as test:
+        select = selection.Keywords(["adds", "divides"])
+        test.assertTrue(select("a_spec.py", test.path))
+
+
+with describe(selection.All, Example=ExampleWithPatch) as it:
+    with it("selects examples which every selection selects") as test:
+        path = ("Calculator", "divides")
+        yes, no = (lambda spec, path: True), (lambda spec, path: False)
+        test.assertTrue(selection.All([yes, yes])("a_spec.py", path))
+        test.assertFalse(selection.All([yes, no])("a_spec.py", path))
+
+
+with describe(selection.Impacted, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.impacted = selection.Impacted(
+            impacted=[("a_spec.py", ("Foo", "bars"))],
+            recorded=[
+                ("a_spec.py", ("Foo", "bars")),
+                ("a_spec.py", ("Foo", "bazzes")),
+                ("b_spec.py", ("Bar", "quuxes")),
+                ("c_spec.py", ("Baz", "spams")),
+            ],
+            changed=["c_spec.py"],
+        )
+
+    with it("selects examples which ran changed lines") as test:
+        test.assertTrue(test.impacted("a_spec.py", ("Foo", "bars")))
+        test.assertFalse(test.impacted("a_spec.py", ("Foo", "bazzes")))
+
+    with it("selects examples which weren't recorded") as test:
+        test.assertTrue(test.impacted("c_spec.py", ("Baz", "eggs")))
+
+    with it("selects specs which may have selected examples") as test:
+        test.assertEqual(
+            test.impacted.specs(
+                ["a_spec.py", "b_spec.py", "c_spec.py", "d_spec.py"],
+            ),
+            ["a_spec.py", "c_spec.py", "d_spec.py"],
+        )
+
+
+with describe(selection.Changed, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.imports = Graph(
+            [
+                (absolute("a_spec.py"), absolute("models.py")),
+                (absolute("models.py"), absolute("db.py")),
+            ],
+            recorded=[absolute("b_spec.py")],
+        )
+
+    def reasons(test, changes, specs=("a_spec.py", "b_spec.py")):
+        return selection.Changed(changes, test.imports).reasons(specs)
+
+    with it("selects specs importing changes, and says how") as test:
+        test.assertEqual(
+            reasons(test, ["db.py"]),
+            [("a_spec.py", "it imports models.py -> db.py")],
+        )
+
+    with it("selects specs which changed") as test:
+        test.assertEqual(
+            reasons(test, ["b_spec.py"]),
+            [("b_spec.py", "it changed")],
+        )
+
+    with it("selects specs whose imports are unknown") as test:
+        test.assertEqual(
+            reasons(test, ["db.py"], specs=["c_spec.py"]),
+            [("c_spec.py", "what it imports is unknown")],
+        )
+
+    with it("selects nothing else") as test:
+        test.assertEqual(reasons(test, ["other.py"]), [])
+
+
+with describe(selection.changed_since, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name).resolve()
+
+        def git(*args):
+            subprocess.run(
+                ["git", "-c", "user.name=I", "-c", "user.email=i@v", *args],
+                capture_output=True,
+                check=True,
+                cwd=test.root,
+            )
+
+        git("init", "-b", "main")
+        for name in "a.py", "b.py", "c.py":
+            (test.root / name).write_text("")
+        git("add", "a.py", "b.py", "c.py")
+        git("commit", "-m", "Initial")
+        git("checkout", "-b", "feature")
+        (test.root / "a.py").write_text("a = 1\n")
+        git("commit", "-am", "Change a")
+
+        (test.root / "b.py").write_text("b = 1\n")
+        (test.root / "d.py").write_text("")
+
+    with it("finds committed, uncommitted and new files") as test:
+        test.assertEqual(
+            sorted(selection.changed_since("main", cwd=test.root)),
+            [str(test.root / name) for name in ("a.py", "b.py", "d.py")],
+        )
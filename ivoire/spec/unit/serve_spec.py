@@ -0,0 +1,128 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory, TemporaryFile
+import multiprocessing
+import os
+import selectors
+import subprocess
+import sys
+import time
+
+from ivoire import describe, serve
+from ivoire.spec.util import ExampleWithPatch, mock
+
+_FORK = "fork" in multiprocessing.get_all_start_methods()
+
+
+def _run(argv):
+    sys.stdout.write(f"ran {argv} in {Path.cwd().name}\n")
+    sys.stdout.flush()
+    if argv == ["fail"]:
+        sys.exit(3)
+    if argv == ["explode"]:
+        raise ZeroDivisionError()
+
+
+def _serve(path, imported):
+    sys.modules["_ivoire_serve_spec"] = type(sys)("_ivoire_serve_spec")
+    sys.modules["_ivoire_serve_spec"].__file__ = imported
+    serve.serve(
+        path=path,
+        run=_run,
+        interval=0.01,
+        restart=lambda listener: os._exit(42),
+    )
+
+
+with describe(serve.serve, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+        test.socket = test.root / "serve.sock"
+        test.imported = test.root / "imported.py"
+        test.imported.write_text("")
+
+    def serving(test):
+        context = multiprocessing.get_context("fork")
+        daemon = context.Process(
+            target=_serve,
+            args=(test.socket, str(test.imported)),
+        )
+        daemon.start()
+        test.addCleanup(daemon.join, 5)
+        test.addCleanup(daemon.terminate)
+        deadline = time.monotonic() + 5
+        while not test.socket.exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return daemon
+
+    def request(test, argv):
+        with TemporaryFile() as out:
+            status = serve.request(test.socket, argv, stdout=out.fileno())
+            out.seek(0)
+            return status, out.read().decode()
+
+    with it("runs requests, writing to the client's stdout") as test:
+        test.skip_if(not _FORK, "Needs fork().")
+        serving(test)
+        test.assertEqual(
+            request(test, ["a", "b"]),
+            (0, f"ran ['a', 'b'] in {Path.cwd().name}\n"),
+        )
+
+    with it("returns the exit status of the run") as test:
+        test.skip_if(not _FORK, "Needs fork().")
+        serving(test)
+        test.assertEqual(
+            request(test, ["fail"]),
+            (3, f"ran ['fail'] in {Path.cwd().name}\n"),
+        )
+
+    with it("fails runs which raise exceptions") as test:
+        test.skip_if(not _FORK, "Needs fork().")
+        serving(test)
+        with TemporaryFile() as err:
+            status = serve.request(
+                test.socket,
+                ["explode"],
+                stdout=err.fileno(),
+                stderr=err.fileno(),
+            )
+            err.seek(0)
+            test.assertIn(b"ZeroDivisionError", err.read())
+        test.assertEqual(status, 1)
+
+    with it("restarts when a file it imported changes") as test:
+        test.skip_if(not _FORK, "Needs fork().")
+        daemon = serving(test)
+        stat = Path(test.imported).stat()
+        os.utime(test.imported, ns=(0, stat.st_mtime_ns + 10**9))
+        daemon.join(5)
+        test.assertEqual(daemon.exitcode, 42)
+
+
+with describe(serve.request, Example=ExampleWithPatch) as it:
+    with it("complains when nothing is serving") as test:
+        with TemporaryDirectory() as directory:
+            with test.assertRaises(serve.NotServing):
+                serve.request(Path(directory) / "serve.sock", ["a"])
+
+
+with describe(serve._reap, Example=ExampleWithPatch) as it:
+    with it("leaves alone children it didn't fork") as test:
+        other = subprocess.Popen([sys.executable, "-c", ""])
+        child = subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(0.2)"],
+        )
+        connection = mock.MagicMock()
+        children = {child.pid: connection}
+
+        deadline = time.monotonic() + 5
+        while children and time.monotonic() < deadline:
+            serve._reap(children, selectors.DefaultSelector())
+            time.sleep(0.01)
+
+        test.assertEqual((children, other.wait()), ({}, 0))
+        connection.sendall.assert_called_once_with(b'{"exit": 0}\n')
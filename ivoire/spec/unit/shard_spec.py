@@ -0,0 +1,73 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from ivoire import describe, shard
+from ivoire.spec.util import ExampleWithPatch
+
+with describe(shard.parse, Example=ExampleWithPatch) as it:
+    with it("parses I/N") as test:
+        test.assertEqual(shard.parse("3/12"), (3, 12))
+
+    with it("rejects garbage") as test:
+        with test.assertRaises(ValueError):
+            shard.parse("3")
+
+    with it("rejects shards out of range") as test:
+        for value in "0/12", "13/12":
+            with test.assertRaises(ValueError):
+                shard.parse(value)
+
+
+with describe(shard.split, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+
+    def spec(test, name, size):
+        path = test.root / name
+        path.write_text("#" * size)
+        return str(path)
+
+    with it("balances specs by their recorded durations") as test:
+        durations = {"a": 6, "b": 5, "c": 4, "d": 3, "e": 2, "f": 1}
+        test.assertEqual(
+            shard.split(list(durations), 3, durations),
+            [["a", "f"], ["b", "e"], ["c", "d"]],
+        )
+
+    with it("doesn't depend on the order specs are found in") as test:
+        durations = {"a": 1, "b": 1, "c": 2, "d": 1}
+        test.assertEqual(
+            shard.split(["d", "c", "b", "a"], 2, durations),
+            shard.split(["a", "b", "c", "d"], 2, durations),
+        )
+
+    with it("guesses at specs without history from their size") as test:
+        big = spec(test, "big_spec.py", 3000)
+        small = spec(test, "small_spec.py", 1000)
+        timed = spec(test, "timed_spec.py", 1000)
+
+        estimates = shard.estimate([big, small, timed], {timed: 2.0})
+
+        test.assertEqual(estimates, {big: 6.0, small: 2.0, timed: 2.0})
+
+    with it("uses sizes alone if nothing has history") as test:
+        big = spec(test, "big_spec.py", 300)
+        small = spec(test, "small_spec.py", 100)
+        other = spec(test, "other_spec.py", 200)
+        test.assertEqual(
+            shard.split([small, big, other], 2, {}),
+            [[big], [other, small]],
+        )
+
+    with it("has empty shards if there are more shards than specs") as test:
+        test.assertEqual(shard.split(["a"], 3, {"a": 1}), [["a"], [], []])
+
+
+with describe(shard.select, Example=ExampleWithPatch) as it:
+    with it("selects the 1-indexed shard") as test:
+        durations = {"a": 2, "b": 1}
+        test.assertEqual(shard.select(["a", "b"], 2, 2, durations), ["b"])
@@ -0,0 +1,158 @@
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from textwrap import dedent
+from types import ModuleType
+import sys
+import threading
+
+from ivoire import describe, result, run, threads
+from ivoire.spec.util import ExampleWithPatch, mock
+import ivoire
+
+with describe(threads.run, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name)
+
+        test.stream = StringIO()
+        formatter = result.Verbose(result.DotsFormatter(test.stream))
+        test.result = result.ExampleResult(formatter)
+
+        rendezvous = ModuleType("_rendezvous")
+        rendezvous.barrier = threading.Barrier(2, timeout=5)
+        test.patchDict(sys.modules, _rendezvous=rendezvous)
+
+    def spec(test, name, source):
+        path = test.root / name
+        path.write_text(dedent(source))
+        return str(path)
+
+    def run_specs(test, *specs, threads_=2):
+        threads.run(
+            specs,
+            result=test.result,
+            threads=threads_,
+            load=run.load_spec,
+        )
+
+    with it("runs specs at the same time, replaying each") as test:
+        one = spec(
+            test,
+            "one_spec.py",
+            """
+            from ivoire import context, describe
+            from _rendezvous import barrier
+            with describe(len) as it:
+                with context("waiting"):
+                    with it("meets the other") as test:
+                        barrier.wait()
+                with it("fails") as test:
+                    test.fail("Nope!")
+            """,
+        )
+        two = spec(
+            test,
+            "two_spec.py",
+            """
+            from ivoire import context, describe
+            from _rendezvous import barrier
+            with describe(abs) as it:
+                with context("also waiting"):
+                    with context("deeper"):
+                        with it("meets the other") as test:
+                            barrier.wait()
+            """,
+        )
+
+        run_specs(test, one, two)
+
+        test.assertEqual(
+            (test.result.testsRun, test.result.errors),
+            (3, []),
+        )
+        ((failed, _),) = test.result.failures
+        test.assertEqual(str(failed), "fails")
+        output = test.stream.getvalue()
+        test.assertIn(
+            "len\n    waiting\n        meets the other\n    fails - FAIL\n",
+            output,
+        )
+        test.assertIn(
+            "abs\n    also waiting\n        deeper\n"
+            "            meets the other\n",
+            output,
+        )
+
+    with it("reports crashed threads as errors and carries on") as test:
+        crashes = spec(test, "crashes_spec.py", "raise SystemExit(12)\n")
+        fine = spec(
+            test,
+            "fine_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+            """,
+        )
+
+        run_specs(test, crashes, fine, threads_=1)
+
+        test.assertEqual(test.result.testsRun, 1)
+        ((example, traceback),) = test.result.errors
+        test.assertEqual(str(example), "<not in example>")
+        test.assertIn("crashed while running", traceback)
+
+    with it("stops early if the result says to") as test:
+        fails = spec(
+            test,
+            "fails_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("fails") as test:
+                    test.fail()
+            """,
+        )
+        test.result.failfast = True
+
+        run_specs(test, fails, fails, fails, threads_=1)
+
+        test.assertEqual(test.result.testsRun, 1)
+
+    with it("leaves this thread's result alone") as test:
+        fine = spec(
+            test,
+            "fine_spec.py",
+            """
+            from ivoire import describe
+            with describe(len) as it:
+                with it("passes") as test:
+                    pass
+            """,
+        )
+        current = ivoire.current_result
+        run_specs(test, fine)
+        test.assertIs(ivoire.current_result, current)
+
+
+with describe(ivoire._Ivoire, Example=ExampleWithPatch) as it:
+    with it("has a current result for each thread") as test:
+        seen: list[object] = []
+        thread = threading.Thread(
+            target=lambda: seen.append(ivoire.current_result),
+        )
+        thread.start()
+        thread.join()
+        test.assertEqual(seen, [None])
+        test.assertIsNotNone(ivoire.current_result)
+
+    with it("can have its current result patched") as test:
+        current = ivoire.current_result
+        with mock.patch("ivoire.current_result") as patched:
+            test.assertIs(ivoire.current_result, patched)
+        test.assertIs(ivoire.current_result, current)
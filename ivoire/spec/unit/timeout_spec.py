@@ -0,0 +1,149 @@
+from contextlib import suppress
+import threading
+import time
+
+from ivoire import describe, timeout
+from ivoire.spec.util import ExampleWithPatch, mock
+
+with describe(timeout.Limit, Example=ExampleWithPatch) as it:
+
+    def in_thread(target):
+        thread = threading.Thread(target=target, name="limited")
+        thread.start()
+        thread.join(timeout=5)
+
+    with it("interrupts the main thread") as test:
+        limit = timeout.Limit(0.01)
+        with test.assertRaises(timeout.Timeout) as raised:
+            limit.start()
+            try:
+                while True:
+                    time.sleep(0.01)
+            finally:
+                limit.cancel()
+        test.assertIn("Took longer than 0.01s.", str(raised.exception))
+        test.assertIn("Thread MainThread", str(raised.exception))
+
+    with it("interrupts other threads") as test:
+        raised = []
+
+        def limited():
+            limit = timeout.Limit(0.01)
+            limit.start()
+            try:
+                while True:
+                    time.sleep(0.01)
+            except timeout.Timeout as error:
+                raised.append(str(error))
+            finally:
+                limit.cancel()
+
+        in_thread(limited)
+        (message,) = raised
+        test.assertIn("Took longer than 0.01s.", message)
+        test.assertIn("Thread limited", message)
+        test.assertIn("in limited", message)
+
+    with it("doesn't interrupt once cancelled") as test:
+
+        def limited():
+            limit = timeout.Limit(0.01)
+            limit.start()
+            limit.cancel()
+            time.sleep(0.05)
+
+        in_thread(limited)
+
+        limit = timeout.Limit(0.01)
+        limit.start()
+        limit.cancel()
+        time.sleep(0.05)
+
+    with it("doesn't interrupt what's cancelling it") as test:
+        limit = timeout.Limit(0.01)
+
+        @timeout.finishing
+        def finish():
+            time.sleep(0.05)
+            limit.cancel()
+
+        limit.start()
+        finish()
+
+    with it("drops its interruption if cancelled before it's raised") as test:
+        set_async_exc = test.patchObject(timeout, "_set_async_exc")
+        interrupted = threading.Event()
+        set_async_exc.side_effect = lambda ident, raised: interrupted.set()
+        idents = []
+
+        def limited():
+            idents.append(threading.get_ident())
+            limit = timeout.Limit(0.01)
+            limit.start()
+            interrupted.wait(timeout=5)
+            limit.cancel()
+
+        in_thread(limited)
+
+        (ident, raised), _ = set_async_exc.call_args
+        test.assertEqual((ident.value, raised), (*idents, None))
+
+    with it("gives up in worker processes") as test:
+        test.patchObject(timeout, "_in_worker", return_value=True)
+        test.patchObject(timeout, "GRACE", 0)
+        exit = test.patchObject(timeout.os, "_exit")
+        on_hang, gave_up = mock.Mock(), threading.Event()
+        exit.side_effect = lambda code: gave_up.set()
+
+        def limited():
+            limit = timeout.Limit(0.01, on_hang=on_hang)
+            limit.start()
+            while not gave_up.is_set():
+                with suppress(timeout.Timeout):
+                    time.sleep(0.01)
+            limit.cancel()
+
+        in_thread(limited)
+
+        exit.assert_called_once_with(timeout.EXIT_CODE)
+        (explanation,), _ = on_hang.call_args
+        test.assertIn("didn't stop when interrupted", explanation)
+
+    with it("doesn't give up outside of worker processes") as test:
+        test.patchObject(timeout, "_in_worker", return_value=False)
+        on_hang = mock.Mock()
+
+        def limited():
+            limit = timeout.Limit(0.01, on_hang=on_hang)
+            limit.start()
+            try:
+                while True:
+                    time.sleep(0.01)
+            except timeout.Timeout:
+                pass
+            limit.cancel()
+
+        in_thread(limited)
+        test.assertFalse(on_hang.called)
+
+
+with describe(timeout.dump, Example=ExampleWithPatch) as it:
+    with it("shows what each other thread is doing") as test:
+        started, done = threading.Event(), threading.Event()
+
+        def waiting():
+            started.set()
+            done.wait()
+
+        thread = threading.Thread(target=waiting, name="waiter")
+        thread.start()
+        started.wait()
+        try:
+            dumped = timeout.dump({})
+        finally:
+            done.set()
+            thread.join()
+
+        test.assertIn("Thread waiter (most recent call last):", dumped)
+        test.assertIn("in waiting", dumped)
+        test.assertNotIn("Thread MainThread", dumped)
@@ -2,6 +2,7 @@ from textwrap import dedent
 from unittest import TestCase
 import ast
 import copy
+import unittest
 
 from ivoire import describe, transform
 from ivoire.spec.util import ExampleWithPatch
@@ -73,6 +74,56 @@ with describe(transform.ExampleTransformer, Example=ExampleWithPatch) as it:
         test.run()
         test.assertEqual(test.i, [1, 2, 3])
 
+    with it("transforms hooks into fixtures") as test:
+        execute(
+            test,
+            """
+            from ivoire import describe
+            with describe(next) as it:
+                @it.before_all
+                def before_all(test):
+                    test.calls = ["before_all"]
+
+                @it.after_all
+                def after_all(test):
+                    test.calls.append("after_all")
+
+                @it.before
+                def before(test):
+                    test.calls.append("before")
+
+                @it.after
+                def after(test):
+                    test.calls.append("after")
+
+                with it("returns the next element") as test:
+                    test.calls.append("example")
+        """,
+        )
+
+        TestNext = test.locals["TestNext"]
+        result = unittest.TestResult()
+        unittest.defaultTestLoader.loadTestsFromTestCase(TestNext).run(result)
+
+        test.assertTrue(result.wasSuccessful())
+        test.assertEqual(
+            TestNext.calls,
+            ["before_all", "before", "example", "after", "after_all"],
+        )
+
+    with it("leaves other decorated functions alone") as test:
+        execute(
+            test,
+            """
+            from ivoire import describe
+            with describe(next) as it:
+                @staticmethod
+                def helper():
+                    return 12
+        """,
+        )
+        test.assertEqual(test.locals["TestNext"].helper(), 12)
+
     with it("leaves other context managers alone") as test:
         assertNotTransformed(
             test,
@@ -83,3 +134,44 @@ with describe(transform.ExampleTransformer, Example=ExampleWithPatch) as it:
                     pass
         """,
         )
+
+    with it("transforms lets into cached properties") as test:
+        execute(
+            test,
+            """
+            from ivoire import describe
+            with describe(next) as it:
+                @it.let("i")
+                def make_i(test):
+                    test.calls.append("let")
+                    return iter([1, 2, 3])
+
+                @it.before
+                def before(test):
+                    test.calls = []
+
+                with it("returns the next element") as test:
+                    test.assertEqual(next(test.i), 1)
+                    test.assertEqual(next(test.i), 2)
+        """,
+        )
+
+        TestNext = test.locals["TestNext"]
+        example = TestNext("test_it_returns_the_next_element")
+        result = unittest.TestResult()
+        example.run(result)
+        test.assertTrue(result.wasSuccessful())
+        test.assertEqual(example.calls, ["let"])
+
+    with it("refuses lets whose names aren't literal") as test:
+        with test.assertRaises(TypeError):
+            execute(
+                test,
+                """
+                from ivoire import describe
+                with describe(next) as it:
+                    @it.let(name)
+                    def i(test):
+                        return 12
+            """,
+            )
@@ -0,0 +1,152 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import os
+import sys
+import types
+
+from ivoire import describe, watch
+from ivoire.imports import Graph
+from ivoire.spec.util import ExampleWithPatch
+
+
+class _Stop(Exception):
+    pass
+
+
+with describe(watch.watch, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name).resolve()
+        test.a, test.b, test.app = (
+            test.root / "a_spec.py",
+            test.root / "b_spec.py",
+            test.root / "app.py",
+        )
+        for path in test.a, test.b, test.app:
+            path.write_text("")
+
+        test.imports = Graph()
+        test.runs = []
+        test.changes = []
+
+    def run(test, specs):
+        test.runs.append(list(specs))
+        test.imports.imports[str(test.a)].add(str(test.app))
+
+    def sleep(test, interval):
+        if not test.changes:
+            raise _Stop
+        path = test.changes.pop(0)
+        os.utime(path, ns=(0, Path(path).stat().st_mtime_ns + 10**9))
+
+    def watching(test):
+        with test.assertRaises(_Stop):
+            watch.watch(
+                discover=lambda: [str(test.a), str(test.b)],
+                run=lambda specs: run(test, specs),
+                imports=test.imports,
+                sleep=lambda interval: sleep(test, interval),
+            )
+        return test.runs
+
+    with it("runs every spec to begin with") as test:
+        test.assertEqual(watching(test), [[str(test.a), str(test.b)]])
+
+    with it("reruns specs which change") as test:
+        test.changes = [test.b]
+        test.assertEqual(
+            watching(test),
+            [[str(test.a), str(test.b)], [str(test.b)]],
+        )
+
+    with it("reruns specs importing modules which change") as test:
+        test.changes = [test.app]
+        test.assertEqual(
+            watching(test),
+            [[str(test.a), str(test.b)], [str(test.a)]],
+        )
+
+
+with describe(watch.changed, Example=ExampleWithPatch) as it:
+    with it("finds modified, new and removed files") as test:
+        test.assertEqual(
+            watch.changed({"a": 1, "b": 2, "c": 3}, {"a": 1, "b": 3, "d": 4}),
+            {"b", "c", "d"},
+        )
+
+
+with describe(watch.affected, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        directory = TemporaryDirectory()
+        test.addCleanup(directory.cleanup)
+        test.root = Path(directory.name).resolve()
+        test.specs = [str(test.root / f"{name}_spec.py") for name in "ab"]
+        for spec in test.specs:
+            Path(spec).touch()
+        test.imports = Graph(
+            [
+                (test.specs[0], str(test.root / "models.py")),
+                (str(test.root / "models.py"), str(test.root / "db.py")),
+            ],
+        )
+
+    with it("finds specs importing changes indirectly") as test:
+        test.assertEqual(
+            watch.affected(test.specs, [test.root / "db.py"], test.imports),
+            [test.specs[0]],
+        )
+
+    with it("finds specs which changed themselves") as test:
+        test.assertEqual(
+            watch.affected(test.specs, [test.specs[1]], test.imports),
+            [test.specs[1]],
+        )
+
+    with it("always finds specs given by module name") as test:
+        test.assertEqual(
+            watch.affected(["foo.bar_spec"], ["quux.py"], test.imports),
+            ["foo.bar_spec"],
+        )
+
+
+with describe(watch.reimport, Example=ExampleWithPatch) as it:
+
+    @it.before
+    def before(test):
+        test.patchDict(sys.modules)
+        test.imports = Graph(
+            [
+                ("/app/spec.py", "/app/models.py"),
+                ("/app/models.py", "/app/db.py"),
+            ],
+        )
+        for name in "models", "db", "other":
+            module = sys.modules[f"app.{name}"] = types.ModuleType(name)
+            module.__file__ = f"/app/{name}.py"
+
+    with it("unimports changed modules and their importers") as test:
+        watch.reimport(["/app/db.py"], test.imports)
+        test.assertEqual(
+            {"app.models", "app.db", "app.other"} & sys.modules.keys(),
+            {"app.other"},
+        )
+
+    with it("forgets what they imported") as test:
+        watch.reimport(["/app/db.py"], test.imports)
+        test.assertEqual(set(test.imports), set())
+
+    with it("never unimports Ivoire itself") as test:
+        import ivoire.result
+
+        test.imports.imports[ivoire.result.__file__].add("/app/db.py")
+        watch.reimport(["/app/db.py"], test.imports)
+        test.assertIn("ivoire.result", sys.modules)
+        test.assertEqual(
+            test.imports.imports[ivoire.result.__file__],
+            {"/app/db.py"},
+        )
@@ -2,9 +2,19 @@
 Standalone mode for Ivoire.
 """
 
+from bisect import bisect_right
+from contextlib import suppress
+from functools import lru_cache
+from itertools import pairwise
 from unittest import SkipTest, TestCase
+import asyncio
+import dis
+import inspect
 import sys
+import time
 
+from ivoire.manager import Scope
+from ivoire.timeout import Limit, Timeout, finishing
 import ivoire
 
 
@@ -12,6 +22,53 @@ class _ShouldStop(Exception):
     pass
 
 
+class _SkipBody(BaseException):
+    """
+    Raised (by a trace function) to skip over the body of an example.
+
+    It isn't an ``Exception``, so that the body's own handlers don't catch it.
+    """
+
+
+_NOP = dis.opmap["NOP"]
+
+#: What stops a run at the first failure (see ``TestResult.failfast``).
+_FAILING = frozenset({"addError", "addFailure"})
+
+
+def _no_trace(frame, event, arg):
+    return None
+
+
+@lru_cache(maxsize=32)
+def _with_bodies(code):
+    """
+    Where the bodies of any ``with`` statements in some code start and end.
+
+    Bodies are what the statements' exception handlers (which call
+    ``__exit__``) cover, so none are found without an exception table.
+    """
+    instructions = list(dis.get_instructions(code))
+    following = {
+        each.offset: after.opname
+        for each, after in pairwise(instructions)
+    }
+    bodies = {}
+    for entry in getattr(dis.Bytecode(code), "exception_entries", ()):
+        if following.get(entry.target) == "WITH_EXCEPT_START":
+            start, end = bodies.get(entry.target, (entry.start, entry.end))
+            bodies[entry.target] = min(start, entry.start), max(end, entry.end)
+    return sorted(bodies.values())
+
+
+@lru_cache(maxsize=32)
+def _line_starts(code):
+    """
+    The offsets of the instructions in some code which start a line.
+    """
+    return frozenset(offset for offset, _ in dis.findlinestarts(code))
+
+
 # TestCase requires the name of an existing method on creation in 2.X because
 # of the way the default implementation of .run() works. So make it shut up.
 _MAKE_UNITTEST_SHUT_UP = "__init__"
@@ -21,40 +78,178 @@ class Example(TestCase):
     """
     An ``Example`` is the smallest unit in a specification.
 
+    If its body runs for longer than ``timeout`` seconds (by default, however
+    long the runner allows), it's interrupted and recorded as an error.
+
+    Once an example stops, anything set on it (e.g. by a ``before`` hook) is
+    dropped, since results may hold on to it until the run ends.
     """
 
-    def __init__(self, name, group, before=None, after=None):
-        super().__init__(_MAKE_UNITTEST_SHUT_UP)
+    __slots__ = (
+        "__after",
+        "__before",
+        "__group",
+        "__lets",
+        "__limit",
+        "__name",
+        "__result",
+        "__scopes",
+        "__skipping",
+        "__started",
+        "__timeout",
+    )
+
+    def __init__(
+        self,
+        name,
+        group,
+        before=None,
+        after=None,
+        *,
+        scopes=(),
+        lets=None,
+        result=None,
+        timeout=None,
+    ):
+        # Rather than calling TestCase.__init__ (which is slow), start from a
+        # copy of what it sets, sharing its (unchanging) assertEqual methods.
+        vars(self).update(_UNITTEST_STATE)
+        self._cleanups = []
         self.__after = after
         self.__before = before
         self.__group = group
+        self.__lets = {} if lets is None else lets
+        self.__limit = None
         self.__name = name
-        self.__result = group.result
+        self.__result = group.result if result is None else result
+        self.__scopes = scopes
+        self.__skipping = None
+        if timeout is None:
+            timeout = ivoire._manager.timeout
+        self.__timeout = timeout
+
+    def addTypeEqualityFunc(self, typeobj, function):
+        """
+        Add a type specific assertEqual style function, for this example only.
+        """
+        if self._type_equality_funcs is _TYPE_EQUALITY_FUNCS:
+            self._type_equality_funcs = dict(self._type_equality_funcs)
+        super().addTypeEqualityFunc(typeobj, function)
 
     def __enter__(self):
         """
         Run the example.
         """
-        self.__result.startTest(self)
-
+        if not self._start(sys._getframe(1)):
+            return self
         if self.__before is not None:
             try:
-                self.__before(self)
+                _synchronously(self.__before(self))
             except Exception:
-                self.__result.addError(self, sys.exc_info())
-                self.__result.stopTest(self)
-                raise _ShouldStop
-
+                self._before_failed()
+        if self.__timeout is not None:
+            self.__limit = Limit(self.__timeout, on_hang=self._hung)
+            self.__limit.start()
         return self
 
+    @finishing
     def __exit__(self, exc_type, exc_value, traceback):
         """
         Finish running the example, logging any raised exceptions as results.
         """
+        if self.__skipping is not None:
+            return self._unskip(exc_type)
+        if self.__limit is not None:
+            self.__limit.cancel()
+        if exc_type is KeyboardInterrupt:
+            return False
+
+        self._addOutcome(exc_type, exc_value, traceback)
+        if self.__after is not None:
+            _synchronously(self.__after(self))
+        return self._stop()
+
+    async def __aenter__(self):
+        """
+        Run the example, awaiting any asynchronous ``before`` hook.
+        """
+        if not self._start(sys._getframe(1)):
+            return self
+        if self.__before is not None:
+            try:
+                await _maybe_awaiting(self.__before(self))
+            except Exception:
+                self._before_failed()
+        if self.__timeout is not None:
+            self.__limit = asyncio.timeout(self.__timeout)
+            await self.__limit.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        """
+        Finish running the example, awaiting any asynchronous ``after`` hook.
+        """
+        if self.__skipping is not None:
+            return self._unskip(exc_type)
+        if self.__limit is not None:
+            try:
+                await self.__limit.__aexit__(exc_type, exc_value, traceback)
+            except TimeoutError as error:
+                exc_type, traceback = Timeout, None
+                exc_value = Timeout.after(self.__timeout, {})
+                exc_value.__cause__ = error.__cause__
+        if exc_type is KeyboardInterrupt:
+            return False
+
+        self._addOutcome(exc_type, exc_value, traceback)
+        if self.__after is not None:
+            await _maybe_awaiting(self.__after(self))
+        return self._stop()
+
+    def _start(self, frame):
+        """
+        Start the example, unless it's to be skipped.
+
+        Returns whether its ``before`` hook (and body) should run.
+        """
+        if not ivoire._manager.selects(self):
+            self._skip(frame)
+            return False
+
+        self.__result.startTest(self)
+        self.__started = time.perf_counter(), time.process_time()
+
+        for scope in self.__scopes:
+            exc_info = scope.set_up(self)
+            if exc_info is not None:
+                self.__result.addError(self, exc_info)
+                self._addTiming()
+                self.__result.stopTest(self)
+                self._release()
+                if self.__result.shouldStop:
+                    raise _ShouldStop
+                self._skip(frame)
+                return False
+        return True
+
+    def _before_failed(self):
+        """
+        The ``before`` hook errored, so record it and stop the whole group.
+        """
+        self.__result.addError(self, sys.exc_info())
+        self.doCleanups()
+        self._forget()
+        self._addTiming()
+        self.__result.stopTest(self)
+        self._release()
+        raise _ShouldStop
+
+    def _addOutcome(self, exc_type, exc_value, traceback):
+        """
+        Record how the body of the example went.
+        """
         if exc_type is None:
             self.__result.addSuccess(self)
-        elif exc_type is KeyboardInterrupt:
-            return False
         elif exc_type == SkipTest:
             self.__result.addSkip(self, str(exc_value))
         elif exc_type == self.failureException:
@@ -62,16 +257,38 @@ class Example(TestCase):
         else:
             self.__result.addError(self, (exc_type, exc_value, traceback))
 
-        if self.__after is not None:
-            self.__after(self)
-
+    def _stop(self):
+        """
+        Clean up after the (finished) example and stop it.
+        """
         self.doCleanups()
+        self._forget()
+        self._addTiming()
         self.__result.stopTest(self)
+        self._release()
 
         if self.__result.shouldStop:
             raise _ShouldStop
         return True
 
+    def __getattr__(self, attr):
+        """
+        Lazily create (and remember) any values the example's group ``let``s.
+        """
+        let = None
+        # Unset slots end up here too (e.g. on an uninitialized example),
+        # and looking for them among the lets would look for the lets again.
+        if not attr.startswith("_Example__"):
+            let = self.__lets.get(attr)
+        if let is None:
+            name = self.__class__.__name__
+            raise AttributeError(  # noqa: TRY003
+                f"{name!r} object has no attribute {attr!r}",
+            )
+        value = let(self)
+        setattr(self, attr, value)
+        return value
+
     def __hash__(self):
         return hash((self.__class__, self.group, self.__name))
 
@@ -81,6 +298,108 @@ class Example(TestCase):
     def __str__(self):
         return self.__name
 
+    def _skip(self, frame):
+        """
+        Skip the body of the ``with`` statement being run in the given frame.
+
+        Standalone mode has no other way to avoid running an example's body,
+        so this is done by tracing the frame and, as soon as the first line of
+        the body (after binding the example) starts, jumping back to the
+        ``with`` statement's line, which is where it exits. Nothing in the
+        body runs then, not even its ``except`` or ``finally`` clauses. Where
+        the body can't be found, as soon as a line after the ``with``
+        statement's starts instead.
+
+        Bodies on the same line as the ``with`` statement (which can't have
+        ``try`` statements) start no line of their own, so an exception is
+        raised at their first instruction instead (as it is if the jump
+        fails), then swallowed on exit.
+
+        Bodies which do nothing (e.g. are just ``pass``) compile to a no-op
+        which isn't covered by the ``with`` statement's exception handler, so
+        there's nothing to skip (or raise) there.
+        """
+        entered, bodies = frame.f_lineno, _with_bodies(frame.f_code)
+        starts = _line_starts(frame.f_code)
+        index = bisect_right(bodies, (frame.f_lasti, float("inf")))
+        body = None
+        if index < len(bodies):
+            start, end = bodies[index]
+            body = range(start + 1, end)
+
+        jumped = False
+
+        def skip_body(frame, event, arg):
+            nonlocal jumped
+            code, lasti = frame.f_code.co_code, frame.f_lasti
+            if body is None:
+                inside = frame.f_lineno > entered
+            else:
+                inside = lasti in body
+            if jumped or not inside:
+                return skip_body
+            if event == "line":
+                with suppress(ValueError):
+                    frame.f_lineno, jumped = entered, True
+            elif lasti not in starts and code[lasti] != _NOP:
+                raise _SkipBody
+            return skip_body
+
+        self.__skipping = (
+            frame,
+            frame.f_trace,
+            frame.f_trace_opcodes,
+            sys.gettrace(),
+        )
+        sys.settrace(_no_trace)
+        frame.f_trace, frame.f_trace_opcodes = skip_body, True
+
+    def _unskip(self, exc_type):
+        """
+        Stop skipping the body, swallowing the exception used to skip it.
+        """
+        frame, frame_trace, trace_opcodes, trace = self.__skipping
+        self.__skipping = None
+        sys.settrace(trace)
+        frame.f_trace, frame.f_trace_opcodes = frame_trace, trace_opcodes
+        return exc_type is _SkipBody
+
+    def _hung(self, explanation):
+        """
+        The example can't be interrupted, so record why it'll never finish.
+        """
+        self.__result.addError(self, explanation)
+
+    def _forget(self):
+        """
+        Drop any values created by ``let``s, now that the example is done.
+        """
+        for name in self.__lets:
+            vars(self).pop(name, None)
+
+    def _release(self):
+        """
+        Drop everything the example no longer needs, now that it's stopped.
+        """
+        state = vars(self)
+        for name in [name for name in state if name not in _KEPT]:
+            del state[name]
+        self.__after = self.__before = self.__limit = None
+        self.__lets, self.__scopes = {}, ()
+
+    def _addTiming(self):
+        """
+        Tell the result how long the example took, if it wants to know.
+        """
+        addTiming = getattr(self.__result, "addTiming", None)
+        if addTiming is not None:
+            wall, cpu = self.__started
+            addTiming(
+                self,
+                wall=time.perf_counter() - wall,
+                cpu=time.process_time() - cpu,
+            )
+
     @property
     def group(self):
         """
@@ -96,26 +415,39 @@ class Example(TestCase):
             raise SkipTest(reason)
 
 
-class ExampleGroup:
+_UNITTEST_STATE = vars(TestCase(_MAKE_UNITTEST_SHUT_UP))
+_UNITTEST_STATE["_testMethodDoc"] = None
+_TYPE_EQUALITY_FUNCS = _UNITTEST_STATE["_type_equality_funcs"]
+_KEPT = {*_UNITTEST_STATE, "failureException"}
+
+
+class ExampleGroup(Scope):
     """
     ``ExampleGroup``s group together a number of ``Example``s.
 
+    Groups made with ``keep_examples=False`` don't hold on to their examples
+    (so ``examples`` stays empty), which lets each one be freed once it has
+    run, rather than at the end of the whole run.
     """
 
     _before = _after = None
+    _depth = 0
     failureException = None
     result = None
 
-    def __init__(self, describes, Example=Example):
+    def __init__(self, describes, Example=Example, keep_examples=True):
         self.Example = Example
         self.describes = describes
         self.examples = []
+        self.keep_examples = keep_examples
+        self._lets = {}
 
     def __enter__(self):
         """
         Begin running the group.
         """
         self.result = _get_result()
+        self._depth = ivoire._manager.context_depth
 
         enterGroup = getattr(self.result, "enterGroup", None)
         if enterGroup is not None:
@@ -124,6 +456,8 @@ class ExampleGroup:
         return self
 
     def __exit__(self, exc_type, exc_value, traceback):
+        self.tear_down(self.result)
+
         exitGroup = getattr(self.result, "exitGroup", None)
         if exitGroup is not None:
             exitGroup(self)
@@ -131,6 +465,12 @@ class ExampleGroup:
         if exc_type == _ShouldStop:
             return True
 
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return self.__exit__(exc_type, exc_value, traceback)
+
     def __iter__(self):
         return iter(self.examples)
 
@@ -140,21 +480,28 @@ class ExampleGroup:
     def __str__(self):
         return self.describes.__name__
 
-    def __call__(self, name):
+    def __call__(self, name, result=None, timeout=None):
         """
         Construct and return a new ``Example``.
+
+        It's interrupted if it runs for longer than ``timeout`` seconds.
         """
         example = self.Example(
             name=name,
             group=self,
             before=self._before,
             after=self._after,
+            scopes=[self, *ivoire._manager.contexts[self._depth :]],
+            lets=self._lets,
+            result=result,
+            timeout=timeout,
         )
 
         if self.failureException is not None:
             example.failureException = self.failureException
 
-        self.add_example(example)
+        if self.keep_examples:
+            self.add_example(example)
         return example
 
     def add_example(self, example):
@@ -180,13 +527,164 @@ class ExampleGroup:
         """
         self._after = fn
 
+    def let(self, name):
+        """
+        Lazily provide ``name`` on each example using the decorated function.
+
+        The function is called with the example the first time the example
+        accesses the attribute, and its return value is remembered for the
+        rest of that example. Examples which never access it never call it.
+        Cleanups it adds to the example are run when the example finishes.
+        """
+
+        def let(fn):
+            self._lets[name] = fn
+            return fn
+
+        return let
+
+    def concurrently(self, limit=None):
+        """
+        Run the asynchronous examples defined within the block concurrently.
+
+        Examples are defined by decorating coroutine functions (which are
+        passed the example) with the object this returns, and are run when
+        the (``async with``) block ends, at most ``limit`` at a time. Their
+        results are reported in the order they were defined in, once they've
+        run, so profiling, sampling and recording impact (which watch
+        examples as they're reported to run) see nothing of them.
+        """
+        return _Concurrently(self, limit=limit)
+
     def countTestCases(self):  # noqa: D102
         return sum(example.countTestCases() for example in self)
 
 
+class _Concurrently:
+    """
+    Asynchronous examples which are to be run concurrently.
+    """
+
+    def __init__(self, group, limit):
+        self.group = group
+        self.limit = limit
+        self._examples = []
+
+    def __call__(self, name):
+        """
+        Define an example whose body is the decorated coroutine function.
+        """
+
+        def concurrently(fn):
+            result = _Deferred(self.group.result)
+            example = self.group(name, result=result)
+            self._examples.append((example, fn, result))
+            return fn
+
+        return concurrently
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            return
+
+        examples, self._examples = self._examples, []
+        limit = asyncio.Semaphore(self.limit or len(examples) or 1)
+
+        async def run(example, fn):
+            async with limit:
+                if any(result.shouldStop for _, _, result in examples):
+                    return
+                try:
+                    async with example as test:
+                        await fn(test)
+                except _ShouldStop:
+                    pass
+
+        tasks = [
+            asyncio.ensure_future(run(example, fn))
+            for example, fn, _ in examples
+        ]
+        try:
+            for task, (_, _, result) in zip(tasks, examples):
+                await task
+                result.replay()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if self.group.result.shouldStop:
+            raise _ShouldStop
+
+
+class _Deferred:
+    """
+    Remember what's done to a result, to do it later (all at once).
+
+    Anything other than methods is delegated to the result.
+    """
+
+    def __init__(self, result):
+        self.result = result
+        self._calls = []
+
+    @property
+    def shouldStop(self):
+        """
+        Whether the result says to stop, or will once this is replayed.
+        """
+        if self.result.shouldStop:
+            return True
+        failed = any(attr in _FAILING for attr, _, _ in self._calls)
+        return failed and getattr(self.result, "failfast", False)
+
+    def __getattr__(self, attr):
+        method = getattr(self.result, attr)
+        if not callable(method):
+            return method
+
+        def deferred(*args, **kwargs):
+            self._calls.append((attr, args, kwargs))
+
+        return deferred
+
+    def replay(self):
+        """
+        Do everything which was done, to the real result.
+        """
+        calls, self._calls = self._calls, []
+        for attr, args, kwargs in calls:
+            getattr(self.result, attr)(*args, **kwargs)
+
+
 describe = ExampleGroup
 
 
+def _synchronously(returned):
+    """
+    Complain about hooks which are asynchronous, outside of ``async with``.
+    """
+    if inspect.isawaitable(returned):
+        if inspect.iscoroutine(returned):
+            returned.close()
+        raise TypeError(  # noqa: TRY003
+            "Asynchronous hooks can only be used by examples run with "
+            "`async with`.",
+        )
+    return returned
+
+
+async def _maybe_awaiting(returned):
+    """
+    Await what a hook returned, if it's awaitable.
+    """
+    if inspect.isawaitable(returned):
+        return await returned
+    return returned
+
+
 def _get_result():
     """
     Find the global result object.
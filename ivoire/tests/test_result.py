@@ -37,6 +37,14 @@ class TestFormatterMixin(TestCase, PatchMixin):
         self.assertEqual("", self.formatter.errors([]))
         self.assertFalse("", self.formatter.failures([]))
 
+    def test_tracebacks_are_formatted_one_at_a_time(self):
+        self.formatter.traceback.side_effect = ["a\n", "b\n"]
+        errors = iter([(mock.Mock(), mock.Mock()), (mock.Mock(), mock.Mock())])
+
+        output = self.formatter._tracebacks("Errors:\n", errors)
+        self.assertEqual(next(output), "Errors:\n\na\n")
+        self.assertEqual(self.formatter.traceback.call_count, 1)
+
     def test_statistics(self):
         elapsed, result = mock.Mock(), mock.Mock()
         timing_output = self.formatter.timing.return_value = "timing\n"
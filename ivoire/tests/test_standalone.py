@@ -8,11 +8,17 @@ by the surrounding test case.
 
 """
 
+from functools import partial
 from unittest import TestCase
+import asyncio
 import sys
+import time
 
+from ivoire import context, selection, standalone
 from ivoire.standalone import describe
+from ivoire.timeout import Timeout
 from ivoire.tests.util import PatchMixin, mock
+import ivoire
 
 
 class TestDescribeTests(TestCase, PatchMixin):
@@ -27,6 +33,27 @@ class TestDescribeTests(TestCase, PatchMixin):
                 pass
         self.assertEqual(it.examples, [test])
 
+    def test_it_can_forget_examples(self):
+        with describe(self.describes, keep_examples=False) as it:
+            with it("does a thing"):
+                pass
+        self.assertEqual(it.examples, [])
+
+    def test_it_drops_what_examples_hold_once_they_stop(self):
+        with self.it as it:
+            with it("does a thing") as test:
+                test.thing = object()
+        self.assertFalse(hasattr(test, "thing"))
+        self.assertEqual((str(test), test.group), ("does a thing", it))
+
+    def test_it_keeps_type_equality_functions_to_one_example(self):
+        with self.it as it:
+            with it("does a thing") as test:
+                test.addTypeEqualityFunc(int, "assertIntEqual")
+            with it("does another thing") as other:
+                pass
+        self.assertNotIn(int, other._type_equality_funcs)
+
     def test_it_can_pass(self):
         with self.it as it:
             with it("does a thing") as test:
@@ -37,6 +64,7 @@ class TestDescribeTests(TestCase, PatchMixin):
                 mock.call.enterGroup(self.it),
                 mock.call.startTest(test),
                 mock.call.addSuccess(test),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
                 mock.call.stopTest(test),
                 mock.call.exitGroup(self.it),
             ],
@@ -56,6 +84,7 @@ class TestDescribeTests(TestCase, PatchMixin):
                 mock.call.enterGroup(self.it),
                 mock.call.startTest(test),
                 mock.call.addFailure(test, exc_info),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
                 mock.call.stopTest(test),
                 mock.call.exitGroup(self.it),
             ],
@@ -75,6 +104,7 @@ class TestDescribeTests(TestCase, PatchMixin):
                 mock.call.enterGroup(self.it),
                 mock.call.startTest(test),
                 mock.call.addError(test, exc_info),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
                 mock.call.stopTest(test),
                 mock.call.exitGroup(self.it),
             ],
@@ -105,6 +135,7 @@ class TestDescribeTests(TestCase, PatchMixin):
                 mock.call.enterGroup(self.it),
                 mock.call.startTest(example),
                 mock.call.addError(example, mock.ANY),  # traceback object
+                mock.call.addTiming(example, wall=mock.ANY, cpu=mock.ANY),
                 mock.call.stopTest(example),
                 mock.call.exitGroup(self.it),
             ],
@@ -139,10 +170,454 @@ class TestDescribeTests(TestCase, PatchMixin):
         self.assertEqual(foo, None)
         self.assertEqual(self.foo, 12)
 
+    def test_it_times_examples(self):
+        with self.it as it:
+            with it("does a thing"):
+                pass
+
+        _, kwargs = self.result.addTiming.call_args
+        self.assertGreaterEqual(kwargs["wall"], 0)
+        self.assertGreaterEqual(kwargs["cpu"], 0)
+
+    def test_it_only_times_examples_if_result_knows_how(self):
+        del self.result.addTiming
+
+        with self.it as it:
+            with it("does a thing") as test:
+                pass
+
+        self.assertEqual(
+            self.result.method_calls,
+            [
+                mock.call.enterGroup(self.it),
+                mock.call.startTest(test),
+                mock.call.addSuccess(test),
+                mock.call.stopTest(test),
+                mock.call.exitGroup(self.it),
+            ],
+        )
+
+    def test_it_runs_before_all_once(self):
+        calls = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                calls.append("before_all")
+                scope.foo = 12
+
+            with it("should have set foo") as test:
+                calls.append(test.foo)
+
+            with it("should still have foo") as test:
+                calls.append(test.foo)
+
+        self.assertEqual(calls, ["before_all", 12, 12])
+
+    def test_it_does_not_run_before_all_without_examples(self):
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                self.fail("Should not have run!")  # pragma: no cover
+
+    def test_it_reports_before_all_errors_for_every_example(self):
+        ran = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                raise RuntimeError("Buggy before_all.")
+
+            with it("should not be run") as test:
+                ran.append(test)  # pragma: no cover
+
+            with it("should not be run either") as another:
+                ran.append(another)  # pragma: no cover
+
+        self.assertEqual(ran, [])
+        self.assertEqual(
+            self.result.method_calls,
+            [
+                mock.call.enterGroup(self.it),
+                mock.call.startTest(test),
+                mock.call.addError(test, mock.ANY),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
+                mock.call.stopTest(test),
+                mock.call.startTest(another),
+                mock.call.addError(another, mock.ANY),
+                mock.call.addTiming(another, wall=mock.ANY, cpu=mock.ANY),
+                mock.call.stopTest(another),
+                mock.call.exitGroup(self.it),
+            ],
+        )
+        (_, (_, error, _)), _ = self.result.addError.call_args
+        self.assertEqual(str(error), "Buggy before_all.")
+
+    def test_it_restores_tracing_after_skipping(self):
+        trace = sys.gettrace()
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                raise RuntimeError("Buggy before_all.")
+
+            with it("should not be run"):
+                pass  # pragma: no cover
+
+        self.assertIs(sys.gettrace(), trace)
+
+    def test_it_skips_exception_handlers_in_skipped_bodies(self):
+        ran = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                raise RuntimeError("Buggy before_all.")
+
+            with it("should not be run") as test:
+                try:
+                    ran.append("try")  # pragma: no cover
+                except Exception:  # pragma: no cover
+                    ran.append("except")
+                    test.fail()
+
+            with it("should not be run either") as another:
+                ran.append("another")  # pragma: no cover
+
+        self.assertEqual(ran, [])
+        self.assertFalse(self.result.addFailure.called)
+        self.assertEqual(
+            [each for (each, _), _ in self.result.addError.call_args_list],
+            [test, another],
+        )
+
+    def test_it_skips_finally_clauses_in_skipped_bodies(self):
+        ran = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                raise RuntimeError("Buggy before_all.")
+
+            with it("should not be run"):
+                try:
+                    ran.append("try")  # pragma: no cover
+                finally:
+                    ran.append("finally")  # pragma: no cover
+
+            with it("should not be run either"):
+                try: ran.append("try")  # noqa: E701
+                finally: ran.append("finally")  # noqa: E701
+
+        self.assertEqual(ran, [])
+
+    def test_it_runs_after_all_once_after_all_examples(self):
+        calls = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                scope.calls = calls
+
+            @it.after_all
+            def after_all(scope):
+                scope.calls.append("after_all")
+
+            with it("does a thing"):
+                calls.append("example")
+
+            with it("does another thing"):
+                calls.append("example")
+
+        self.assertEqual(calls, ["example", "example", "after_all"])
+
+    def test_it_does_not_run_after_all_if_before_all_fails(self):
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                raise RuntimeError("Buggy before_all.")
+
+            @it.after_all
+            def after_all(scope):
+                self.fail("Should not have run!")  # pragma: no cover
+
+            with it("should not be run"):
+                pass  # pragma: no cover
+
+    def test_it_reports_after_all_errors(self):
+        with self.it as it:
+
+            @it.after_all
+            def after_all(scope):
+                raise RuntimeError("Buggy after_all.")
+
+            with it("does a thing"):
+                pass
+
+        (example, (_, error, _)), _ = self.result.addError.call_args
+        self.assertEqual(str(error), "Buggy after_all.")
+        self.assertEqual(str(example), f"<after all: {self.it}>")
+        self.assertEqual(
+            self.result.method_calls[-2:],
+            [mock.call.addError(example, mock.ANY), mock.call.exitGroup(it)],
+        )
+
+    def test_it_runs_before_all_for_contexts(self):
+        calls = []
+
+        with self.it as it:
+
+            @it.before_all
+            def before_all(scope):
+                calls.append("group")
+                scope.foo = 1
+
+            with it("is outside the context") as test:
+                calls.append(vars(test).get("bar"))
+
+            with context("a context") as a_context:
+
+                @a_context.before_all
+                def context_before_all(scope):
+                    calls.append("context")
+                    scope.bar = 2
+
+                @a_context.after_all
+                def context_after_all(scope):
+                    calls.append("context after")
+
+                with it("is inside the context") as test:
+                    calls.append((test.foo, test.bar))
+
+                with it("is inside the context again") as test:
+                    calls.append((test.foo, test.bar))
+
+            calls.append("outside")
+
+        self.assertEqual(
+            calls,
+            [
+                "group",
+                None,
+                "context",
+                (1, 2),
+                (1, 2),
+                "context after",
+                "outside",
+            ],
+        )
+
+    def test_it_lets_examples_lazily_create_values(self):
+        calls = []
+
+        with self.it as it:
+
+            @it.let("thing")
+            def thing(test):
+                calls.append(test)
+                return object()
+
+            with it("uses the thing twice") as test:
+                first, second = test.thing, test.thing
+
+            with it("does not use the thing"):
+                calls.append("nothing")
+
+        self.assertIs(first, second)
+        self.assertEqual(calls, [test, "nothing"])
+
+    def test_it_creates_let_values_for_each_example(self):
+        with self.it as it:
+
+            @it.let("thing")
+            def thing(test):
+                return object()
+
+            with it("uses the thing") as test:
+                first = test.thing
+
+            with it("uses the thing again") as test:
+                second = test.thing
+
+        self.assertIsNot(first, second)
+
+    def test_it_forgets_let_values_after_cleaning_up(self):
+        cleaned_up = []
+
+        with self.it as it:
+
+            @it.let("thing")
+            def thing(test):
+                test.addCleanup(lambda: cleaned_up.append(vars(test)["thing"]))
+                return "thing"
+
+            with it("uses the thing") as test:
+                test.thing  # noqa: B018
+
+        self.assertEqual(cleaned_up, ["thing"])
+        self.assertNotIn("thing", vars(test))
+
+    def test_it_lets_lets_use_other_lets(self):
+        with self.it as it:
+
+            @it.let("one")
+            def one(test):
+                return 1
+
+            @it.let("two")
+            def two(test):
+                return test.one + 1
+
+            with it("uses two") as test:
+                two = test.two
+
+        self.assertEqual(two, 2)
+
+    def test_it_still_raises_AttributeError_for_other_attributes(self):
+        with self.it as it:
+            with it("uses a missing thing") as test:
+                test.missing  # noqa: B018
+
+        (_, (exc_type, _, _)), _ = self.result.addError.call_args
+        self.assertIs(exc_type, AttributeError)
+
+    def test_it_raises_AttributeError_for_uninitialized_examples(self):
+        example = standalone.Example.__new__(standalone.Example)
+        with self.assertRaises(AttributeError):
+            example.missing  # noqa: B018
+
+    def test_it_skips_examples_which_are_not_selected(self):
+        ran = []
+        self.patchObject(
+            ivoire._manager,
+            "select",
+            lambda path: path[-1] == "runs",
+        )
+
+        with self.it as it:
+
+            @it.before
+            def before(test):
+                ran.append(("before", str(test)))
+
+            with it("is skipped"):
+                ran.append("is skipped")  # pragma: no cover
+
+            with it("runs") as test:
+                ran.append("runs")
+
+        self.assertEqual(ran, [("before", "runs"), "runs"])
+        self.assertEqual(
+            self.result.method_calls,
+            [
+                mock.call.enterGroup(self.it),
+                mock.call.startTest(test),
+                mock.call.addSuccess(test),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
+                mock.call.stopTest(test),
+                mock.call.exitGroup(self.it),
+            ],
+        )
+
+    def test_it_skips_one_line_examples_which_are_not_selected(self):
+        ran = []
+        select = partial(selection.Keywords(["runs"]), "a_spec.py")
+        self.patchObject(ivoire._manager, "select", select)
+
+        with self.it as it:
+            with it("is skipped") as test: test.fail()  # noqa: E701
+            with it("is skipped too"): ran.append("is skipped")  # noqa: E701
+            with it("is skipped as well"): pass  # noqa: E701
+            with it("runs") as test: ran.append("runs")  # noqa: E701
+
+        self.assertEqual(ran, ["runs"])
+        self.assertEqual(
+            self.result.method_calls,
+            [
+                mock.call.enterGroup(self.it),
+                mock.call.startTest(test),
+                mock.call.addSuccess(test),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
+                mock.call.stopTest(test),
+                mock.call.exitGroup(self.it),
+            ],
+        )
+
+    def test_it_skips_the_handlers_of_examples_which_are_not_selected(self):
+        ran = []
+        select = partial(selection.Keywords(["check"]), "a_spec.py")
+        self.patchObject(ivoire._manager, "select", select)
+
+        with self.it as it:
+            with it("is skipped") as test:
+                try:
+                    ran.append("try")  # pragma: no cover
+                except Exception:  # pragma: no cover
+                    ran.append("except")
+                    test.fail()
+                finally:
+                    ran.append("finally")  # pragma: no cover
+
+            with it("checks") as test:
+                ran.append("checks")
+
+        self.assertEqual(ran, ["checks"])
+        self.result.addSuccess.assert_called_once_with(test)
+        self.assertFalse(self.result.addFailure.called)
+
+    def test_it_skips_one_line_examples_which_did_not_fail_last_time(self):
+        ran = []
+        path = str(self.it), "failed"
+        select = selection.LastFailed([("a_spec.py", path)])
+        self.patchObject(
+            ivoire._manager,
+            "select",
+            partial(select, "a_spec.py"),
+        )
+
+        with self.it as it:
+            with it("passed") as test: test.fail()  # noqa: E701
+            with it("failed"): ran.append("failed")  # noqa: E701
+
+        self.assertEqual(ran, ["failed"])
+        self.assertFalse(self.result.addFailure.called)
+
+    def test_it_skips_the_handlers_of_examples_which_did_not_fail(self):
+        ran = []
+        path = str(self.it), "failed"
+        select = selection.LastFailed([("a_spec.py", path)])
+        self.patchObject(
+            ivoire._manager,
+            "select",
+            partial(select, "a_spec.py"),
+        )
+
+        with self.it as it:
+            with it("passed") as test:
+                try:
+                    ran.append("try")  # pragma: no cover
+                except Exception:  # pragma: no cover
+                    ran.append("except")
+                    test.fail()
+
+            with it("failed"):
+                ran.append("failed")
+
+        self.assertEqual(ran, ["failed"])
+        self.assertFalse(self.result.addFailure.called)
+
     def test_it_runs_cleanups(self):
         with self.it as it:
             with it("does a thing") as test:
-                doCleanups = self.patchObject(test, "doCleanups")
+                doCleanups = self.patchObject(type(test), "doCleanups")
         self.assertTrue(doCleanups.called)
 
     def test_it_respects_shouldStop(self):
@@ -151,6 +626,26 @@ class TestDescribeTests(TestCase, PatchMixin):
                 self.result.shouldStop = True
             self.fail("should have stopped already!")  # pragma: no cover
 
+    def test_it_interrupts_examples_which_take_too_long(self):
+        with self.it as it:
+            with it("takes too long", timeout=0.01) as slow:
+                time.sleep(5)
+            with it("is quick") as quick:
+                pass
+
+        (example, (exc_type, _, _)), _ = self.result.addError.call_args
+        self.assertEqual((example, exc_type), (slow, Timeout))
+        self.result.addSuccess.assert_called_once_with(quick)
+
+    def test_it_uses_the_default_timeout(self):
+        self.patchObject(ivoire._manager, "timeout", 0.01)
+        with self.it as it:
+            with it("takes too long") as test:
+                time.sleep(5)
+
+        (example, (exc_type, _, _)), _ = self.result.addError.call_args
+        self.assertEqual((example, exc_type), (test, Timeout))
+
     def test_it_can_skip(self):
         with self.it as it:
             with it("should skip this test") as test:
@@ -164,6 +659,7 @@ class TestDescribeTests(TestCase, PatchMixin):
                 mock.call.enterGroup(self.it),
                 mock.call.startTest(test),
                 mock.call.addSkip(test, "A good one"),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
                 mock.call.stopTest(test),
                 mock.call.exitGroup(self.it),
             ],
@@ -190,3 +686,194 @@ class TestDescribeTests(TestCase, PatchMixin):
             self.result.method_calls,
             [mock.call.enterGroup(self.it)],
         )
+
+
+class TestAsyncDescribeTests(TestCase, PatchMixin):
+    def setUp(self):
+        self.result = self.patch("ivoire.current_result", shouldStop=False)
+        self.it = describe(describe)
+
+    def test_it_can_pass(self):
+        async def run():
+            async with self.it as it:
+                async with it("does a thing") as test:
+                    await asyncio.sleep(0)
+            return test
+
+        test = asyncio.run(run())
+
+        self.assertEqual(
+            self.result.method_calls,
+            [
+                mock.call.enterGroup(self.it),
+                mock.call.startTest(test),
+                mock.call.addSuccess(test),
+                mock.call.addTiming(test, wall=mock.ANY, cpu=mock.ANY),
+                mock.call.stopTest(test),
+                mock.call.exitGroup(self.it),
+            ],
+        )
+
+    def test_it_can_fail(self):
+        async def run():
+            async with self.it as it:
+                async with it("does a thing") as test:
+                    await asyncio.sleep(0)
+                    test.fail()
+            return test
+
+        test = asyncio.run(run())
+
+        (failed, _), _ = self.result.addFailure.call_args
+        self.assertIs(failed, test)
+
+    def test_it_interrupts_examples_which_take_too_long(self):
+        async def run():
+            async with self.it as it:
+                async with it("takes too long", timeout=0.01) as slow:
+                    await asyncio.sleep(5)
+                async with it("is quick") as quick:
+                    pass
+            return slow, quick
+
+        slow, quick = asyncio.run(run())
+
+        (example, (exc_type, _, _)), _ = self.result.addError.call_args
+        self.assertEqual((example, exc_type), (slow, Timeout))
+        self.result.addSuccess.assert_called_once_with(quick)
+
+    def test_it_awaits_async_befores_and_afters(self):
+        ran = []
+
+        async def run():
+            async with self.it as it:
+
+                @it.before
+                async def before(test):
+                    await asyncio.sleep(0)
+                    ran.append("before")
+
+                @it.after
+                async def after(test):
+                    await asyncio.sleep(0)
+                    ran.append("after")
+
+                async with it("does a thing"):
+                    ran.append("body")
+
+        asyncio.run(run())
+
+        self.assertEqual(ran, ["before", "body", "after"])
+
+    def test_it_errors_for_async_hooks_outside_async_with(self):
+        with self.it as it:
+
+            @it.before
+            async def before(test):
+                pass  # pragma: no cover
+
+            with it("does a thing"):
+                pass  # pragma: no cover
+
+        (_, (exc_type, _, _)), _ = self.result.addError.call_args
+        self.assertIs(exc_type, TypeError)
+
+    def test_it_skips_async_examples_which_are_not_selected(self):
+        ran = []
+        self.patchObject(
+            ivoire._manager,
+            "select",
+            lambda path: path[-1] == "runs",
+        )
+
+        async def run():
+            async with self.it as it:
+                async with it("is skipped"):
+                    ran.append("is skipped")  # pragma: no cover
+                async with it("runs"):
+                    ran.append("runs")
+
+        asyncio.run(run())
+
+        self.assertEqual(ran, ["runs"])
+
+    def test_it_skips_one_line_async_examples_which_are_not_selected(self):
+        ran = []
+        self.patchObject(
+            ivoire._manager,
+            "select",
+            lambda path: path[-1] == "runs",
+        )
+
+        async def run():
+            async with self.it as it:
+                async with it("skipped"): ran.append("skipped")  # noqa: E701
+                async with it("runs"): ran.append("runs")  # noqa: E701
+
+        asyncio.run(run())
+
+        self.assertEqual(ran, ["runs"])
+
+    def test_it_runs_examples_concurrently_but_reports_them_in_order(self):
+        running, most = set(), []
+
+        async def run():
+            async with self.it as it:
+                async with it.concurrently(limit=2) as concurrently:
+                    for n in range(4):
+
+                        @concurrently(f"waits {n}")
+                        async def wait(test, n=n):
+                            running.add(n)
+                            most.append(len(running))
+                            await asyncio.sleep(0.01 * (4 - n))
+                            running.discard(n)
+
+        asyncio.run(run())
+
+        self.assertEqual(max(most), 2)
+        started = [
+            str(example)
+            for (name, (example, *_), _) in self.result.method_calls
+            if name == "startTest"
+        ]
+        self.assertEqual(started, ["waits 0", "waits 1", "waits 2", "waits 3"])
+        self.assertEqual(
+            [name for name, _, _ in self.result.method_calls][1:6],
+            ["startTest", "addSuccess", "addTiming", "stopTest", "startTest"],
+        )
+
+    def test_it_stops_running_concurrent_examples_at_the_first_failure(self):
+        self.result.failfast = True
+        ran = []
+
+        async def run():
+            async with self.it as it:
+                async with it.concurrently(limit=1) as concurrently:
+
+                    @concurrently("fails")
+                    async def fails(test):
+                        ran.append("fails")
+                        test.fail()
+
+                    @concurrently("runs")
+                    async def runs(test):
+                        ran.append("runs")
+
+        asyncio.run(run())
+
+        self.assertEqual(ran, ["fails"])
+
+    def test_it_reports_concurrent_failures(self):
+        async def run():
+            async with self.it as it:
+                async with it.concurrently() as concurrently:
+
+                    @concurrently("fails")
+                    async def fails(test):
+                        test.fail()
+
+        asyncio.run(run())
+
+        (failed, _), _ = self.result.addFailure.call_args
+        self.assertEqual(str(failed), "fails")
@@ -0,0 +1,62 @@
+"""
+Run specs in parallel across a pool of threads.
+
+Each thread records the events for the examples in its spec, and once the
+spec is done they're replayed into the real result (by the thread which
+started the run), so that output looks just as it would for a run in a single
+thread. On free-threaded builds of Python, the threads run on separate cores.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import traceback
+
+from ivoire.events import Recorder, Replayer
+import ivoire
+
+
+def run(specs, result, threads, load):
+    """
+    Run the given specs on ``threads`` threads, recording to ``result``.
+
+    ``load`` is called (in a thread) with each spec and the thread's result,
+    and should load the spec.
+    """
+    pending = deque(specs)
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        running = {
+            executor.submit(_work, pending.popleft(), load)
+            for _ in range(min(threads, len(pending)))
+        }
+        try:
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    events, crash = future.result()
+                    replayer = Replayer(result)
+                    replayer.replay(events)
+                    if crash is not None:
+                        replayer.abort(crash)
+                    if pending and not result.shouldStop:
+                        spec = pending.popleft()
+                        running.add(executor.submit(_work, spec, load))
+        finally:
+            for future in running:
+                future.cancel()
+
+
+def _work(spec, load):
+    """
+    Run a spec, returning the events it produced and how it crashed (if so).
+    """
+    events, crash = [], None
+    recorder = Recorder(emit=events.append)
+    ivoire.current_result = ivoire._manager.result = recorder
+    try:
+        load(spec, recorder)
+    except BaseException:
+        crash = f"Thread crashed while running {spec}.\n"
+        crash += traceback.format_exc()
+    finally:
+        ivoire.current_result = ivoire._manager.result = None
+    return events, crash
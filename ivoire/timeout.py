@@ -0,0 +1,212 @@
+"""
+Limits on how long examples may run for.
+
+On the main thread, limits are enforced with ``SIGALRM``, and elsewhere by a
+watchdog thread which raises an exception in the thread running the example.
+Either way, only Python code can be interrupted, so an example stuck in C code
+isn't interrupted until it returns. Worker processes (which are replaced when
+they exit) instead give up on such examples and exit, once they've run for
+``GRACE`` seconds longer than they were allowed to.
+"""
+
+from types import CodeType
+import ctypes
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import traceback
+
+#: How much longer than its limit an example in a worker process may run for
+#: before the worker exits.
+GRACE = 5.0
+
+#: The exit code of a worker process which gave up on an example.
+EXIT_CODE = 124
+
+_WATCHDOG = "ivoire-timeout"
+
+#: The code of functions which cancel limits once what they limit is done.
+_FINISHING: set[CodeType] = set()
+
+try:
+    import _interpreters  # type: ignore[import-not-found]
+except ImportError:
+    _interpreters = None
+
+_set_async_exc = getattr(ctypes, "pythonapi", None)
+if _set_async_exc is not None:
+    _set_async_exc = _set_async_exc.PyThreadState_SetAsyncExc
+
+
+class Timeout(Exception):
+    """
+    An example ran for longer than it was allowed to.
+    """
+
+    @classmethod
+    def after(cls, seconds, frames):
+        """
+        Create a timeout after ``seconds``, showing what each thread was doing.
+
+        ``frames`` are the current frames of any of the threads (see ``dump``).
+        """
+        return cls(f"Took longer than {seconds}s.\n{dump(frames)}")
+
+
+def finishing(function):
+    """
+    Mark a function as one which cancels limits once what they limit is done.
+
+    Until it does, an alarm going off would interrupt it rather than what was
+    limited, so alarms going off while it runs are ignored.
+    """
+    _FINISHING.add(function.__code__)
+    return function
+
+
+class Limit:
+    """
+    A limit on how long the thread which starts it may run for.
+
+    Once ``seconds`` pass, ``Timeout`` is raised in the thread. In a worker
+    process, if the limit still isn't cancelled ``GRACE`` seconds later,
+    ``on_hang`` is called with an explanation and the process exits.
+    """
+
+    def __init__(self, seconds, on_hang=None):
+        self.seconds = seconds
+        self.on_hang = on_hang
+        self._cancelled = False
+        self._interrupted = False
+        self._lock = threading.Lock()
+        self._timers = []
+        self._alarming = False
+
+    def start(self):
+        """
+        Start counting.
+        """
+        self._ident = threading.get_ident()
+        try:
+            self._previous = signal.signal(signal.SIGALRM, self._alarm)
+        except (AttributeError, ValueError):
+            # No SIGALRM, or not on the main thread (of the main interpreter)
+            self._watch(self.seconds, self._interrupt)
+        else:
+            self._alarming = True
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+
+        if self.on_hang is not None and _in_worker():
+            self._watch(self.seconds + GRACE, self._give_up)
+
+    @finishing
+    def cancel(self):
+        """
+        Stop counting, since the thread finished in time (or was interrupted).
+
+        An interruption which hasn't been raised in the thread yet is dropped.
+        """
+        with self._lock:
+            self._cancelled = True
+            for timer in self._timers:
+                timer.cancel()
+            if self._interrupted:
+                _set_async_exc(ctypes.c_ulong(self._ident), None)
+        if self._alarming:
+            self._alarming = False
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous)
+
+    def _watch(self, seconds, then):
+        # Not a daemon, since subinterpreters can't have them.
+        timer = threading.Timer(seconds, then)
+        timer.name = _WATCHDOG
+        self._timers.append(timer)
+        timer.start()
+
+    def _alarm(self, signum, frame):
+        if not self._cancelled and not _finishing(frame):
+            raise Timeout.after(self.seconds, {self._ident: frame})
+
+    def _interrupt(self):
+        message = str(Timeout.after(self.seconds, {}))
+        # Only an exception type can be raised in another thread, so make one
+        # whose instances show what each thread was doing just now.
+        raised = type(
+            Timeout.__name__,
+            (Timeout,),
+            {"__module__": Timeout.__module__, "__str__": lambda _: message},
+        )
+        with self._lock:
+            if not self._cancelled and _set_async_exc is not None:
+                self._interrupted = True
+                _set_async_exc(
+                    ctypes.c_ulong(self._ident),
+                    ctypes.py_object(raised),
+                )
+
+    def _give_up(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self.on_hang(
+                f"Took longer than {self.seconds}s, and didn't stop when "
+                f"interrupted, so its worker process was exited.\n{dump({})}",
+            )
+            os._exit(EXIT_CODE)
+
+
+def dump(frames):
+    """
+    Show what each thread is doing.
+
+    ``frames`` overrides the current frames of any of the threads. The thread
+    calling this is left out unless it's among them, as are watchdogs.
+
+    In subinterpreters, only the given frames are shown, since looking at
+    the others there corrupts memory (as of Python 3.13).
+    """
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    current = {}
+    if not _in_subinterpreter():
+        current = {
+            ident: frame
+            for ident, frame in sys._current_frames().items()
+            if ident != threading.get_ident()
+            and names.get(ident) != _WATCHDOG
+        }
+    current.update(frames)
+    return "".join(
+        f"\nThread {names.get(ident, ident)} (most recent call last):\n"
+        + "".join(traceback.format_stack(frame))
+        for ident, frame in current.items()
+    )
+
+
+def _finishing(frame):
+    """
+    Whether a frame is (called from) one of a function marked as finishing.
+    """
+    while frame is not None:
+        if frame.f_code in _FINISHING:
+            return True
+        frame = frame.f_back
+    return False
+
+
+def _in_worker():
+    """
+    Whether this is a worker process, which will be replaced if it exits.
+    """
+    return multiprocessing.parent_process() is not None
+
+
+def _in_subinterpreter():
+    """
+    Whether this is a subinterpreter (rather than the main interpreter).
+    """
+    if _interpreters is None:
+        return False
+    return _interpreters.get_current() != _interpreters.get_main()
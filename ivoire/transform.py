@@ -7,6 +7,15 @@ import ast
 import sys
 
 
+_HOOKS = {
+    "before": "setUp",
+    "after": "tearDown",
+    "before_all": "setUpClass",
+    "after_all": "tearDownClass",
+}
+_CACHED_PROPERTY = "__import__('functools').cached_property"
+
+
 class ExampleTransformer(ast.NodeTransformer):
     """
     Transform a module that uses Ivoire into one that uses unittest.
@@ -88,6 +97,10 @@ class ExampleTransformer(ast.NodeTransformer):
         manager (usually "it").
         """
         for node in body:
+            if isinstance(node, ast.FunctionDef):
+                yield self.transform_hook(node, group_var)
+                continue
+
             (withitem,) = node.items
             context_expr = withitem.context_expr
 
@@ -96,6 +109,66 @@ class ExampleTransformer(ast.NodeTransformer):
 
             yield self.transform_example(node, name, context_var, group_var)
 
+    def transform_hook(self, node, group_variable):
+        """
+        Transform a function decorated with a hook into the equivalent method.
+
+        Returns the unchanged node if it wasn't a hook.
+
+        ``node`` is the node object.
+        ``group_variable`` is the name bound in the surrounding example group's
+        context manager (usually "it").
+        """
+        if len(node.decorator_list) != 1:
+            return node
+
+        (decorator,) = node.decorator_list
+        if (
+            isinstance(decorator, ast.Call)
+            and isinstance(decorator.func, ast.Attribute)
+            and isinstance(decorator.func.value, ast.Name)
+            and decorator.func.value.id == group_variable
+            and decorator.func.attr == "let"
+        ):
+            return self.transform_let(node, decorator)
+
+        if not (
+            isinstance(decorator, ast.Attribute)
+            and isinstance(decorator.value, ast.Name)
+            and decorator.value.id == group_variable
+            and decorator.attr in _HOOKS
+        ):
+            return node
+
+        node.name = _HOOKS[decorator.attr]
+        if decorator.attr.endswith("_all"):
+            node.decorator_list = [ast.Name(id="classmethod", ctx=ast.Load())]
+        else:
+            node.decorator_list = []
+        return node
+
+    def transform_let(self, node, decorator):
+        """
+        Transform a function decorated with ``let`` into a cached property.
+
+        Each test method runs on its own ``TestCase``, so (like a ``let``) the
+        function is called at most once per example, when first accessed.
+
+        ``node`` is the node object.
+        ``decorator`` is the node calling ``let``.
+        """
+        name = decorator.args[0] if len(decorator.args) == 1 else None
+        if not isinstance(name, ast.Constant) or not isinstance(
+            name.value,
+            str,
+        ):
+            raise TypeError(  # noqa: TRY003
+                f"let must be given a literal name (on line {node.lineno}).",
+            )
+        node.name = name.value
+        node.decorator_list = [ast.parse(_CACHED_PROPERTY, mode="eval").body]
+        return node
+
     def transform_example(self, node, name, context_variable, group_variable):
         """
         Transform an example node into a test method.
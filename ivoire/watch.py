@@ -0,0 +1,116 @@
+"""
+Rerun specs whenever the files they depend on change.
+
+Which files a spec depends on comes from what it imported when it last ran
+(see ``ivoire.imports``), so only the specs a change could affect are rerun.
+The interpreter stays running between runs, and modules which haven't changed
+(nor import anything which has) stay imported.
+"""
+
+from contextlib import suppress
+from pathlib import Path
+import os
+import sys
+import time
+
+from ivoire.imports import absolute
+import ivoire
+
+#: Ivoire's own modules hold the state of the run, so are never reimported.
+_IVOIRE = f"{absolute(Path(ivoire.__file__).parent)}{os.sep}"
+
+
+def watch(discover, run, imports, interval=0.5, sleep=time.sleep):
+    """
+    Run some specs, then rerun the affected ones after each change, forever.
+
+    ``discover`` is called to find the specs (again, before each check for
+    changes), and ``run`` is called with the specs to run, which it should
+    load recording what they import into the ``imports`` graph.
+    """
+    specs = discover()
+    seen = mtimes([*specs, *imports.files()])
+    run(specs)
+    _notice(seen, imports)
+
+    while True:
+        sleep(interval)
+        specs = discover()
+        current = mtimes([*specs, *imports.files()])
+        changes = changed(seen, current)
+        seen = current
+        if not changes:
+            continue
+
+        rerun = affected(specs, changes, imports)
+        reimport(changes, imports)
+        if rerun:
+            run(rerun)
+            _notice(seen, imports)
+
+
+def mtimes(paths):
+    """
+    The modification times of each of the given files which exists.
+    """
+    mtimes = {}
+    for path in paths:
+        with suppress(OSError):
+            mtimes[path] = Path(path).stat().st_mtime_ns
+    return mtimes
+
+
+def changed(before, after):
+    """
+    The files which changed (or appeared or disappeared) between two checks.
+    """
+    return {
+        path
+        for path in before.keys() | after.keys()
+        if before.get(path) != after.get(path)
+    }
+
+
+def affected(specs, changes, imports):
+    """
+    The specs which are, or import (however indirectly), any changed file.
+
+    Specs given by module name rather than by path are always affected.
+    """
+    changes = {absolute(path) for path in changes}
+    affected = changes | imports.dependents(changes)
+    return [
+        spec
+        for spec in specs
+        if absolute(spec) in affected or not Path(spec).exists()
+    ]
+
+
+def reimport(changes, imports):
+    """
+    Forget the modules for changed files, and any importing them, if imported.
+
+    They'll be imported afresh the next time a spec imports them.
+    """
+    stale = imports.dependents(changes)
+    stale.update(absolute(path) for path in changes)
+
+    for name, module in list(sys.modules.items()):
+        path = getattr(module, "__file__", None)
+        if path is None:
+            continue
+        path = absolute(path)
+        if path.startswith(_IVOIRE):
+            stale.discard(path)
+        elif path in stale:
+            del sys.modules[name]
+
+    imports.forget(stale)
+
+
+def _notice(seen, imports):
+    """
+    Start watching any files which were imported for the first time.
+    """
+    for path, mtime in mtimes(imports.files() - seen.keys()).items():
+        seen.setdefault(path, mtime)